@@ -88,6 +88,8 @@ from .exceptions import (
 )
 from mindsdb.api.executor.utilities.functions import download_file
 from mindsdb.api.executor.utilities.sql import query_df
+from mindsdb.api.executor.utilities.query_cache import query_cache
+from mindsdb.api.executor.datahub.metadata_catalog import metadata_catalog
 from mindsdb.integrations.libs.const import (
     HANDLER_CONNECTION_ARG_TYPE,
     PREDICTOR_STATUS,
@@ -167,7 +169,13 @@ class ExecuteCommands:
         self.datahub = session.datahub
 
     @profiler.profile()
-    def execute_command(self, statement):
+    def execute_command(self, statement, stream: bool = False):
+        """ execute the statement
+
+            Args:
+                statement (ASTNode): statement to execute
+                stream (bool): result of SELECT can be returned by batches, see ExecuteAnswer.data_batches
+        """
         sql = None
         if isinstance(statement, ASTNode):
             sql = statement.to_string()
@@ -541,6 +549,11 @@ class ExecuteCommands:
                         self.session.predictor_cache = True
                     else:
                         self.session.predictor_cache = False
+                elif statement.arg.args[0].parts[0].lower() == "query_cache":
+                    if statement.arg.args[1].value in (1, True):
+                        self.session.query_cache = True
+                    else:
+                        self.session.query_cache = False
                 return ExecuteAnswer(ANSWER_TYPE.OK)
             elif category == "autocommit":
                 return ExecuteAnswer(ANSWER_TYPE.OK)
@@ -616,7 +629,7 @@ class ExecuteCommands:
         elif type(statement) == Select:
             if statement.from_table is None:
                 return self.answer_single_row_select(statement)
-            query = SQLQuery(statement, session=self.session)
+            query = SQLQuery(statement, session=self.session, stream=stream)
             return self.answer_select(query)
         elif type(statement) == Union:
             query = SQLQuery(statement, session=self.session)
@@ -1185,6 +1198,7 @@ class ExecuteCommands:
             except EntityExistsError:
                 if getattr(statement, "if_not_exists", False) is False:
                     raise
+            metadata_catalog.invalidate(database_name)
 
         return ExecuteAnswer(ANSWER_TYPE.OK)
 
@@ -1197,6 +1211,7 @@ class ExecuteCommands:
         except EntityNotExistsError:
             if statement.if_exists is not True:
                 raise
+        metadata_catalog.invalidate(db_name)
         return ExecuteAnswer(ANSWER_TYPE.OK)
 
     def answer_drop_tables(self, statement):
@@ -1215,6 +1230,8 @@ class ExecuteCommands:
             dn = self.session.datahub[db_name]
             if db_name is not None:
                 dn.drop_table(table, if_exists=statement.if_exists)
+                query_cache.invalidate(db_name, table.parts[-1])
+                metadata_catalog.invalidate(db_name)
 
             elif db_name in self.session.database_controller.get_dict(filter_type="project"):
                 # TODO do we need feature: delete object from project via drop table?
@@ -1996,6 +2013,7 @@ class ExecuteCommands:
             answer_type=ANSWER_TYPE.TABLE,
             columns=query.columns_list,
             data=data["result"],
+            data_batches=query.fetch_batches(),
         )
 
     def answer_update_model_version(self, statement):
@@ -59,6 +59,8 @@ class SessionController:
         self.packet_sequence_number = 0
         self.profiling = False
         self.predictor_cache = True
+        # None: use value from config
+        self.query_cache = None
 
     def inc_packet_sequence_number(self):
         self.packet_sequence_number = (self.packet_sequence_number + 1) % 256
@@ -1,4 +1,4 @@
-from typing import List
+from typing import Iterator, List
 
 
 class ANSWER_TYPE:
@@ -22,9 +22,12 @@ class ExecuteAnswer:
         state_track: List[List] = None,
         error_code: int = None,
         error_message: str = None,
+        data_batches: Iterator[List[List]] = None,
     ):
         self.columns = columns
         self.data = data
+        # next batches of rows if the result is streamed, 'data' is the first batch
+        self.data_batches = data_batches
         self.status = status
         self.state_track = state_track
         self.error_code = error_code
@@ -1,7 +1,7 @@
 from functools import partial
 
 import pandas as pd
-from mindsdb_sql.parser.ast import BinaryOperation, Constant, Identifier, Select, Join, Union, Insert, Delete
+from mindsdb_sql.parser.ast import BinaryOperation, Constant, Identifier, Select, Join, Union, Insert, Delete, Tuple
 from mindsdb_sql.parser.ast.base import ASTNode
 
 from mindsdb.api.executor.datahub.classes.tables_row import (
@@ -15,6 +15,7 @@ from mindsdb.api.executor.datahub.datanodes.integration_datanode import (
 from mindsdb.api.executor.datahub.datanodes.project_datanode import (
     ProjectDataNode,
 )
+from mindsdb.api.executor.datahub.metadata_catalog import metadata_catalog
 from mindsdb.api.executor import exceptions as exc
 from mindsdb.api.executor.utilities.sql import query_df
 from mindsdb.interfaces.agents.agents_controller import AgentsController
@@ -53,6 +54,48 @@ def get_all_tables(stmt):
     return result
 
 
+def get_filter_values(query, column_name):
+    """
+    Find values of the column which are allowed by 'where' of the query: conditions like
+    'column = <value>' or 'column in (<values>)' combined by 'and'/'or'
+
+    :param query: query to information_schema
+    :param column_name: name of the column in upper case
+    :return: set of lowercased values or None if the column is not filtered
+    """
+
+    def _is_column(node):
+        return isinstance(node, Identifier) and node.parts[-1].upper() == column_name
+
+    def _get_values(node):
+        if not isinstance(node, BinaryOperation):
+            return None
+        op = node.op.lower()
+        if op in ('and', 'or'):
+            left, right = _get_values(node.args[0]), _get_values(node.args[1])
+            if op == 'and':
+                if left is None or right is None:
+                    return left if right is None else right
+                return left & right
+            if left is None or right is None:
+                return None
+            return left | right
+        arg0, arg1 = node.args
+        if op == '=':
+            if _is_column(arg1):
+                arg0, arg1 = arg1, arg0
+            if _is_column(arg0) and isinstance(arg1, Constant):
+                return {str(arg1.value).lower()}
+        elif op == 'in' and _is_column(arg0) and isinstance(arg1, Tuple):
+            if all(isinstance(item, Constant) for item in arg1.items):
+                return {str(item.value).lower() for item in arg1.items}
+        return None
+
+    if not isinstance(query, Select):
+        return None
+    return _get_values(query.where)
+
+
 class InformationSchemaDataNode(DataNode):
     type = "INFORMATION_SCHEMA"
 
@@ -501,35 +544,35 @@ class InformationSchemaDataNode(DataNode):
         df = pd.DataFrame(data, columns=columns)
         return df
 
+    def _get_integration_tables(self, integration_name):
+        ds = self.get(integration_name)
+        ds_tables = ds.get_tables()
+        for row in ds_tables:
+            row.TABLE_SCHEMA = integration_name
+        return ds_tables
+
     def _get_tables(self, query: ASTNode = None):
         columns = self.information_schema["TABLES"]
 
-        target_table = None
-        if (
-            type(query) == Select
-            and type(query.where) == BinaryOperation
-            and query.where.op == "and"
-        ):
-            for arg in query.where.args:
-                if (
-                    type(arg) == BinaryOperation
-                    and arg.op == "="
-                    and type(arg.args[0]) == Identifier
-                    and arg.args[0].parts[-1].upper() == "TABLE_SCHEMA"
-                    and type(arg.args[1]) == Constant
-                ):
-                    target_table = arg.args[1].value
-                    break
+        schemas = get_filter_values(query, "TABLE_SCHEMA")
+        table_names = get_filter_values(query, "TABLE_NAME")
+
+        def is_skipped(schema_name, table_name=None):
+            if schemas is not None and schema_name.lower() not in schemas:
+                return True
+            if table_names is not None and table_name is not None and str(table_name).lower() not in table_names:
+                return True
+            return False
 
         data = []
         for name in self.information_schema.keys():
-            if target_table is not None and target_table != name:
+            if is_skipped("information_schema", name):
                 continue
             row = TablesRow(TABLE_TYPE=TABLES_ROW_TYPE.SYSTEM_VIEW, TABLE_NAME=name)
             data.append(row.to_list())
 
         for ds_name, ds in self.persis_datanodes.items():
-            if target_table is not None and target_table != ds_name:
+            if is_skipped(ds_name):
                 continue
             ds_tables = ds.get_tables()
             if len(ds_tables) == 0:
@@ -554,20 +597,20 @@ class InformationSchemaDataNode(DataNode):
                 row.TABLE_SCHEMA = ds_name
                 data.append(row.to_list())
 
-        for ds_name in self.get_integrations_names():
-            if target_table is not None and target_table != ds_name:
-                continue
-            try:
-                ds = self.get(ds_name)
-                ds_tables = ds.get_tables()
-                for row in ds_tables:
-                    row.TABLE_SCHEMA = ds_name
-                    data.append(row.to_list())
-            except Exception:
-                logger.error(f"Can't get tables from '{ds_name}'")
+        # integrations are requested concurrently, metadata can be taken from cache
+        integrations_tables = metadata_catalog.get_many({
+            ds_name: (ds_name, "tables", partial(self._get_integration_tables, ds_name))
+            for ds_name in self.get_integrations_names()
+            if not is_skipped(ds_name)
+        })
+        for ds_name, ds_tables in integrations_tables.items():
+            for row in ds_tables:
+                if is_skipped(ds_name, row.TABLE_NAME):
+                    continue
+                data.append(row.to_list())
 
         for project_name in self.get_projects_names():
-            if target_table is not None and target_table != project_name:
+            if is_skipped(project_name):
                 continue
             project_dn = self.get(project_name)
             project_tables = project_dn.get_tables()
@@ -932,7 +975,15 @@ class InformationSchemaDataNode(DataNode):
 
         result = []
 
+        schemas = get_filter_values(query, "TABLE_SCHEMA")
+
+        def is_skipped(schema_name):
+            # only requested schemas are read
+            return schemas is not None and schema_name not in schemas
+
         for table_name in self.information_schema:
+            if is_skipped("information_schema"):
+                break
             table_columns = self.information_schema[table_name]
             for i, column_name in enumerate(table_columns):
                 result_row = row_templates["text"].copy()
@@ -943,7 +994,7 @@ class InformationSchemaDataNode(DataNode):
                 result.append(result_row)
 
         mindsdb_dn = self.get("MINDSDB")
-        for table_row in mindsdb_dn.get_tables():
+        for table_row in [] if is_skipped("mindsdb") else mindsdb_dn.get_tables():
             table_name = table_row.TABLE_NAME
             table_columns = mindsdb_dn.get_table_columns(table_name)
             for i, column_name in enumerate(table_columns):
@@ -955,7 +1006,7 @@ class InformationSchemaDataNode(DataNode):
                 result.append(result_row)
 
         files_dn = self.get("FILES")
-        for table_name in files_dn.get_tables():
+        for table_name in [] if is_skipped("files") else files_dn.get_tables():
             table_columns = files_dn.get_table_columns(table_name)
             for i, column_name in enumerate(table_columns):
                 result_row = row_templates["text"].copy()
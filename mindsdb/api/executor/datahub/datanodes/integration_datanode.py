@@ -1,4 +1,3 @@
-import numpy as np
 from numpy import dtype as np_dtype
 import pandas as pd
 from pandas.api import types as pd_types
@@ -147,7 +146,13 @@ class IntegrationDataNode(DataNode):
             raise Exception(result.error_message)
 
     @profiler.profile()
-    def query(self, query=None, native_query=None, session=None):
+    def query_df(self, query=None, native_query=None, session=None):
+        """ Executes query in integration and returns result as is, without conversion to records
+
+            Returns:
+                pandas.DataFrame: result of the query. It can contain NaN values
+                list: columns info
+        """
         try:
             if query is not None:
                 result = self.integration_handler.query(query)
@@ -155,34 +160,56 @@ class IntegrationDataNode(DataNode):
                 # try to fetch native query
                 result = self.integration_handler.native_query(native_query)
         except Exception as e:
-            msg = str(e).strip()
-            if msg == '':
-                msg = e.__class__.__name__
-            msg = f'[{self.ds_type}/{self.integration_name}]: {msg}'
-            raise DBHandlerException(msg) from e
+            raise self._handler_exception(e) from e
+
+        return self._get_response_df(result)
+
+    @profiler.profile()
+    def query_stream(self, query, session=None):
+        """ Executes SELECT query in integration and returns result by batches, if handler supports it
+
+            Returns:
+                pandas.DataFrame: first batch of the result. It can contain NaN values
+                list: columns info
+                Iterator[pandas.DataFrame]: next batches of the result, None if there are no more batches
+        """
+        try:
+            result = self.integration_handler.query_stream(query)
+        except Exception as e:
+            raise self._handler_exception(e) from e
+
+        df, columns_info = self._get_response_df(result)
+        batches = None
+        if result.type == RESPONSE_TYPE.TABLE and result.data_batches is not None:
+            batches = self._iter_batches(result.data_batches)
+        return df, columns_info, batches
 
+    def _iter_batches(self, data_batches):
+        try:
+            for df in data_batches:
+                if isinstance(df, pd.Series):
+                    df = df.to_frame()
+                yield df
+        except Exception as e:
+            raise self._handler_exception(e) from e
+
+    def _handler_exception(self, e: Exception) -> DBHandlerException:
+        msg = str(e).strip()
+        if msg == '':
+            msg = e.__class__.__name__
+        msg = f'[{self.ds_type}/{self.integration_name}]: {msg}'
+        return DBHandlerException(msg)
+
+    def _get_response_df(self, result):
         if result.type == RESPONSE_TYPE.ERROR:
             raise Exception(f'Error in {self.integration_name}: {result.error_message}')
         if result.type == RESPONSE_TYPE.OK:
-            return [], []
+            return pd.DataFrame(), []
 
         df = result.data_frame
-        # region clearing df from NaN values
-        # recursion error appears in pandas 1.5.3 https://github.com/pandas-dev/pandas/pull/45749
         if isinstance(df, pd.Series):
             df = df.to_frame()
 
-        try:
-            df = df.replace(np.NaN, pd.NA)
-        except Exception as e:
-            logger.error(f"Issue with clearing DF from NaN values: {e}")
-
-        try:
-            df = df.where(pd.notnull(df), None)
-        except Exception as e:
-            logger.error(f"Issue with clearing DF from NaN values: {e}")
-        # endregion
-
         columns_info = [
             {
                 'name': k,
@@ -190,5 +217,19 @@ class IntegrationDataNode(DataNode):
             }
             for k, v in df.dtypes.items()
         ]
+        return df, columns_info
+
+    @profiler.profile()
+    def query(self, query=None, native_query=None, session=None):
+        df, columns_info = self.query_df(query=query, native_query=native_query, session=session)
+
+        # region clearing df from NaN values
+        try:
+            if df.isna().values.any():
+                df = df.astype(object).where(pd.notnull(df), None)
+        except Exception as e:
+            logger.error(f"Issue with clearing DF from NaN values: {e}")
+        # endregion
+
         data = df.to_dict(orient='records')
         return data, columns_info
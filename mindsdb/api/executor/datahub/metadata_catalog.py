@@ -0,0 +1,161 @@
+import time
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, Future, wait
+from typing import Callable, Dict, Hashable, Optional
+
+from mindsdb.interfaces.storage import db
+from mindsdb.utilities.config import Config
+from mindsdb.utilities.context import context as ctx
+from mindsdb.utilities import log
+
+logger = log.getLogger(__name__)
+
+
+class CatalogEntry:
+    """ cached metadata of one source (list of tables of integration)
+    """
+
+    def __init__(self):
+        self.value = None
+        self.updated_at = None
+        self.future: Optional[Future] = None
+
+
+class MetadataCatalog:
+    """ Cache of metadata of integrations, used by information_schema.
+
+        Metadata of several integrations is requested concurrently.
+        If 'enabled': every request waits for not more than 'timeout' seconds, integration which does not
+        answer in time is skipped (or its stale data is used), its metadata will be put in the cache
+        when the integration answers. Fresh (younger than 'ttl') entries are returned from the cache, stale entries
+        (younger than 'max_stale') are returned and refreshed in background.
+        Entries of integration are invalidated when mindsdb changes its tables (create, drop).
+
+        Config:
+            "metadata_catalog": {
+                "enabled": false,
+                "ttl": 60,
+                "max_stale": 3600,
+                "timeout": 10,
+                "max_workers": 16
+            }
+    """
+
+    def __init__(self):
+        config = Config().get('metadata_catalog', {})
+        self.enabled = config.get('enabled', False)
+        self.ttl = config.get('ttl', 60)
+        self.max_stale = config.get('max_stale', 3600)
+        self.timeout = config.get('timeout', 10)
+        self.max_workers = config.get('max_workers', 16)
+
+        self._entries: Dict[tuple, CatalogEntry] = {}
+        self._lock = threading.Lock()
+        self._executor = None
+
+    @staticmethod
+    def _key(integration_name: str, kind: str) -> tuple:
+        return (ctx.company_id, integration_name.lower(), kind)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # must be called under lock
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix='metadata_catalog')
+        return self._executor
+
+    def _load(self, key: tuple, entry: CatalogEntry, loader: Callable):
+        try:
+            value = loader()
+        except Exception:
+            with self._lock:
+                entry.future = None
+            raise
+        finally:
+            # loader may use db in the thread of the pool
+            if db.session is not None:
+                db.session.remove()
+        with self._lock:
+            entry.future = None
+            # entry can be invalidated during loading
+            if self.enabled and self._entries.get(key) is entry:
+                entry.value = value
+                entry.updated_at = time.time()
+        return value
+
+    def _refresh(self, key: tuple, entry: CatalogEntry, loader: Callable) -> Future:
+        # must be called under lock. Starts loading, if it is not started yet
+        if entry.future is None:
+            context = contextvars.copy_context()
+            entry.future = self._get_executor().submit(context.run, self._load, key, entry, loader)
+        return entry.future
+
+    def get_many(self, loaders: Dict[Hashable, tuple]) -> dict:
+        """ get metadata of several integrations
+
+            Args:
+                loaders (dict): {<id>: (<integration name>, <kind of metadata>, <function to get metadata>)}
+
+            Returns:
+                dict: {<id>: <metadata>}, metadata of integrations which failed or did not answer in time
+                    and have no cached value are missed
+        """
+        now = time.time()
+        result = {}
+        waiting = {}
+        entries = {}
+        with self._lock:
+            for item_id, (integration_name, kind, loader) in loaders.items():
+                key = self._key(integration_name, kind)
+                entry = self._entries.get(key)
+                if entry is None:
+                    # entry is stored even if cache is disabled: to not start new loading while previous is running
+                    entry = CatalogEntry()
+                    self._entries[key] = entry
+                entries[item_id] = entry
+
+                if self.enabled and entry.updated_at is not None:
+                    age = now - entry.updated_at
+                    if age < self.ttl:
+                        result[item_id] = entry.value
+                        continue
+                    if age < self.max_stale:
+                        # revalidate in background
+                        self._refresh(key, entry, loader)
+                        result[item_id] = entry.value
+                        continue
+
+                waiting[item_id] = self._refresh(key, entry, loader)
+
+        if len(waiting) > 0:
+            # without cache metadata of slow integration would never be returned
+            wait(waiting.values(), timeout=self.timeout if self.enabled else None)
+
+        for item_id, future in waiting.items():
+            integration_name = loaders[item_id][0]
+            if future.done() and future.exception() is None:
+                result[item_id] = future.result()
+                continue
+            if future.done():
+                logger.error(f"Can't get metadata from '{integration_name}': {future.exception()}")
+            else:
+                logger.warning(f"Integration '{integration_name}' did not return metadata in {self.timeout} seconds")
+            entry = entries[item_id]
+            if entry.updated_at is not None:
+                result[item_id] = entry.value
+        return result
+
+    def invalidate(self, integration_name: str) -> None:
+        """ remove cached metadata of integration
+
+            Args:
+                integration_name (str): name of integration
+        """
+        name = integration_name.lower()
+        with self._lock:
+            for key in list(self._entries.keys()):
+                if key[0] == ctx.company_id and key[1] == name:
+                    del self._entries[key]
+
+
+metadata_catalog = MetadataCatalog()
@@ -0,0 +1,330 @@
+"""
+Cache of parsed and planned queries.
+
+It is disabled by default and can be enabled in config:
+    "plan_cache": {
+        "enabled": true,
+        "max_size": 1000     # count of records in every of caches (parsed queries, plans)
+    }
+
+Literals of the query are lifted into parameters, so queries which differ only by values share
+one record:
+    - parsed query is cached by the text of the query with replaced literals,
+    - plan is cached by the query with replaced constants, current database and version of the catalog.
+      Version of the catalog is changed on changes of projects, integrations, views and models.
+At the first use of the record the query with filled values is compared with the query planned (or parsed)
+in regular way, the record is not used if they are different (values are used by planner not only as values).
+"""
+import re
+import copy
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from mindsdb_sql import parse_sql
+from mindsdb_sql.parser.ast import ASTNode, Constant, Parameter, Select, Union
+from mindsdb_sql.planner import query_planner
+from mindsdb_sql.planner.steps import PlanStep
+from mindsdb_sql.planner.utils import query_traversal
+
+from mindsdb.interfaces.storage.catalog_version import get_catalog_version
+from mindsdb.utilities.config import Config
+from mindsdb.utilities.context import context as ctx
+from mindsdb.utilities import log
+
+logger = log.getLogger(__name__)
+
+# literals of the query: identifiers and limits are kept, strings and numbers (with sign after operator) are replaced
+_literal_re = re.compile(
+    r"""(?P<keep>`[^`]*`|"[^"]*"|\b(?:limit|offset)\s+\d+)"""
+    r"""|(?P<string>'[^'\\]*')"""
+    r"""|(?:(?P<operator>[=<>(,]\s*)-\s*)?(?P<number>(?<![\w.$])\d+(?:\.\d+)?(?:e[-+]?\d+)?(?![\w.]))""",
+    flags=re.IGNORECASE
+)
+_placeholder_re = re.compile(r'__mindsdb_literal_(\d+)__')
+
+# record of the query which can't be cached
+NOT_CACHEABLE = object()
+
+
+def _find_parameters(obj, found: list, visited: set) -> None:
+    # search parameters in any place of the steps: attributes, lists, dicts
+    if isinstance(obj, Parameter):
+        found.append(obj)
+        return
+    if isinstance(obj, (ASTNode, PlanStep)):
+        if id(obj) in visited:
+            return
+        visited.add(id(obj))
+        items = vars(obj).values()
+    elif isinstance(obj, (list, tuple, set)):
+        items = obj
+    elif isinstance(obj, dict):
+        items = list(obj.keys()) + list(obj.values())
+    else:
+        return
+    for item in items:
+        _find_parameters(item, found, visited)
+
+
+def _fill_node(node, values: list):
+    def replace(node, **kwargs):
+        if isinstance(node, Parameter):
+            return Constant(values[node.index], alias=node.alias)
+
+    if isinstance(node, Parameter):
+        return Constant(values[node.index], alias=node.alias)
+    if isinstance(node, ASTNode):
+        query_traversal(node, replace)
+    elif isinstance(node, PlanStep):
+        _fill_step(node, values)
+    elif isinstance(node, list):
+        return [_fill_node(item, values) for item in node]
+    return node
+
+
+def _fill_step(step: PlanStep, values: list) -> None:
+    for name, value in vars(step).items():
+        setattr(step, name, _fill_node(value, values))
+
+
+def get_plan_template(planner: query_planner.QueryPlanner, query: ASTNode, count: int) -> Optional[List[PlanStep]]:
+    """ plan the query with parameters, parameters must be numbered (have 'index' attribute)
+
+        Args:
+            planner (QueryPlanner): planner to use
+            query (ASTNode): query with parameters
+            count (int): count of parameters
+
+        Returns:
+            Optional[List[PlanStep]]: steps of the plan or None if the plan can't be re-bound with values
+    """
+    try:
+        steps = list(planner.from_query(query).steps)
+    except Exception as e:
+        logger.debug(f'Query with parameters is not planned: {e}')
+        return None
+
+    found = []
+    _find_parameters(steps, found, set())
+    # all parameters are from the query and every of them is in the plan
+    indexes = {getattr(param, 'index', None) for param in found}
+    if indexes != set(range(count)):
+        return None
+
+    # all of them can be filled
+    filled = fill_plan(steps, [None] * count)
+    found = []
+    _find_parameters(filled, found, set())
+    if len(found) > 0:
+        return None
+
+    return steps
+
+
+def fill_plan(steps: List[PlanStep], values: list) -> List[PlanStep]:
+    """ copy steps of the plan and replace parameters in them with values
+    """
+    steps = copy.deepcopy(steps)
+    for step in steps:
+        _fill_step(step, values)
+    return steps
+
+
+def normalize_sql(sql: str) -> Tuple[str, list]:
+    """ replace string and numeric literals in the query with placeholders
+
+        Args:
+            sql (str): query
+
+        Returns:
+            Tuple[str, list]: query with placeholders and values of literals
+    """
+    values = []
+
+    def replace(match):
+        if match.group('keep') is not None:
+            return match.group(0)
+        placeholder = f"'__mindsdb_literal_{len(values)}__'"
+        if match.group('string') is not None:
+            values.append(match.group('string')[1:-1])
+            return placeholder
+        number = match.group('number')
+        number = int(number) if number.isdigit() else float(number)
+        operator = match.group('operator')
+        if operator is None:
+            values.append(number)
+            return placeholder
+        # negative number is a single constant for parser
+        values.append(-number)
+        return operator + placeholder
+
+    return _literal_re.sub(replace, sql), values
+
+
+def lift_constants(query: ASTNode) -> Tuple[ASTNode, list]:
+    """ replace constants in the copy of the query with numbered parameters
+
+        Args:
+            query (ASTNode): query
+
+        Returns:
+            Tuple[ASTNode, list]: query with parameters and values of constants
+    """
+    values = []
+
+    def replace(node, **kwargs):
+        if type(node) is Constant:
+            param = Parameter('?', alias=node.alias)
+            param.index = len(values)
+            values.append(node.value)
+            return param
+
+    query = copy.deepcopy(query)
+    query_traversal(query, replace)
+    return query, values
+
+
+class LRU:
+    """ thread-safe dict with limited count of records, least recently used are removed first
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._records = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._records.get(key)
+            if value is not None:
+                self._records.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._records[key] = value
+            self._records.move_to_end(key)
+            while len(self._records) > self.max_size:
+                self._records.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+
+
+class PlanCache:
+    """ Cache of parsed and planned queries, see module docstring
+    """
+
+    def __init__(self):
+        config = Config().get('plan_cache', {})
+        self.enabled = config.get('enabled', False)
+        max_size = config.get('max_size', 1000)
+        self.parsed = LRU(max_size)
+        self.plans = LRU(max_size)
+
+    def parse(self, sql: str, dialect: str = 'mindsdb') -> ASTNode:
+        """ parse the query, template of parsed query is taken from cache if possible
+
+            Args:
+                sql (str): query
+                dialect (str): dialect of the query
+
+            Returns:
+                ASTNode: parsed query
+        """
+        if not self.enabled:
+            return parse_sql(sql, dialect=dialect)
+
+        normalized, values = normalize_sql(sql)
+        key = (dialect, normalized)
+        template = self.parsed.get(key)
+        if template is None:
+            query = parse_sql(sql, dialect=dialect)
+            template = self._get_parse_template(normalized, dialect, values, query)
+            self.parsed.set(key, template)
+            return query
+        if template is NOT_CACHEABLE:
+            return parse_sql(sql, dialect=dialect)
+        return self._fill_literals(template, values)
+
+    @staticmethod
+    def _fill_literals(template: ASTNode, values: list) -> ASTNode:
+        def replace(node, **kwargs):
+            if type(node) is Constant and isinstance(node.value, str):
+                match = _placeholder_re.fullmatch(node.value)
+                if match is not None:
+                    return Constant(values[int(match.group(1))], alias=node.alias)
+
+        query = copy.deepcopy(template)
+        query_traversal(query, replace)
+        return query
+
+    def _get_parse_template(self, normalized: str, dialect: str, values: list, query: ASTNode):
+        # template is used only if it gives the same query as parser
+        if not isinstance(query, (Select, Union)):
+            return NOT_CACHEABLE
+        try:
+            template = parse_sql(normalized, dialect=dialect)
+        except Exception:
+            return NOT_CACHEABLE
+        if self._fill_literals(template, values) != query:
+            return NOT_CACHEABLE
+        return template
+
+    def get_plan(self, query: ASTNode, database: Optional[str]) -> Tuple[Optional[list], Optional[list], Optional[tuple]]:
+        """ find plan of the query in the cache
+
+            Args:
+                query (ASTNode): query
+                database (Optional[str]): current database of the session
+
+            Returns:
+                Tuple[Optional[list], Optional[list], Optional[tuple]]:
+                    - steps of the plan with filled values or None if there is no plan in the cache
+                    - predictor metadata used by the plan
+                    - ticket to save the plan with 'save_plan', None if the query can't be cached
+        """
+        if not self.enabled or not isinstance(query, (Select, Union)):
+            return None, None, None
+        if isinstance(query, Select) and query.from_table is None:
+            return None, None, None
+
+        try:
+            template, values = lift_constants(query)
+            key = (ctx.company_id, database, template.to_string(), get_catalog_version())
+        except Exception as e:
+            logger.debug(f'Query plan is not cached: {e}')
+            return None, None, None
+
+        record = self.plans.get(key)
+        if record is NOT_CACHEABLE:
+            return None, None, None
+        if record is None:
+            return None, None, (key, template, values)
+        steps, predictor_metadata = record
+        return fill_plan(steps, values), copy.deepcopy(predictor_metadata), None
+
+    def save_plan(self, ticket: tuple, planner_params: dict, steps: List[PlanStep]) -> None:
+        """ save the plan which is planned in regular way. It has to be called before execution of steps
+
+            Args:
+                ticket (tuple): ticket returned by 'get_plan'
+                planner_params (dict): parameters which were used to create planner
+                steps (List[PlanStep]): steps of the plan
+        """
+        key, template, values = ticket
+        record = NOT_CACHEABLE
+        try:
+            planner_params = copy.deepcopy(planner_params)
+            planner = query_planner.QueryPlanner(copy.deepcopy(template), **planner_params)
+            template_steps = get_plan_template(planner, copy.deepcopy(template), len(values))
+            if template_steps is not None and fill_plan(template_steps, values) == steps:
+                record = (template_steps, planner_params['predictor_metadata'])
+        except Exception as e:
+            logger.debug(f'Query plan is not cached: {e}')
+        self.plans.set(key, record)
+
+
+plan_cache = PlanCache()
@@ -0,0 +1,101 @@
+import copy
+from typing import List, Optional
+
+from mindsdb_sql.parser.ast import ASTNode, Select, Union
+from mindsdb_sql.planner.steps import PlanStep
+from mindsdb_sql.planner.utils import get_query_params, fill_query_params
+from mindsdb_sql.exceptions import PlanningException
+
+from mindsdb.api.executor.data_types.answer import ExecuteAnswer, ANSWER_TYPE
+from mindsdb.api.executor.exceptions import LogicError
+from mindsdb.interfaces.storage.catalog_version import get_catalog_version
+from mindsdb.utilities import log
+
+from .sql_query import SQLQuery
+from .plan_cache import get_plan_template, fill_plan
+
+logger = log.getLogger(__name__)
+
+
+class PreparedStatement:
+    """ Statement with parameters prepared by PREPARE command of a client.
+
+        The query is planned once: parameters are left in the steps of the plan and every EXECUTE
+        fills them in a copy of the steps. If the plan can't be re-bound (parameter is used by planner
+        not as a part of the query, for example as an input of predictor), the query with filled
+        parameters is planned at every EXECUTE.
+        The query is planned again if current database or the catalog (projects, integrations, models)
+        is changed after PREPARE.
+    """
+
+    def __init__(self, query: ASTNode, session):
+        self.session = session
+        self.query = query
+        self.params = get_query_params(query)
+        self._prepare()
+
+    def _prepare(self):
+        query = self.query
+        self.database = self.session.database
+        self.catalog_version = get_catalog_version()
+
+        sqlquery = SQLQuery(copy.deepcopy(query), session=self.session, execute=False)
+        sqlquery.prepare_query()
+        self.columns = sqlquery.columns_list
+        self.predictor_metadata = sqlquery.context['predictor_metadata']
+
+        self.plan_steps = None
+        if isinstance(query, Union) or (isinstance(query, Select) and query.from_table is not None):
+            self.plan_steps = self._get_plan_template(sqlquery)
+
+    def _get_plan_template(self, sqlquery: SQLQuery) -> Optional[List[PlanStep]]:
+        """ plan the query with not filled parameters
+
+            Args:
+                sqlquery (SQLQuery): prepared query
+
+            Returns:
+                Optional[List[PlanStep]]: steps of the plan or None if the plan can't be re-bound
+        """
+        query = copy.deepcopy(self.query)
+        # number parameters to find them in the plan
+        for i, param in enumerate(get_query_params(query)):
+            param.index = i
+
+        return get_plan_template(sqlquery.planner, query, len(self.params))
+
+    def execute(self, values: list, command_executor) -> ExecuteAnswer:
+        """ execute the statement with parameters
+
+            Args:
+                values (list): values of parameters
+                command_executor (ExecuteCommands): is used if the query is not planned at PREPARE
+
+            Returns:
+                ExecuteAnswer: result of the execution
+        """
+        if len(values) != len(self.params):
+            raise LogicError("Count of execution parameters doesn't match prepared statement")
+
+        if self.session.database != self.database or get_catalog_version() != self.catalog_version:
+            self._prepare()
+
+        query = fill_query_params(copy.deepcopy(self.query), values)
+        if self.plan_steps is None:
+            return command_executor.execute_command(query)
+
+        steps = fill_plan(self.plan_steps, values)
+
+        try:
+            sqlquery = SQLQuery(
+                query, session=self.session, plan_steps=steps,
+                predictor_metadata=copy.deepcopy(self.predictor_metadata)
+            )
+        except PlanningException as e:
+            raise LogicError(e)
+        data = sqlquery.fetch()
+        return ExecuteAnswer(
+            answer_type=ANSWER_TYPE.TABLE,
+            columns=sqlquery.columns_list,
+            data=data['result'],
+        )
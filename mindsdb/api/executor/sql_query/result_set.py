@@ -1,4 +1,5 @@
 import copy
+
 import pandas as pd
 
 from mindsdb.api.executor.exceptions import WrongArgumentError
@@ -41,32 +42,57 @@ class ResultSet:
         for i in range(length):
             self._records.append([])
 
+        # columnar storage: dataframe with the same order of columns as self._columns.
+        #   if it is set, self._records is not used until records are requested
+        self._df = None
+
         self.is_prediction = False
 
     def __repr__(self):
         col_names = ', '.join([col.name for col in self._columns])
-        data = '\n'.join([str(rec) for rec in self._records[:20]])
+        records = self.get_records_raw()
+        data = '\n'.join([str(rec) for rec in records[:20]])
 
-        if len(self._records) > 20:
+        if len(records) > 20:
             data += '\n...'
 
         return f'{self.__class__.__name__}({self.length()} rows, cols: {col_names})\n {data}'
 
+    # --- columnar storage ---
+
+    def _set_df(self, df):
+        # keep dataframe as is, without converting it to records
+        self._df = df
+        self._records = None
+
+    def _materialize(self):
+        # convert columnar storage to list of records
+        if self._df is None:
+            return
+
+        df = self._df
+        if df.isna().values.any():
+            df = df.astype(object).where(df.notna(), None)
+        self._records = df.to_dict(orient='split')['data']
+        self._df = None
+
+    def is_columnar(self):
+        return self._df is not None
+
     # --- converters ---
 
     def from_df(self, df, database, table_name, table_alias=None):
 
-        resp_dict = df.to_dict(orient='split')
+        self._set_df(df)
 
-        self._records = resp_dict['data']
-
-        for col in resp_dict['columns']:
+        # by position: names of columns can be duplicated
+        for i, col in enumerate(df.columns):
             self._columns.append(Column(
                 name=col,
                 table_name=table_name,
                 table_alias=table_alias,
                 database=database,
-                type=df.dtypes[col]
+                type=df.dtypes.iloc[i]
             ))
         return self
 
@@ -77,11 +103,9 @@ class ResultSet:
             if col.alias is not None:
                 alias_idx[col.alias] = col
 
-        resp_dict = df.to_dict(orient='split')
-
-        self._records = resp_dict['data']
+        self._set_df(df)
 
-        for col in resp_dict['columns']:
+        for col in df.columns:
             if col in col_names or strict:
                 column = col_names[col]
             elif col in alias_idx:
@@ -91,9 +115,20 @@ class ResultSet:
             self._columns.append(column)
         return self
 
+    def _get_df(self, columns):
+        if self._df is not None:
+            # without copying of data. object columns are converted to the same types
+            #   as pandas would infer from records
+            df = self._df.infer_objects(copy=False)
+            if df is self._df:
+                df = df.copy(deep=False)
+            df.columns = columns
+            return df
+        return pd.DataFrame(self._records, columns=columns)
+
     def to_df(self):
         columns = self.get_column_names()
-        return pd.DataFrame(self._records, columns=columns)
+        return self._get_df(columns)
 
     def to_df_cols(self, prefix=''):
         # returns dataframe and dict of columns
@@ -106,7 +141,7 @@ class ResultSet:
             columns.append(name)
             col_names[name] = col
 
-        return pd.DataFrame(self._records, columns=columns), col_names
+        return self._get_df(columns), col_names
 
     # --- tables ---
 
@@ -138,6 +173,14 @@ class ResultSet:
 
         if values is None:
             values = []
+
+        if self._df is not None:
+            length = len(self._df)
+            values = list(values[:length]) + [None] * (length - len(values))
+            self._df = self._df.copy(deep=False)
+            self._df.insert(len(self._df.columns), col.name, values, allow_duplicates=True)
+            return
+
         # update records
         if len(self._records) > 0:
             for rec in self._records:
@@ -150,6 +193,10 @@ class ResultSet:
     def del_column(self, col):
         idx = self._locate_column(col)
         self._columns.pop(idx)
+        if self._df is not None:
+            positions = [i for i in range(len(self._df.columns)) if i != idx]
+            self._df = self._df.iloc[:, positions]
+            return
         for row in self._records:
             row.pop(idx)
 
@@ -179,7 +226,7 @@ class ResultSet:
         # copy with values
         idx = self._locate_column(col)
 
-        values = [row[idx] for row in self._records]
+        values = [row[idx] for row in self.get_records_raw()]
 
         col2 = copy.deepcopy(col)
 
@@ -189,6 +236,7 @@ class ResultSet:
     # --- records ---
 
     def add_records(self, data):
+        self._materialize()
         names = self.get_column_names()
         for rec in data:
             # if len(rec) != len(self._columns):
@@ -201,11 +249,13 @@ class ResultSet:
             self._records.append(record)
 
     def get_records_raw(self):
+        self._materialize()
         return self._records
 
     def add_record_raw(self, rec):
         if len(rec) != len(self._columns):
             raise WrongArgumentError(f'Record length mismatch columns length: {len(rec)} != {len(self.columns)}')
+        self._materialize()
         self._records.append(rec)
 
     @property
@@ -218,12 +268,28 @@ class ResultSet:
         # if resultSet contents duplicate column name: only one of them will be in output
         names = self.get_column_names()
         records = []
-        for row in self._records:
+        for row in self.get_records_raw():
             records.append(dict(zip(names, row)))
         return records
 
     # def clear_records(self):
     #     self._records = []
 
+    def slice(self, offset=None, limit=None):
+        # returns new ResultSet with the same columns and subset of records
+        result = ResultSet()
+        for col in self._columns:
+            result._columns.append(col)
+
+        start = offset or 0
+        end = None if limit is None else start + limit
+        if self._df is not None:
+            result._set_df(self._df.iloc[start:end])
+        else:
+            result._records = self._records[start:end]
+        return result
+
     def length(self):
+        if self._df is not None:
+            return len(self._df)
         return len(self._records)
@@ -10,14 +10,26 @@
 """
 import inspect
 import re
+from concurrent.futures import wait, FIRST_COMPLETED
 
-from mindsdb_sql import parse_sql
 from mindsdb_sql.parser.ast import Identifier
 from mindsdb_sql.planner.steps import (
     ApplyTimeseriesPredictorStep,
     ApplyPredictorRowStep,
     ApplyPredictorStep,
+    FetchDataframeStep,
+    PlanStep,
+    JoinStep,
+    UnionStep,
+    ProjectStep,
+    FilterStep,
+    LimitOffsetStep,
+    GroupByStep,
+    SubSelectStep,
+    MapReduceStep,
+    MultipleSteps,
 )
+from mindsdb_sql.planner.step_result import Result
 
 from mindsdb_sql.exceptions import PlanningException
 from mindsdb_sql.render.sqlalchemy_render import SqlalchemyRender
@@ -25,27 +37,112 @@ from mindsdb_sql.planner import query_planner
 from mindsdb_sql.planner.utils import query_traversal
 
 from mindsdb.api.executor.utilities.sql import query_df
+from mindsdb.api.executor.utilities.functions import get_integration_limit, get_integration_semaphore
 from mindsdb.interfaces.model.functions import get_model_record
 from mindsdb.api.executor.exceptions import (
     UnknownError,
     LogicError,
 )
 import mindsdb.utilities.profiler as profiler
+from mindsdb.utilities.config import Config
+from mindsdb.utilities.context import context as ctx
+from mindsdb.utilities.context_executor import ContextThreadPoolExecutor
 from mindsdb.utilities.fs import create_process_mark, delete_process_mark
 
 from . import steps
 from .result_set import ResultSet, Column
+from .steps_data import StepsData
+from .plan_cache import plan_cache
 from . steps.base import BaseStepCall
+from . steps.join_step import push_join_keys, get_pushdown_joins, is_small_result
 
 superset_subquery = re.compile(r'from[\s\n]*(\(.*\))[\s\n]*as[\s\n]*virtual_table', flags=re.IGNORECASE | re.MULTILINE | re.S)
 
+# steps which can be executed out of the plan order, when all steps they reference are done
+DAG_SAFE_STEPS = (
+    FetchDataframeStep, JoinStep, UnionStep, ProjectStep, FilterStep, LimitOffsetStep, GroupByStep,
+    SubSelectStep, MapReduceStep, MultipleSteps,
+    ApplyPredictorStep, ApplyPredictorRowStep, ApplyTimeseriesPredictorStep
+)
+
+
+def get_step_dependencies(step: PlanStep) -> set:
+    """ find numbers of steps which results are used by the step: Result objects
+        in attributes of the step, in nested steps and in ast nodes of queries.
+        Steps of the plan used as attributes (as dataframe of InsertToTable) are dependencies too
+
+        Args:
+            step (PlanStep): step of the plan
+
+        Returns:
+            set: numbers of steps
+    """
+    dependencies = set()
+    visited = set()
+
+    def _find(obj):
+        if isinstance(obj, Result):
+            dependencies.add(obj.step_num)
+        elif isinstance(obj, (list, tuple)):
+            for item in obj:
+                _find(item)
+        elif isinstance(obj, dict):
+            for item in obj.values():
+                _find(item)
+        elif isinstance(obj, PlanStep) and obj is not step and obj.step_num is not None:
+            dependencies.add(obj.step_num)
+        elif isinstance(obj, PlanStep) or type(obj).__module__.startswith('mindsdb_sql.'):
+            if id(obj) in visited or not hasattr(obj, '__dict__'):
+                return
+            visited.add(id(obj))
+            for key, value in vars(obj).items():
+                if key != 'result_data':
+                    _find(value)
+
+    _find(step)
+    dependencies.discard(step.step_num)
+    return dependencies
+
+
+def get_prepare_step_result(step: PlanStep, data: ResultSet) -> dict:
+    """ convert columns of the table returned by preparing step to format which is used by planner
+
+        Args:
+            step (PlanStep): GetTableColumns or GetPredictorColumns step
+            data (ResultSet): result of the step
+
+        Returns:
+            dict: {'tables': [<table>], 'columns': {<table>: [{'name': <name>, 'type': <type>}]}}
+    """
+    if len(data.columns) == 0:
+        return {'tables': [], 'columns': {}}
+    table = (step.namespace, data.columns[0].table_name, data.columns[0].table_name)
+    return {
+        'tables': [table],
+        'columns': {
+            table: [{'name': column.name, 'type': column.type} for column in data.columns]
+        }
+    }
+
 
 class SQLQuery:
 
     step_handlers = {}
 
-    def __init__(self, sql, session, execute=True):
+    def __init__(self, sql, session, execute=True, plan_steps=None, predictor_metadata=None, stream=False):
+        """
+        Args:
+            sql (str | ASTNode): query
+            session: session controller
+            execute (bool): execute the query immediately
+            plan_steps (list): steps of the query if it is already planned (prepared statement),
+                planner is not created in this case
+            predictor_metadata (list): metadata of predictors which was used to plan 'plan_steps'
+            stream (bool): allow to return result by batches, see 'fetch_batches'
+        """
         self.session = session
+        self.stream = stream
+        self.data_batches = None
 
         self.context = {
             'database': None if session.database == '' else session.database.lower(),
@@ -53,9 +150,13 @@ class SQLQuery:
         }
 
         self.columns_list = None
-        self.steps_data = []
+        self.steps_data = StepsData()
+        self._step_consumers = None
 
         self.planner = None
+        self.planner_params = None
+        self.plan_steps = plan_steps
+        self._plan_cache_ticket = None
         self.parameters = []
         self.fetched_data = None
 
@@ -70,7 +171,7 @@ class SQLQuery:
                     self.outer_query = sql.replace(subquery, 'dataframe')
                     sql = subquery.strip('()')
             # endregion
-            self.query = parse_sql(sql, dialect='mindsdb')
+            self.query = plan_cache.parse(sql, dialect='mindsdb')
             self.context['query_str'] = sql
         else:
             self.query = sql
@@ -80,7 +181,16 @@ class SQLQuery:
             except Exception:
                 self.context['query_str'] = str(self.query)
 
-        self.create_planner()
+        if plan_steps is None and execute:
+            self.plan_steps, predictor_metadata, self._plan_cache_ticket = plan_cache.get_plan(
+                self.query, self.context['database']
+            )
+
+        if self.plan_steps is not None:
+            self.context['predictor_metadata'] = predictor_metadata or []
+
+        if self.plan_steps is None:
+            self.create_planner()
 
         if execute:
             self.prepare_query(prepare=False)
@@ -165,12 +275,12 @@ class SQLQuery:
         database = None if self.session.database == '' else self.session.database.lower()
 
         self.context['predictor_metadata'] = predictor_metadata
-        self.planner = query_planner.QueryPlanner(
-            self.query,
-            integrations=databases,
-            predictor_metadata=predictor_metadata,
-            default_namespace=database,
-        )
+        self.planner_params = {
+            'integrations': databases,
+            'predictor_metadata': predictor_metadata,
+            'default_namespace': database,
+        }
+        self.planner = query_planner.QueryPlanner(self.query, **self.planner_params)
 
     def fetch(self, view='list'):
         data = self.fetched_data
@@ -185,13 +295,28 @@ class SQLQuery:
             'result': result
         }
 
+    def fetch_batches(self):
+        """ Next batches of the result if it is streamed. The result is streamed only if query
+            is executed with 'stream' and it is plain fetch from integration which can return result by batches.
+            In this case 'fetch' returns the first batch
+
+            Returns:
+                Iterator[list] | None: batches of records, None if the result is not streamed
+        """
+        if self.data_batches is None:
+            return None
+        return (
+            ResultSet().from_df(df, database='', table_name='').get_records_raw()
+            for df in self.data_batches
+        )
+
     def prepare_query(self, prepare=True):
         if prepare:
             # it is prepared statement call
             try:
                 for step in self.planner.prepare_steps(self.query):
                     data = self.execute_step(step)
-                    step.set_result(data)
+                    step.set_result(get_prepare_step_result(step, data))
                     self.steps_data.append(data)
             except PlanningException as e:
                 raise LogicError(e)
@@ -227,26 +352,47 @@ class SQLQuery:
 
         process_mark = None
         try:
-            steps = list(self.planner.execute_steps(params))
+            if self.plan_steps is not None:
+                steps = self.plan_steps
+            else:
+                steps = list(self.planner.execute_steps(params))
+                if self._plan_cache_ticket is not None:
+                    plan_cache.save_plan(self._plan_cache_ticket, self.planner_params, steps)
+            if self.stream and not (
+                len(steps) == 1 and isinstance(steps[0], FetchDataframeStep) and self.outer_query is None
+            ):
+                # only result of the single fetch from integration can be streamed
+                self.stream = False
             steps_classes = (x.__class__ for x in steps)
             predict_steps = (ApplyPredictorRowStep, ApplyPredictorStep, ApplyTimeseriesPredictorStep)
             if any(s in predict_steps for s in steps_classes):
                 process_mark = create_process_mark('predict')
-            for step in steps:
-                with profiler.Context(f'step: {step.__class__.__name__}'):
-                    data = self.execute_step(step)
-                step.set_result(data)
-                self.steps_data.append(data)
+            dependencies = {step.step_num: get_step_dependencies(step) for step in steps}
+            self._init_step_consumers(steps, dependencies)
+            max_workers = Config().get('executor', {}).get('dag_max_workers', 1)
+            if max_workers > 1 and self._can_execute_as_dag(steps):
+                self._execute_steps_dag(steps, dependencies, max_workers)
+            else:
+                for step in steps:
+                    if isinstance(step, FetchDataframeStep):
+                        push_join_keys(step, steps, self.steps_data, self.context.get('database'))
+                    with profiler.Context(f'step: {step.__class__.__name__}'):
+                        data = self.execute_step(step)
+                    step.set_result(data)
+                    self.steps_data.append(data)
+                    self._step_done(step, dependencies[step.step_num])
         except PlanningException as e:
             raise LogicError(e)
         except Exception as e:
             raise e
         finally:
+            self.steps_data.clear_spilled()
             if process_mark is not None:
                 delete_process_mark('predict', process_mark)
 
         # save updated query
-        self.query = self.planner.query
+        if self.planner is not None:
+            self.query = self.planner.query
 
         # there was no executing
         if len(self.steps_data) == 0:
@@ -288,6 +434,167 @@ class SQLQuery:
         except Exception as e:
             raise UnknownError("error in column list step") from e
 
+    def _steps_are_consecutive(self, steps: list) -> bool:
+        # numbers of steps match indexes of their results in steps_data
+        first_step_num = len(self.steps_data)
+        return [step.step_num for step in steps] == list(range(first_step_num, first_step_num + len(steps)))
+
+    def _init_step_consumers(self, steps: list, dependencies: dict) -> None:
+        """ Count steps which use result of every step. Result of the step is released when the last
+            of them is done. Result of the last step is the result of the query and never released.
+
+            Args:
+                steps (list): steps of the plan
+                dependencies (dict): numbers of steps used by every step
+        """
+        self._step_consumers = None
+        config = Config().get('executor', {})
+        if config.get('release_step_results', True) is False or not self._steps_are_consecutive(steps):
+            return
+
+        self._spill_rows_threshold = config.get('spill_rows_threshold')
+        self._plan_steps = {step.step_num: step for step in steps}
+        self._step_consumers = {step.step_num: [] for step in steps[:-1]}
+        for step in steps:
+            for step_num in dependencies[step.step_num]:
+                if step_num in self._step_consumers:
+                    self._step_consumers[step_num].append(step.step_num)
+
+    def _step_done(self, step: PlanStep, dependencies: set) -> None:
+        """ Release results of steps which are not used anymore. Big result of the step which is not
+            used by the next step is spilled to local file.
+
+            Args:
+                step (PlanStep): executed step
+                dependencies (set): numbers of steps used by the step
+        """
+        if self._step_consumers is None:
+            return
+
+        for step_num in dependencies:
+            consumers = self._step_consumers.get(step_num)
+            if consumers is None or step.step_num not in consumers:
+                continue
+            consumers.remove(step.step_num)
+            if len(consumers) == 0:
+                self.steps_data.release(step_num)
+                self._plan_steps[step_num].result_data = None
+
+        consumers = self._step_consumers.get(step.step_num)
+        if consumers is None:
+            return
+        if len(consumers) == 0:
+            self.steps_data.release(step.step_num)
+            step.result_data = None
+        elif (
+            self._spill_rows_threshold is not None
+            and isinstance(step.result_data, ResultSet)
+            and step.result_data.length() > self._spill_rows_threshold
+            and min(consumers) > step.step_num + 1
+            # these steps read results from steps_data, not from result_data of the step
+            and all(type(self._plan_steps[x]) in DAG_SAFE_STEPS for x in consumers)
+        ):
+            self.steps_data.spill(step.step_num)
+            step.result_data = None
+
+    def _can_execute_as_dag(self, steps: list) -> bool:
+        """ plan is executed as graph if it has several fetches and consists only of known steps
+
+            Args:
+                steps (list): steps of the plan
+
+            Returns:
+                bool
+        """
+        if not self._steps_are_consecutive(steps):
+            return False
+        if any(type(step) not in DAG_SAFE_STEPS for step in steps):
+            return False
+        return sum(isinstance(step, FetchDataframeStep) for step in steps) > 1
+
+    def _fetch_step_thread(self, step: FetchDataframeStep):
+        # profiling tree is not thread-safe, nodes of parallel fetches are not collected
+        ctx.profiling = {'level': 0, 'enabled': False, 'pointer': None, 'tree': None}
+        from mindsdb.api.executor.datahub.datanodes import IntegrationDataNode
+
+        if (
+            get_integration_limit(step.integration) is None
+            or not isinstance(self.session.datahub.get(step.integration), IntegrationDataNode)
+        ):
+            # integration is limited only if it is set in config.
+            # projects and views can run nested queries, they are not limited to avoid deadlock
+            return self.execute_step(step)
+        # limit of concurrent requests to integration is shared with other queries
+        with get_integration_semaphore(step.integration):
+            return self.execute_step(step)
+
+    def _execute_steps_dag(self, steps: list, dependencies: dict, max_workers: int) -> None:
+        """ Execute the plan as graph of steps: step can be executed when all steps which results it
+            references are done. Fetches from integrations are executed in thread pool (not more than
+            'integration_max_workers' requests to one integration at the same time from all queries, if it
+            is set for the integration), other steps are executed in the current thread in the order of the plan.
+            Fetch of the right table of a join waits for the left table if join keys can be pushed into it and
+            the left table is known to be small (has limit), or if 'dag_wait_pushdown' is enabled in config.
+
+            Args:
+                steps (list): steps of the plan
+                dependencies (dict): numbers of steps used by every step
+                max_workers (int): size of thread pool
+        """
+        done = set(range(len(self.steps_data)))
+        self.steps_data.extend([None] * len(steps))
+
+        def set_step_result(step, data):
+            step.set_result(data)
+            self.steps_data[step.step_num] = data
+            done.add(step.step_num)
+            self._step_done(step, dependencies[step.step_num])
+
+        # fetch can't start before the steps which results it uses, or which join keys it will use
+        wait_pushdown = Config().get('executor', {}).get('dag_wait_pushdown', False)
+        wait_for = {
+            step.step_num: dependencies[step.step_num] | {
+                join.left.step_num
+                for join in get_pushdown_joins(step, steps, self.context.get('database'))
+                if wait_pushdown or is_small_result(join.left.step_num, steps)
+            } if isinstance(step, FetchDataframeStep) else dependencies[step.step_num]
+            for step in steps
+        }
+
+        pending = list(steps)
+        running = {}
+        with ContextThreadPoolExecutor(max_workers=max_workers) as executor:
+            try:
+                while len(pending) > 0 or len(running) > 0:
+                    ready = [step for step in pending if wait_for[step.step_num] <= done]
+
+                    for step in ready:
+                        if not isinstance(step, FetchDataframeStep):
+                            continue
+                        push_join_keys(step, steps, self.steps_data, self.context.get('database'))
+                        running[executor.submit(self._fetch_step_thread, step)] = step
+                        pending.remove(step)
+
+                    local_step = next((step for step in ready if not isinstance(step, FetchDataframeStep)), None)
+                    if local_step is not None:
+                        with profiler.Context(f'step: {local_step.__class__.__name__}'):
+                            data = self.execute_step(local_step)
+                        set_step_result(local_step, data)
+                        pending.remove(local_step)
+                        continue
+
+                    if len(running) == 0:
+                        raise LogicError(f'Unable to resolve dependencies of steps: {pending}')
+
+                    finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        step = running.pop(future)
+                        set_step_result(step, future.result())
+            except Exception:
+                for future in running:
+                    future.cancel()
+                raise
+
     def execute_step(self, step):
         cls_name = step.__class__.__name__
         handler = self.step_handlers.get(cls_name)
@@ -21,6 +21,7 @@ from mindsdb_sql.planner.steps import (
 
 from mindsdb.api.executor.sql_query.result_set import ResultSet, Column
 from mindsdb.utilities.cache import get_cache, json_checksum
+from mindsdb.utilities.config import Config
 
 from .base import BaseStepCall
 
@@ -179,31 +180,35 @@ class ApplyPredictorStepCall(BaseStepCall):
                 ))
         else:
             predictor_id = predictor_metadata['id']
-            key = f'{predictor_name}_{predictor_id}_{json_checksum(where_data)}'
+            version = None
+            if len(step.predictor.parts) > 1 and step.predictor.parts[-1].isdigit():
+                version = int(step.predictor.parts[-1])
 
-            if self.session.predictor_cache is False:
-                data = None
-            else:
-                predictor_cache = get_cache('predict')
-                data = predictor_cache.get(key)
-
-            if data is None:
-                version = None
-                if len(step.predictor.parts) > 1 and step.predictor.parts[-1].isdigit():
-                    version = int(step.predictor.parts[-1])
-                predictions = project_datanode.predict(
+            def predict(rows):
+                return project_datanode.predict(
                     model_name=predictor_name,
-                    data=where_data,
+                    data=rows,
                     version=version,
                     params=params
                 )
+
+            cache_config = Config()['cache']
+            batch_key = f'{predictor_name}_{predictor_id}_{json_checksum(where_data)}'
+            if self.session.predictor_cache is False:
+                predictions = predict(where_data)
                 data = predictions.to_dict(orient='records')
                 columns_dtypes = dict(predictions.dtypes)
-
-                if data is not None and isinstance(data, list) and self.session.predictor_cache is not False:
-                    predictor_cache.set(key, data)
+            # forecast of timeseries model depends on all rows of the batch: it is cached by batches
+            elif (
+                not is_timeseries
+                and cache_config.get('predict_rows_cache', False)
+                and cache_config.get('type') == 'redis'
+            ):
+                key_prefix = f'{predictor_name}_{predictor_id}_{version}_{json_checksum(params)}'
+                data, columns_dtypes = self.predict_with_rows_cache(predict, where_data, key_prefix, batch_key)
             else:
-                columns_dtypes = {}
+                data, columns_dtypes = self.predict_with_batch_cache(predict, where_data, batch_key)
+
             if len(data) > 0:
                 cols = list(data[0].keys())
                 for col in cols:
@@ -221,6 +226,85 @@ class ApplyPredictorStepCall(BaseStepCall):
 
         return result
 
+    def predict_with_batch_cache(self, predict, where_data, key):
+        """
+        Predictions are cached for the whole batch of input rows
+
+        :param predict: function to get predictions for list of rows
+        :param where_data: input rows
+        :param key: cache key of the batch
+        :return: list of predicted rows and dict with dtypes of columns
+        """
+        predictor_cache = get_cache('predict')
+        data = predictor_cache.get(key)
+        if data is not None:
+            return data, {}
+
+        predictions = predict(where_data)
+        data = predictions.to_dict(orient='records')
+        predictor_cache.set(key, data)
+        return data, dict(predictions.dtypes)
+
+    def predict_with_rows_cache(self, predict, where_data, key_prefix, batch_key):
+        """
+        Predictions are cached for every input row: only rows that are not in cache are sent to model.
+        Used only with redis cache (cache.predict_rows_cache option): all keys are read by one MGET and
+        written by one pipeline.
+        If model doesn't return one row for every input row, it is marked in cache and its predictions
+        are cached by batches
+
+        :param predict: function to get predictions for list of rows
+        :param where_data: input rows
+        :param key_prefix: prefix of cache key, identifies model and params of prediction
+        :param batch_key: key of the batch in batches cache
+        :return: list of predicted rows and dict with dtypes of columns
+        """
+        max_size = Config()['cache'].get('predict_rows_max_size')
+        predictor_cache = get_cache('predict_rows', max_size=max_size)
+
+        keys = []
+        for row in where_data:
+            row = {k: v for k, v in row.items() if k != '__mindsdb_row_id'}
+            keys.append(f'{key_prefix}_{json_checksum(row)}')
+        not_by_rows_key = f'{key_prefix}_not_by_rows'
+
+        data = predictor_cache.get_many(keys + [not_by_rows_key])
+        if data.pop() is not None:
+            return self.predict_with_batch_cache(predict, where_data, batch_key)
+
+        missed = [i for i, row in enumerate(data) if row is None]
+
+        columns_dtypes = {}
+        if len(missed) > 0:
+            predictions = predict([where_data[i] for i in missed])
+            columns_dtypes = dict(predictions.dtypes)
+            predicted = predictions.to_dict(orient='records')
+
+            if len(predicted) != len(missed):
+                # model doesn't return one row for every input row, results can't be cached by rows
+                predictor_cache.set_many({not_by_rows_key: True})
+                if len(missed) < len(where_data):
+                    # prediction doesn't include cached rows. It can happen only once for the model
+                    return self.predict_with_batch_cache(predict, where_data, batch_key)
+                get_cache('predict').set(batch_key, predicted)
+                return predicted, columns_dtypes
+
+            predictor_cache.set_many({
+                keys[i]: row
+                for i, row in zip(missed, predicted)
+            })
+            for i, row in zip(missed, predicted):
+                data[i] = row
+        else:
+            columns_dtypes = dict(pd.DataFrame(data).dtypes)
+
+        # cached rows have row_id of the query where they were predicted
+        for row, input_row in zip(data, where_data):
+            if '__mindsdb_row_id' in row and '__mindsdb_row_id' in input_row:
+                row['__mindsdb_row_id'] = input_row['__mindsdb_row_id']
+
+        return data, columns_dtypes
+
     def apply_ts_filter(self, predictor_data, table_data, step, predictor_metadata):
 
         if step.output_time_filter is None:
@@ -11,6 +11,7 @@ from mindsdb_sql.planner.steps import DeleteStep
 from mindsdb_sql.planner.utils import query_traversal
 
 from mindsdb.api.executor.sql_query.result_set import ResultSet
+from mindsdb.api.executor.utilities.query_cache import query_cache
 
 from .base import BaseStepCall
 
@@ -45,5 +46,6 @@ class DeleteStepCall(BaseStepCall):
         query_traversal(query.where, fill_params)
 
         dn.query(query=query, session=self.session)
+        query_cache.invalidate(integration_name, table_name_parts[-1])
 
         return ResultSet()
@@ -1,3 +1,5 @@
+import pandas as pd
+
 from mindsdb_sql.parser.ast import (
     Identifier,
     Constant,
@@ -11,6 +13,7 @@ from mindsdb_sql.planner.utils import query_traversal
 
 from mindsdb.api.executor.sql_query.result_set import ResultSet, Column
 from mindsdb.api.executor.exceptions import UnknownError
+from mindsdb.api.executor.utilities.query_cache import query_cache
 from mindsdb.interfaces.query_context.context_controller import query_context_controller
 
 from .base import BaseStepCall
@@ -60,10 +63,12 @@ class FetchDataframeStepCall(BaseStepCall):
             table_alias = (self.context.get('database'), 'result', 'result')
 
             # fetch raw_query
-            data, columns_info = dn.query(
+            data, columns_info = self._query(
+                dn,
                 native_query=step.raw_query,
                 session=self.session
             )
+            context_callback = None
         else:
             table_alias = get_table_alias(step.query.from_table, self.context.get('database'))
 
@@ -80,23 +85,60 @@ class FetchDataframeStepCall(BaseStepCall):
 
             query, context_callback = query_context_controller.handle_db_context_vars(query, dn, self.session)
 
-            data, columns_info = dn.query(
-                query=query,
-                session=self.session
-            )
-
-            if context_callback:
-                context_callback(data, columns_info)
-
-        result = ResultSet()
-        for column in columns_info:
-            result.add_column(Column(
-                name=column['name'],
-                type=column.get('type'),
+            cached, cache_key = None, None
+            if (
+                context_callback is None
+                and dn.get_type() == 'integration'
+                # uploaded files are local
+                and step.integration.lower() != 'files'
+                and query_cache.is_enabled(self.session)
+            ):
+                cached, cache_key = query_cache.get(step.integration, query)
+
+            if cached is not None:
+                data, columns_info = cached
+            elif self.sql_query.stream and cache_key is None and context_callback is None and hasattr(dn, 'query_stream'):
+                # result of the query is the result of this step: the rest of batches are sent to client as is
+                data, columns_info, self.sql_query.data_batches = dn.query_stream(
+                    query=query,
+                    session=self.session
+                )
+            else:
+                data, columns_info = self._query(
+                    dn,
+                    query=query,
+                    session=self.session
+                )
+                if cache_key is not None:
+                    query_cache.set(cache_key, data, columns_info)
+
+        if isinstance(data, pd.DataFrame):
+            # keep data in columnar form
+            result = ResultSet().from_df(
+                data,
+                database=table_alias[0],
                 table_name=table_alias[1],
-                table_alias=table_alias[2],
-                database=table_alias[0]
-            ))
-        result.add_records(data)
+                table_alias=table_alias[2]
+            )
+        else:
+            result = ResultSet()
+            for column in columns_info:
+                result.add_column(Column(
+                    name=column['name'],
+                    type=column.get('type'),
+                    table_name=table_alias[1],
+                    table_alias=table_alias[2],
+                    database=table_alias[0]
+                ))
+            result.add_records(data)
+
+        if context_callback:
+            context_callback(result.get_records(), columns_info)
 
         return result
+
+    def _query(self, dn, **kwargs):
+        if hasattr(dn, 'query_df'):
+            # datanode is able to return dataframe
+            return dn.query_df(**kwargs)
+        return dn.query(**kwargs)
@@ -7,6 +7,8 @@ from mindsdb_sql.planner.steps import (
 )
 
 from mindsdb.api.executor.sql_query.result_set import ResultSet, Column
+from mindsdb.api.executor.utilities.query_cache import query_cache
+from mindsdb.api.executor.datahub.metadata_catalog import metadata_catalog
 from mindsdb.api.executor.exceptions import (
     NotSupportedYet,
     LogicError
@@ -86,6 +88,9 @@ class InsertToTableCall(BaseStepCall):
             is_replace=is_replace,
             is_create=is_create
         )
+        query_cache.invalidate(integration_name, table_name.parts[-1])
+        if is_create or is_replace:
+            metadata_catalog.invalidate(integration_name)
         return ResultSet()
 
 
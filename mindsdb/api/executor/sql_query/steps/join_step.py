@@ -1,13 +1,18 @@
 import copy
 
-import numpy as np
-
 from mindsdb_sql.parser.ast import (
+    BinaryOperation,
+    Constant,
     Identifier,
+    Select,
+    Tuple,
 )
 from mindsdb_sql.planner.steps import (
+    FetchDataframeStep,
     JoinStep,
+    SubSelectStep,
 )
+from mindsdb_sql.planner.step_result import Result
 from mindsdb_sql.planner.utils import query_traversal
 from mindsdb_sql.render.sqlalchemy_render import SqlalchemyRender
 
@@ -16,6 +21,162 @@ from mindsdb.api.executor.utilities.sql import query_df_with_type_infer_fallback
 from mindsdb.api.executor.exceptions import NotSupportedYet
 
 from .base import BaseStepCall
+from .fetch_dataframe import get_table_alias
+
+# max count of distinct join keys of the left table which can be pushed to the query of the right table
+MAX_PUSHDOWN_KEYS = 1000
+
+
+def get_equality_conditions(condition):
+    # returns list of pairs of identifiers from condition: 't1.a = t2.b and t1.c = t2.d'
+    if not isinstance(condition, BinaryOperation):
+        return []
+    op = condition.op.lower()
+    if op == 'and':
+        return get_equality_conditions(condition.args[0]) + get_equality_conditions(condition.args[1])
+    if op == '=':
+        arg1, arg2 = condition.args
+        if isinstance(arg1, Identifier) and isinstance(arg2, Identifier) \
+           and len(arg1.parts) == 2 and len(arg2.parts) == 2:
+            return [(arg1, arg2)]
+    return []
+
+
+def get_pushdown_joins(fetch_step, plan_steps, default_db_name) -> list:
+    """
+    Find joins where fetch_step is the right table and join keys of the left table can be pushed
+    to the query of the fetch_step (see push_join_keys)
+
+    :param fetch_step: FetchDataframeStep
+    :param plan_steps: all steps of the plan
+    :param default_db_name: current database
+    :return: list of JoinStep
+    """
+
+    query = fetch_step.query
+    if (
+        not isinstance(query, Select)
+        or not isinstance(query.from_table, Identifier)
+        or query.group_by is not None
+        or query.having is not None
+        or query.limit is not None
+        or query.offset is not None
+        or query.distinct
+    ):
+        return []
+
+    _, table_name, table_alias = get_table_alias(query.from_table, default_db_name)
+    right_names = {table_name.lower(), table_alias.lower()}
+
+    joins = []
+    for step in plan_steps:
+        if not isinstance(step, JoinStep) or step.right.step_num != fetch_step.step_num:
+            continue
+
+        # rows of the right table without pair in the left table are not used only in these joins
+        if step.query.join_type.lower() not in ('join', 'inner join', 'left join'):
+            continue
+
+        if any(
+            (arg1.parts[0].lower() in right_names) != (arg2.parts[0].lower() in right_names)
+            for arg1, arg2 in get_equality_conditions(step.query.condition)
+        ):
+            joins.append(step)
+    return joins
+
+
+def is_small_result(step_num, plan_steps) -> bool:
+    """
+    Result of the step is known to be not bigger than MAX_PUSHDOWN_KEYS rows before its execution:
+    it is a fetch (or a subselect from it) with a limit
+
+    :param step_num: number of the step
+    :param plan_steps: all steps of the plan
+    :return: bool
+    """
+
+    step = next((step for step in plan_steps if step.step_num == step_num), None)
+    if not isinstance(step, (FetchDataframeStep, SubSelectStep)):
+        return False
+
+    limit = step.query.limit if isinstance(step.query, Select) else None
+    if isinstance(limit, Constant) and isinstance(limit.value, int) and limit.value <= MAX_PUSHDOWN_KEYS:
+        return True
+    if isinstance(step, SubSelectStep) and isinstance(step.dataframe, Result):
+        # subselect doesn't make more rows than it gets
+        return is_small_result(step.dataframe.step_num, plan_steps)
+    return False
+
+
+def push_join_keys(fetch_step, plan_steps, steps_data, default_db_name):
+    """
+    If fetch_step is the right table of a join and the left table is already fetched and small,
+    the values of the join key from the left table are added to the query of the fetch_step as filter:
+        select * from table2 where key in (<values from table1>)
+    It prevents fetching the whole table2 from the integration.
+
+    :param fetch_step: FetchDataframeStep which is going to be executed
+    :param plan_steps: all steps of the plan
+    :param steps_data: results of already executed steps
+    :param default_db_name: current database
+    """
+
+    query = fetch_step.query
+    joins = get_pushdown_joins(fetch_step, plan_steps, default_db_name)
+    if len(joins) == 0:
+        return
+
+    _, table_name, table_alias = get_table_alias(query.from_table, default_db_name)
+    right_names = {table_name.lower(), table_alias.lower()}
+
+    for step in joins:
+        if step.left.step_num >= len(steps_data) or steps_data[step.left.step_num] is None:
+            # left table is not fetched yet
+            continue
+
+        left_data = steps_data[step.left.step_num]
+        if left_data.is_prediction or left_data.length() > MAX_PUSHDOWN_KEYS:
+            continue
+
+        filters = []
+        for arg1, arg2 in get_equality_conditions(step.query.condition):
+            is_right1 = arg1.parts[0].lower() in right_names
+            is_right2 = arg2.parts[0].lower() in right_names
+            if is_right1 == is_right2:
+                # both or none of identifiers are from the right table
+                continue
+            if is_right1:
+                arg1, arg2 = arg2, arg1
+
+            cols = left_data.find_columns(arg1.parts[1], arg1.parts[0])
+            if len(cols) != 1:
+                continue
+            col_idx = left_data.columns.index(cols[0])
+
+            values = set()
+            for row in left_data.get_records_raw():
+                value = row[col_idx]
+                if value is None:
+                    continue
+                if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+                    # can't be compared safely on the side of the integration
+                    values = None
+                    break
+                values.add(value)
+
+            if not values:
+                continue
+
+            filters.append(BinaryOperation(op='in', args=[
+                Identifier(parts=[table_alias, arg2.parts[1]]),
+                Tuple([Constant(value) for value in sorted(values, key=str)])
+            ]))
+
+        for condition in filters:
+            if query.where is None:
+                query.where = condition
+            else:
+                query.where = BinaryOperation(op='and', args=[query.where, condition])
 
 
 class JoinStepCall(BaseStepCall):
@@ -76,8 +237,6 @@ class JoinStepCall(BaseStepCall):
             'table_b': table_b
         })
 
-        resp_df = resp_df.replace({np.nan: None})
-
         names_a.update(names_b)
         data = ResultSet().from_df_cols(resp_df, col_names=names_a)
 
@@ -13,6 +13,8 @@ from mindsdb_sql.planner.steps import (
 
 from mindsdb.api.executor.sql_query.result_set import ResultSet
 from mindsdb.api.executor.exceptions import LogicError
+from mindsdb.api.executor.utilities.functions import get_integration_max_workers, get_integration_semaphore
+from mindsdb.utilities.context_executor import ContextThreadPoolExecutor
 
 from .base import BaseStepCall
 from .fetch_dataframe import FetchDataframeStepCall
@@ -77,22 +79,9 @@ class MapReduceStepCall(BaseStepCall):
                 if name != '__mindsdb_row_id':
                     var_group[name] = value
 
-        data = ResultSet()
-
         substep = step.step
         if type(substep) == FetchDataframeStep:
-            query = substep.query
-            for var_group in vars:
-                markQueryVar(query.where)
-                for name, value in var_group.items():
-                    replaceQueryVar(query.where, value, name)
-                sub_data = self._fetch_dataframe_step(substep)
-                if len(data.columns) == 0:
-                    data = sub_data
-                else:
-                    data.add_records(sub_data.get_records())
-
-                unmarkQueryVar(query.where)
+            data = self._reduce_steps([substep], vars)
         elif type(substep) == MultipleSteps:
             data = self._multiple_steps_reduce(substep, vars)
         else:
@@ -103,25 +92,51 @@ class MapReduceStepCall(BaseStepCall):
         if step.reduce != 'union':
             raise LogicError(f'Unknown MultipleSteps type: {step.reduce}')
 
-        data = ResultSet()
-
-        # mark vars
-        steps = []
         for substep in step.steps:
             if isinstance(substep, FetchDataframeStep) is False:
                 raise LogicError(f'Wrong step type for MultipleSteps: {step}')
+
+        return self._reduce_steps(step.steps, vars)
+
+    def _reduce_steps(self, steps, vars):
+        # mark vars
+        steps0 = []
+        for substep in steps:
             substep = copy.deepcopy(substep)
             markQueryVar(substep.query.where)
-            steps.append(substep)
+            steps0.append(substep)
 
+        # make steps for every group of values
+        groups_steps = []
         for var_group in vars:
-            steps2 = copy.deepcopy(steps)
+            steps2 = copy.deepcopy(steps0)
             for name, value in var_group.items():
                 for substep in steps2:
                     replaceQueryVar(substep.query.where, value, name)
-            sub_data = self._multiple_steps(steps2)
-            data = join_query_data(data, sub_data)
+            groups_steps.append(steps2)
+
+        integration_name = steps0[0].integration if len(steps0) > 0 else None
+        max_workers = min(
+            get_integration_max_workers(integration_name),
+            len(groups_steps)
+        )
+        if max_workers > 1:
+            # limit is shared with other queries to the same integration
+            semaphore = get_integration_semaphore(integration_name)
+
+            def fetch(steps):
+                with semaphore:
+                    return self._multiple_steps(steps)
+
+            # results are returned in the order of groups
+            with ContextThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(fetch, groups_steps))
+        else:
+            results = map(self._multiple_steps, groups_steps)
 
+        data = ResultSet()
+        for sub_data in results:
+            data = join_query_data(data, sub_data)
         return data
 
     def _multiple_steps(self, steps):
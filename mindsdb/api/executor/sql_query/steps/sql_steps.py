@@ -57,21 +57,10 @@ class LimitOffsetStepCall(BaseStepCall):
     def call(self, step):
         step_data = self.steps_data[step.dataframe.step_num]
 
-        step_data2 = ResultSet()
-        for col in step_data.columns:
-            step_data2.add_column(col)
+        offset = step.offset if isinstance(step.offset, int) else None
+        limit = step.limit if isinstance(step.limit, int) else None
 
-        records = step_data.get_records_raw()
-
-        if isinstance(step.offset, int):
-            records = records[step.offset:]
-        if isinstance(step.limit, int):
-            records = records[:step.limit]
-
-        for record in records:
-            step_data2.add_record_raw(record)
-
-        return step_data2
+        return step_data.slice(offset=offset, limit=limit)
 
 
 class FilterStepCall(BaseStepCall):
@@ -9,6 +9,7 @@ from mindsdb_sql.planner.utils import query_traversal
 
 from mindsdb.api.executor.sql_query.result_set import ResultSet
 from mindsdb.api.executor.exceptions import WrongArgumentError
+from mindsdb.api.executor.utilities.query_cache import query_cache
 
 from .base import BaseStepCall
 
@@ -86,6 +87,7 @@ class UpdateToTableCall(BaseStepCall):
             if result is None:
                 # run as is
                 dn.query(query=update_query, session=self.session)
+                query_cache.invalidate(integration_name, table_name_parts[-1])
                 return data
             result_data = result.result_data
 
@@ -126,4 +128,5 @@ class UpdateToTableCall(BaseStepCall):
                 param.value = row[param_name]
 
             dn.query(query=update_query, session=self.session)
+        query_cache.invalidate(integration_name, table_name_parts[-1])
         return data
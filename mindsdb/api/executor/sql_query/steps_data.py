@@ -0,0 +1,85 @@
+import os
+import pickle
+import tempfile
+import threading
+from pathlib import Path
+
+from mindsdb.utilities.config import Config
+
+
+class SpilledResult:
+    """ Result of the step which is saved to local file
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self):
+        with open(self.path, 'rb') as fd:
+            return pickle.load(fd)
+
+    def remove(self) -> None:
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+class StepsData(list):
+    """ Results of executed steps of the plan, index is the number of step.
+        Result can be released when it is not needed anymore, or spilled to local file to not keep it
+        in memory until the step which uses it. Spilled result is loaded back on access.
+    """
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self._lock = threading.Lock()
+
+    def __getitem__(self, index):
+        item = super().__getitem__(index)
+        if not isinstance(item, SpilledResult):
+            return item
+        with self._lock:
+            item = super().__getitem__(index)
+            if isinstance(item, SpilledResult):
+                data = item.load()
+                super().__setitem__(index, data)
+                item.remove()
+                return data
+            return item
+
+    def spill(self, index: int) -> None:
+        """ save result of the step to local file and remove it from memory
+
+            Args:
+                index (int): number of the step
+        """
+        with self._lock:
+            data = super().__getitem__(index)
+            if data is None or isinstance(data, SpilledResult):
+                return
+            tmp_dir = Path(Config()['paths']['tmp'])
+            tmp_dir.mkdir(parents=True, exist_ok=True)
+            fd, path = tempfile.mkstemp(prefix='step_result_', dir=tmp_dir)
+            with os.fdopen(fd, 'wb') as file:
+                pickle.dump(data, file, protocol=pickle.HIGHEST_PROTOCOL)
+            super().__setitem__(index, SpilledResult(path))
+
+    def release(self, index: int) -> None:
+        """ remove result of the step
+
+            Args:
+                index (int): number of the step
+        """
+        with self._lock:
+            item = super().__getitem__(index)
+            if isinstance(item, SpilledResult):
+                item.remove()
+            super().__setitem__(index, None)
+
+    def clear_spilled(self) -> None:
+        """ remove all local files of spilled results
+        """
+        with self._lock:
+            for index, item in enumerate(list.__iter__(self)):
+                if isinstance(item, SpilledResult):
+                    item.remove()
+                    super().__setitem__(index, None)
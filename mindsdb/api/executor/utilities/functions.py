@@ -1,9 +1,17 @@
 import urllib
 import tempfile
+import threading
 from pathlib import Path
+from typing import Optional
 
 import requests
 
+from mindsdb.utilities.config import Config
+from mindsdb.utilities.context import context as ctx
+
+_integration_semaphores = {}
+_integration_semaphores_lock = threading.Lock()
+
 
 # def get_column_in_case(columns, name):
 #     '''
@@ -35,3 +43,67 @@ def download_file(url):
     with open(str(temp_file_path), 'wb')as file:
         file.write(response.content)
     return str(temp_file_path)
+
+
+def get_integration_limit(integration_name: str) -> Optional[int]:
+    """ Count of concurrent requests to integration if it is set for the integration in config:
+            "executor": {
+                "integration_max_workers": {"<integration_name>": 4}
+            }
+
+        Args:
+            integration_name (str): name of integration
+
+        Returns:
+            Optional[int]: None if the limit is not set
+    """
+    if integration_name is None:
+        return None
+    per_integration = {
+        name.lower(): value
+        for name, value in Config().get('executor', {}).get('integration_max_workers', {}).items()
+    }
+    max_workers = per_integration.get(integration_name.lower())
+    if max_workers is None:
+        return None
+    return max(int(max_workers), 1)
+
+
+def get_integration_max_workers(integration_name: str) -> int:
+    """ Count of threads which can be used to query integration concurrently.
+        It is defined in config:
+            "executor": {
+                "max_workers": 1,
+                "integration_max_workers": {"<integration_name>": 4}
+            }
+
+        Args:
+            integration_name (str): name of integration
+
+        Returns:
+            int
+    """
+    max_workers = get_integration_limit(integration_name)
+    if max_workers is None:
+        max_workers = Config().get('executor', {}).get('max_workers', 1)
+    return max(int(max_workers), 1)
+
+
+def get_integration_semaphore(integration_name: str) -> threading.BoundedSemaphore:
+    """ Semaphore which limits concurrent requests to integration from all queries of the process
+        by 'get_integration_max_workers'
+
+        Args:
+            integration_name (str): name of integration
+
+        Returns:
+            threading.BoundedSemaphore
+    """
+    max_workers = get_integration_max_workers(integration_name)
+    key = (ctx.company_id, (integration_name or '').lower(), max_workers)
+    with _integration_semaphores_lock:
+        semaphore = _integration_semaphores.get(key)
+        if semaphore is None:
+            semaphore = threading.BoundedSemaphore(max_workers)
+            _integration_semaphores[key] = semaphore
+    return semaphore
@@ -0,0 +1,155 @@
+"""
+Cache of results of queries to integrations (FetchDataframeStep).
+
+It is disabled by default and can be enabled in config:
+    "query_cache": {
+        "enabled": true,
+        "type": "local",                 # or "redis", by default the type of "cache" section is used
+        "ttl": 60,                       # lifetime of the record in seconds
+        "integrations_ttl": {"pg": 600}, # lifetime for specific integrations
+        "max_bytes": 536870912,          # size of cache, least recently used records are removed first
+        "max_records": 1000
+    }
+or for the session:
+    SET query_cache = 1;
+
+Key of the record is integration name + rendered query + versions of the tables used in the query.
+Version of the table is changed when mindsdb writes into it (insert, update, delete, drop),
+so after the writing old records of the table are not used anymore and are removed by LRU.
+"""
+
+import time
+import typing as t
+
+from mindsdb_sql.parser.ast import Identifier
+from mindsdb_sql.planner.utils import query_traversal
+
+from mindsdb.utilities.config import Config
+from mindsdb.utilities.context import context as ctx
+from mindsdb.utilities.cache import FileCache, RedisCache, NoCache, get_versions, str_checksum
+from mindsdb.utilities import log
+
+logger = log.getLogger(__name__)
+
+
+def get_query_tables(query) -> t.List[str]:
+    """ get names of tables used in the query
+
+        Args:
+            query (ASTNode): query to integration
+
+        Returns:
+            List[str]: lowercased names of tables without schema
+    """
+    tables = []
+
+    def find_tables(node, is_table, **kwargs):
+        if is_table and isinstance(node, Identifier):
+            tables.append(node.parts[-1].lower())
+
+    query_traversal(query, find_tables)
+    return sorted(set(tables))
+
+
+class QueryCache:
+    """ Cache of results of queries to integrations
+    """
+
+    def __init__(self):
+        config = Config().get('query_cache', {})
+        self.enabled = config.get('enabled', False)
+        self.type = config.get('type') or Config()['cache']['type']
+        self.ttl = config.get('ttl', 60)
+        self.integrations_ttl = {
+            name.lower(): value
+            for name, value in config.get('integrations_ttl', {}).items()
+        }
+        self.max_bytes = config.get('max_bytes')
+        self.max_records = config.get('max_records', 1000)
+
+    def is_enabled(self, session) -> bool:
+        """ cache can be enabled or disabled for the session with 'SET query_cache'
+        """
+        session_value = getattr(session, 'query_cache', None)
+        if session_value is not None:
+            return session_value
+        return self.enabled
+
+    def _get_cache(self, category: str = 'query_results', **kwargs):
+        if self.type == 'redis':
+            return RedisCache(category, **kwargs)
+        if self.type == 'none':
+            return NoCache()
+        return FileCache(category, **kwargs)
+
+    def _get_versions(self):
+        # versions are never evicted: missing version must mean that table was never changed
+        return get_versions('query_results', self.type)
+
+    def _version_key(self, integration_name: str, table_name: str) -> str:
+        # FileCache is already namespaced by company, RedisCache is not
+        return str_checksum(f'{ctx.company_id}|{integration_name.lower()}|{table_name.lower()}')
+
+    def _get_key(self, integration_name: str, query_str: str, tables: t.List[str]) -> str:
+        versions = self._get_versions().get_many([
+            self._version_key(integration_name, table) for table in tables
+        ])
+        return str_checksum(f'{ctx.company_id}|{integration_name.lower()}|{query_str}|{versions}')
+
+    def get_ttl(self, integration_name: str) -> int:
+        return self.integrations_ttl.get(integration_name.lower(), self.ttl)
+
+    def get(self, integration_name: str, query) -> t.Tuple[t.Optional[tuple], t.Optional[str]]:
+        """ find result of the query in the cache
+
+            Args:
+                integration_name (str): name of integration
+                query (ASTNode): query to integration
+
+            Returns:
+                Tuple[Optional[tuple], Optional[str]]: cached (data, columns_info) or None
+                    and the key to save the result with, None if the query can not be cached
+        """
+        try:
+            key = self._get_key(integration_name, query.to_string(), get_query_tables(query))
+            record = self._get_cache(max_size=self.max_records, max_bytes=self.max_bytes).get(key)
+        except Exception as e:
+            logger.warning(f'Unable to read query result from cache: {e}')
+            return None, None
+        if record is None:
+            return None, key
+        if time.time() - record['created_at'] > self.get_ttl(integration_name):
+            return None, key
+        return (record['data'], record['columns_info']), key
+
+    def set(self, key: str, data, columns_info: list) -> None:
+        """ save result of the query
+
+            Args:
+                key (str): key returned by 'get'
+                data: result of the query, dataframe or list of records
+                columns_info (list): columns of the result
+        """
+        try:
+            self._get_cache(max_size=self.max_records, max_bytes=self.max_bytes).set(key, {
+                'created_at': time.time(),
+                'data': data,
+                'columns_info': columns_info
+            })
+        except Exception as e:
+            logger.warning(f'Unable to save query result to cache: {e}')
+
+    def invalidate(self, integration_name: str, table_name: str) -> None:
+        """ change version of the table, existing records with the table will not be used anymore
+
+            Args:
+                integration_name (str): name of integration
+                table_name (str): name of the table, schema is not used
+        """
+        try:
+            self._get_versions().bump(self._version_key(integration_name, table_name))
+        except Exception as e:
+            logger.warning(f'Unable to invalidate query cache: {e}')
+
+
+query_cache = QueryCache()
@@ -1,4 +1,5 @@
 import copy
+import threading
 
 import duckdb
 from duckdb import InvalidInputException
@@ -17,11 +18,34 @@ from mindsdb.utilities.json_encoder import CustomJSONEncoder
 
 logger = log.getLogger(__name__)
 
+# count of rows which duckdb uses to infer type of object column
+DEFAULT_ANALYZE_SAMPLE = 1000
+# max count of rows to infer type if default sample is not sufficient
+MAX_ANALYZE_SAMPLE = 1000000
+
+
+_duckdb_local = threading.local()
+
+
+def get_duckdb_connection():
+    """ Returns in-memory duckdb connection of the current thread.
+        It is reused by all internal queries executed in the thread, instead of opening
+        a new connection for each of them
+
+        Returns:
+            duckdb.DuckDBPyConnection
+    """
+    con = getattr(_duckdb_local, 'connection', None)
+    if con is None:
+        con = duckdb.connect(database=':memory:')
+        _duckdb_local.connection = con
+    return con
+
 
 def query_df_with_type_infer_fallback(query_str: str, dataframes: dict):
     ''' Duckdb need to infer column types if column.dtype == object. By default it take 1000 rows,
-        but that may be not sufficient for some cases. This func try to run query multiple times
-        increasing butch size for type infer
+        but that may be not sufficient for some cases. In this case query is repeated once with
+        the sample size which covers all rows of the dataframes (but not more than MAX_ANALYZE_SAMPLE)
 
         Args:
             query_str (str): query to execute
@@ -32,22 +56,34 @@ def query_df_with_type_infer_fallback(query_str: str, dataframes: dict):
             pandas.columns
     '''
 
+    con = get_duckdb_connection()
     for name, value in dataframes.items():
-        locals()[name] = value
-
-    con = duckdb.connect(database=':memory:')
-    for sample_size in [1000, 10000, 1000000]:
-        try:
-            con.execute(f'set global pandas_analyze_sample={sample_size};')
-            result_df = con.execute(query_str).fetchdf()
-        except InvalidInputException:
-            pass
+        # dataframes are scanned by duckdb without copying
+        con.register(name, value)
+
+    max_length = max([len(df) for df in dataframes.values()], default=0)
+    sample_sizes = [DEFAULT_ANALYZE_SAMPLE]
+    if max_length > DEFAULT_ANALYZE_SAMPLE:
+        sample_sizes.append(min(max_length, MAX_ANALYZE_SAMPLE))
+
+    try:
+        for sample_size in sample_sizes:
+            try:
+                if sample_size != DEFAULT_ANALYZE_SAMPLE:
+                    con.execute(f'set global pandas_analyze_sample={sample_size};')
+                result_df = con.execute(query_str).fetchdf()
+            except InvalidInputException:
+                pass
+            else:
+                break
         else:
-            break
-    else:
-        raise InvalidInputException
-    description = con.description
-    con.close()
+            raise InvalidInputException
+        description = con.description
+    finally:
+        for name in dataframes.keys():
+            con.unregister(name)
+        if len(sample_sizes) > 1:
+            con.execute(f'set global pandas_analyze_sample={DEFAULT_ANALYZE_SAMPLE};')
 
     return result_df, description
 
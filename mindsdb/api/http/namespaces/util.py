@@ -16,6 +16,7 @@ from mindsdb.utilities.telemetry import (
 )
 from mindsdb.api.http.gui import update_static
 from mindsdb.utilities.fs import clean_unlinked_process_marks
+from mindsdb.interfaces.model.model_warmup import model_warmup
 from mindsdb.api.http.utils import http_error
 
 
@@ -83,6 +84,17 @@ class ReadinessProbe(Resource):
         return '', 200
 
 
+@ns_conf.route('/readiness/models')
+class ModelsReadinessProbe(Resource):
+    @ns_conf.doc('get_models_ready')
+    def get(self):
+        '''Checks recently used models are loaded into ML processes of all API processes'''
+        status = model_warmup.get_status()
+        if status['ready'] is False:
+            return status, 503
+        return status, 200
+
+
 @ns_conf.route('/ping_native')
 class PingNative(Resource):
     @ns_conf.doc('get_ping_native')
@@ -93,6 +105,14 @@ class PingNative(Resource):
         return get_active_tasks()
 
 
+@ns_conf.route('/handlers_cache')
+class HandlersCacheMetrics(Resource):
+    @ns_conf.doc('get_handlers_cache')
+    def get(self):
+        '''Returns state of data handlers connections pools'''
+        return ca.integration_controller.handlers_cache.get_metrics()
+
+
 @ns_conf.route('/telemetry')
 class Telemetry(Resource):
     @ns_conf.doc('get_telemetry_status')
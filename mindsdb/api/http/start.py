@@ -12,6 +12,7 @@ from mindsdb.utilities import log
 from mindsdb.utilities.config import Config
 from mindsdb.utilities.functions import init_lexer_parsers
 from mindsdb.integrations.libs.ml_exec_base import process_cache
+from mindsdb.interfaces.model.model_warmup import model_warmup
 
 logger = log.getLogger(__name__)
 
@@ -29,6 +30,7 @@ def start(verbose, no_studio):
     host = config['api']['http']['host']
 
     process_cache.init()
+    model_warmup.start()
 
     if server.lower() == "waitress":
         logger.debug("Serving HTTP app with waitress..")
@@ -3,6 +3,7 @@ from mindsdb.interfaces.storage import db
 from mindsdb.utilities import log
 from mindsdb.utilities.config import Config
 from mindsdb.utilities.functions import init_lexer_parsers
+from mindsdb.interfaces.model.model_warmup import model_warmup
 
 
 def start(verbose=False):
@@ -11,5 +12,6 @@ def start(verbose=False):
     config = Config()
     db.init()
     init_lexer_parsers()
+    model_warmup.start(warm_shared=False)
 
     run_server(config)
@@ -2,8 +2,10 @@ from mindsdb_sql import parse_sql
 from mindsdb_sql.planner import utils as planner_utils
 
 import mindsdb.utilities.profiler as profiler
-from mindsdb.api.executor import Column, SQLQuery
+from mindsdb.api.executor import Column
 from mindsdb.api.executor.command_executor import ExecuteCommands
+from mindsdb.api.executor.sql_query.prepared_statement import PreparedStatement
+from mindsdb.api.executor.sql_query.plan_cache import plan_cache
 from mindsdb.api.mysql.mysql_proxy.utilities import ErSqlSyntaxError
 from mindsdb.utilities import log
 
@@ -30,6 +32,8 @@ class Executor:
         self.sqlserver = sqlserver
 
         self.query = None
+        self.prepared_statement = None
+        self.stmt_executions = 0
 
         # returned values
         # all this attributes needs to be added in
@@ -37,6 +41,8 @@ class Executor:
         self.columns = []
         self.params = []
         self.data = None
+        # next batches of rows, if result is streamed
+        self.data_batches = None
         self.state_track = None
         self.server_status = None
         self.is_executed = False
@@ -71,13 +77,8 @@ class Executor:
             self.do_execute()
 
         else:
-            # plan query
-            # TODO less complex.
-            #  planner is inside SQLQuery now.
-
-            sqlquery = SQLQuery(self.query, session=self.session, execute=False)
-
-            sqlquery.prepare_query()
+            # plan query once, it is re-bound with parameters at every execution
+            self.prepared_statement = PreparedStatement(self.query, self.session)
 
             self.params = [
                 Column(
@@ -90,20 +91,22 @@ class Executor:
 
             # TODO:
             #   select * from mindsdb.models doesn't invoke prepare_steps and columns_list is empty
-            self.columns = sqlquery.columns_list
+            self.columns = self.prepared_statement.columns
 
     def stmt_execute(self, param_values):
-        if self.is_executed:
-            return
-
-        # fill params
-        self.query = planner_utils.fill_query_params(self.query, param_values)
-
-        # execute query
-        self.do_execute()
+        if self.prepared_statement is None:
+            # statement without parameters is executed at prepare stage, execute it again next time
+            if self.stmt_executions > 0:
+                self.is_executed = False
+                self.do_execute()
+        else:
+            ret = self.prepared_statement.execute(param_values, self.command_executor)
+            self.is_executed = True
+            self._set_answer(ret)
+        self.stmt_executions += 1
 
     @profiler.profile()
-    def query_execute(self, sql):
+    def query_execute(self, sql, stream=False):
         logger.info("%s.query_execute: sql - %s", self.__class__.__name__, sql)
         # resp = self.execute_external(sql)
         # if resp is not None:
@@ -112,7 +115,7 @@ class Executor:
         #     return
 
         self.parse(sql)
-        self.do_execute()
+        self.do_execute(stream=stream)
 
     # for awesome Mongo API only
     # def binary_query_execute(self, sql):
@@ -143,7 +146,7 @@ class Executor:
         self.sql_lower = sql_lower.replace("`", "")
 
         try:
-            self.query = parse_sql(sql, dialect="mindsdb")
+            self.query = plan_cache.parse(sql, dialect="mindsdb")
         except Exception as mdb_error:
             try:
                 self.query = parse_sql(sql, dialect="mysql")
@@ -159,19 +162,22 @@ class Executor:
                 # or run sql in integration without parsing
 
     @profiler.profile()
-    def do_execute(self):
+    def do_execute(self, stream=False):
         # it can be already run at prepare state
         logger.info("%s.do_execute", self.__class__.__name__)
         if self.is_executed:
             return
 
-        ret = self.command_executor.execute_command(self.query)
+        ret = self.command_executor.execute_command(self.query, stream=stream)
+        self.is_executed = True
+        self._set_answer(ret)
+
+    def _set_answer(self, ret):
         self.error_code = ret.error_code
         self.error_message = ret.error_message
 
-        self.is_executed = True
-
         self.data = ret.data
+        self.data_batches = ret.data_batches
         self.server_status = ret.status
         if ret.columns is not None:
             self.columns = ret.columns
@@ -21,7 +21,7 @@ import sys
 import tempfile
 import traceback
 from functools import partial
-from typing import Dict, List
+from typing import Dict, Iterator, List
 
 from numpy import dtype as np_dtype
 from pandas.api import types as pd_types
@@ -83,6 +83,9 @@ from mindsdb.utilities.wizards import make_ssl_cert
 
 logger = log.getLogger(__name__)
 
+# count of rows packets which are sent to the client at once
+SEND_ROWS_CHUNK_SIZE = 1000
+
 
 def empty_fn():
     pass
@@ -129,10 +132,13 @@ class SQLAnswer:
         state_track: List[List] = None,
         error_code: int = None,
         error_message: str = None,
+        data_batches: Iterator[List] = None,
     ):
         self.resp_type = resp_type
         self.columns = columns
         self.data = data
+        # next batches of rows if the result is streamed, 'data' is the first batch
+        self.data_batches = data_batches
         self.status = status
         self.state_track = state_track
         self.error_code = error_code
@@ -345,13 +351,26 @@ class MysqlProxy(SocketServer.BaseRequestHandler):
 
     def send_query_answer(self, answer: SQLAnswer):
         if answer.type == RESPONSE_TYPE.TABLE:
-            packages = []
-            packages += self.get_tabel_packets(columns=answer.columns, data=answer.data)
+            # length of values of streamed result is unknown
+            self.send_package_group(
+                self.get_tabel_header_packets(
+                    columns=answer.columns,
+                    data=answer.data if answer.data_batches is None else None
+                )
+            )
+            try:
+                self.send_rows(answer.data)
+                for data in answer.data_batches or []:
+                    self.send_rows(data)
+            except Exception as e:
+                # header is already sent, error packet finishes the result
+                logger.error(f'Error while sending the result: {e}')
+                self.packet(ErrPacket, err_code=ERR.ER_UNKNOWN_ERROR, msg=str(e)).send()
+                return
             if answer.status is not None:
-                packages.append(self.last_packet(status=answer.status))
+                self.send_package_group([self.last_packet(status=answer.status)])
             else:
-                packages.append(self.last_packet())
-            self.send_package_group(packages)
+                self.send_package_group([self.last_packet()])
         elif answer.type == RESPONSE_TYPE.OK:
             self.packet(OkPacket, state_track=answer.state_track).send()
         elif answer.type == RESPONSE_TYPE.ERROR:
@@ -359,6 +378,15 @@ class MysqlProxy(SocketServer.BaseRequestHandler):
                 ErrPacket, err_code=answer.error_code, msg=answer.error_message
             ).send()
 
+    def send_rows(self, data):
+        # send rows by chunks, to not keep packets for all rows in memory
+        data = data or []
+        for i in range(0, len(data), SEND_ROWS_CHUNK_SIZE):
+            self.send_package_group([
+                self.packet(ResultsetRowPacket, data=x)
+                for x in data[i:i + SEND_ROWS_CHUNK_SIZE]
+            ])
+
     def _get_column_defenition_packets(self, columns, data=None):
         if data is None:
             data = []
@@ -400,15 +428,13 @@ class MysqlProxy(SocketServer.BaseRequestHandler):
             )
         return packets
 
-    def get_tabel_packets(self, columns, data, status=0):
+    def get_tabel_header_packets(self, columns, data, status=0):
         # TODO remove columns order
         packets = [self.packet(ColumnCountPacket, count=len(columns))]
         packets.extend(self._get_column_defenition_packets(columns, data))
 
         if self.client_capabilities.DEPRECATE_EOF is False:
             packets.append(self.packet(EofPacket, status=status))
-
-        packets += [self.packet(ResultsetRowPacket, data=x) for x in data]
         return packets
 
     def decode_utf(self, text):
@@ -524,7 +550,7 @@ class MysqlProxy(SocketServer.BaseRequestHandler):
     def process_query(self, sql):
         executor = Executor(session=self.session, sqlserver=self)
 
-        executor.query_execute(sql)
+        executor.query_execute(sql, stream=True)
 
         if executor.data is None:
             resp = SQLAnswer(
@@ -538,6 +564,7 @@ class MysqlProxy(SocketServer.BaseRequestHandler):
                 columns=self.to_mysql_columns(executor.columns),
                 data=executor.data,
                 status=executor.server_status,
+                data_batches=executor.data_batches,
             )
         return resp
 
@@ -578,6 +605,7 @@ class MysqlProxy(SocketServer.BaseRequestHandler):
         executor = prepared_stmt["statement"]
 
         executor.stmt_execute(parameters)
+        prepared_stmt["fetched"] = 0
 
         if executor.data is None:
             resp = SQLAnswer(
@@ -851,6 +879,8 @@ class MysqlProxy(SocketServer.BaseRequestHandler):
             self.session.profiling = context["profiling"]
         if "predictor_cache" in context:
             self.session.predictor_cache = context["predictor_cache"]
+        if "query_cache" in context:
+            self.session.query_cache = context["query_cache"]
 
     def get_context(self, context):
         context = {}
@@ -860,6 +890,8 @@ class MysqlProxy(SocketServer.BaseRequestHandler):
             context["profiling"] = True
         if self.session.predictor_cache is False:
             context["predictor_cache"] = False
+        if self.session.query_cache is not None:
+            context["query_cache"] = self.session.query_cache
 
         return context
 
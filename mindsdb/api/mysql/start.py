@@ -2,6 +2,7 @@ import mindsdb.interfaces.storage.db as db
 from mindsdb.api.mysql.mysql_proxy.mysql_proxy import MysqlProxy
 from mindsdb.utilities import log
 from mindsdb.utilities.functions import init_lexer_parsers
+from mindsdb.interfaces.model.model_warmup import model_warmup
 
 
 def start(verbose=False):
@@ -9,5 +10,6 @@ def start(verbose=False):
     logger.info("MySQL API is starting..")
     db.init()
     init_lexer_parsers()
+    model_warmup.start(warm_shared=False)
 
     MysqlProxy.startProxy()
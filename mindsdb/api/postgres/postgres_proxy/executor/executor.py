@@ -1,18 +1,40 @@
+import re
+import struct
 from typing import Union
 
 from mindsdb_sql import parse_sql
+from mindsdb_sql.parser.ast import Identifier, Parameter
 from mindsdb_sql.planner import utils as planner_utils
 
 from numpy import dtype as np_dtype
 from pandas.api import types as pd_types
 
-from mindsdb.api.executor import SQLQuery, Column
+from mindsdb.api.executor import Column
 from mindsdb.api.mysql.mysql_proxy.utilities.lightwood_dtype import dtype
 from mindsdb.api.executor.command_executor import ExecuteCommands
+from mindsdb.api.executor.sql_query.prepared_statement import PreparedStatement
+from mindsdb.api.executor.sql_query.plan_cache import plan_cache
 from mindsdb.api.mysql.mysql_proxy.utilities import SqlApiException
 from mindsdb.api.postgres.postgres_proxy.postgres_packets.postgres_fields import POSTGRES_TYPES
 from mindsdb.utilities import log
 
+# binary formats of parameters by type oid
+BINARY_NUMBER_FORMATS = {
+    20: '!q',   # int8
+    21: '!h',   # int2
+    23: '!i',   # int4
+    700: '!f',  # float4
+    701: '!d',  # float8
+}
+BINARY_BOOL_TYPE = 16
+BINARY_TEXT_TYPES = (
+    18,    # char
+    19,    # name
+    25,    # text
+    1042,  # bpchar
+    1043,  # varchar
+)
+
 
 class Executor:
     def __init__(self, session, proxy_server, charset=None):
@@ -22,9 +44,14 @@ class Executor:
         self.logger = log.getLogger(__name__)
         self.charset = charset or "utf8"
         self.query = None
+        self.prepared_statement = None
+        # numbers of positional parameters ($1, $2, ...) in order of their appearance in the query
+        self.param_positions = []
         self.columns = []
         self.params = []
         self.data = None
+        # next batches of rows, if result is streamed
+        self.data_batches = None
         self.server_status = None
         self.state_track = None
         self.is_executed = False
@@ -43,7 +70,7 @@ class Executor:
         self.sql_lower = sql_lower.replace("`", "")
 
         try:
-            self.query = parse_sql(sql, dialect="mindsdb")
+            self.query = plan_cache.parse(sql, dialect="mindsdb")
         except Exception as mdb_error:
             try:
                 self.query = parse_sql(sql, dialect="mysql")
@@ -55,20 +82,75 @@ class Executor:
                     f"SQL statement cannot be parsed by mindsdb_sql - {sql}: {mdb_error}"
                 ) from mdb_error
 
-    def stmt_execute(self, param_values):
-        if self.is_executed:
-            return
+    def decode_param(self, value, format_code: int, type_oid: int):
+        """ convert value of parameter received by Bind message
+
+            Args:
+                value (bytes): value of parameter, None is NULL
+                format_code (int): 0 - text, 1 - binary
+                type_oid (int): type of parameter from Parse message, 0 if it is not specified
+
+            Returns:
+                value of parameter, binary value of unknown type is returned as bytes
+        """
+        if not isinstance(value, bytes):
+            return value
+        if format_code == 0:
+            return value.decode(self.charset)
+        if type_oid in BINARY_TEXT_TYPES:
+            return value.decode(self.charset)
+        if type_oid == BINARY_BOOL_TYPE:
+            return value != b'\x00'
+        if type_oid in BINARY_NUMBER_FORMATS:
+            return struct.unpack(BINARY_NUMBER_FORMATS[type_oid], value)[0]
+        return value
+
+    def stmt_execute(self, param_values, format_codes=None, param_types=None):
+        """ execute prepared statement
+
+            Args:
+                param_values (list): values of parameters from Bind message
+                format_codes (list): format codes of parameters from Bind message: none - all are text,
+                    one - it is used for all parameters, or code for every parameter
+                param_types (list): types of parameters from Parse message
+        """
+        if self.prepared_statement is None:
+            # statement without parameters can be executed several times
+            self.is_executed = False
+            self.do_execute()
+        else:
+            format_codes = format_codes or [0]
+            if len(format_codes) == 1:
+                format_codes = format_codes * len(param_values)
+            param_types = param_types or []
+            param_values = [
+                self.decode_param(
+                    value, format_codes[i], param_types[i] if i < len(param_types) else 0
+                )
+                for i, value in enumerate(param_values)
+            ]
+            if len(self.param_positions) > 0:
+                param_values = [param_values[i] for i in self.param_positions]
+            ret = self.prepared_statement.execute(param_values, self.command_executor)
+            self.is_executed = True
+            self._set_answer(ret)
 
-        # fill params
-        self.query = planner_utils.fill_query_params(self.query, param_values)
+    def replace_positional_params(self):
+        # postgres clients use $1, $2, ... as parameters, they are parsed as identifiers
+        def replace(node, **kwargs):
+            if isinstance(node, Identifier) and len(node.parts) == 1:
+                match = re.fullmatch(r'\$(\d+)', node.parts[0])
+                if match is not None:
+                    self.param_positions.append(int(match.group(1)) - 1)
+                    return Parameter('?')
 
-        # execute query
-        self.do_execute()
+        self.param_positions = []
+        planner_utils.query_traversal(self.query, replace)
 
     def execute_external(self, sql):
         return None
 
-    def query_execute(self, sql):
+    def query_execute(self, sql, stream=False):
         self.logger.info("%s.query_execute: sql - %s", self.__class__.__name__, sql)
         resp = self.execute_external(sql)
         if resp is not None:
@@ -77,19 +159,22 @@ class Executor:
             return
 
         self.parse(sql)
-        self.do_execute()
+        self.do_execute(stream=stream)
 
-    def do_execute(self):
+    def do_execute(self, stream=False):
         self.logger.info("%s.do_execute", self.__class__.__name__)
         # it can be already run at prepare state
         if self.is_executed:
             return
 
-        ret = self.command_executor.execute_command(self.query)
+        ret = self.command_executor.execute_command(self.query, stream=stream)
 
         self.is_executed = True
+        self._set_answer(ret)
 
+    def _set_answer(self, ret):
         self.data = ret.data
+        self.data_batches = ret.data_batches
         self.server_status = ret.status
         if ret.columns is not None:
             self.columns = ret.columns
@@ -168,17 +253,15 @@ class Executor:
         # Returns True if ready for query afterwards.
         # Check if execute external here
         self.parse(sql)
+        self.replace_positional_params()
         params = planner_utils.get_query_params(self.query)
         if len(params) == 0:
             pass
         #    self.do_execute()
         #    return True
         else:
-            # plan query
-
-            sqlquery = SQLQuery(self.query, session=self.session, execute=False)
-
-            sqlquery.prepare_query()
+            # plan query once, it is re-bound with parameters at every execution
+            self.prepared_statement = PreparedStatement(self.query, self.session)
 
             self.params = [
                 Column(
@@ -188,4 +271,4 @@ class Executor:
                 )
                 for p in params
             ]
-            self.columns = sqlquery.columns_list
+            self.columns = self.prepared_statement.columns
@@ -320,3 +320,4 @@ POSTGRES_ERROR_CODES = {
     }
 }
 POSTGRES_SYNTAX_ERROR_CODE = POSTGRES_ERROR_CODES["CLASS_42"]["syntax_error"]
+POSTGRES_INTERNAL_ERROR_CODE = POSTGRES_ERROR_CODES["CLASS_XX"]["internal_error"]
@@ -15,8 +15,10 @@ from mindsdb.api.postgres.postgres_proxy.executor import Executor
 from mindsdb.api.mysql.mysql_proxy.libs.constants.mysql import CHARSET_NUMBERS
 from mindsdb.api.executor.data_types.response_type import RESPONSE_TYPE
 from mindsdb.api.common.check_auth import check_auth
-from mindsdb.api.mysql.mysql_proxy.mysql_proxy import SQLAnswer
-from mindsdb.api.postgres.postgres_proxy.postgres_packets.errors import POSTGRES_SYNTAX_ERROR_CODE
+from mindsdb.api.mysql.mysql_proxy.mysql_proxy import SQLAnswer, SEND_ROWS_CHUNK_SIZE
+from mindsdb.api.postgres.postgres_proxy.postgres_packets.errors import (
+    POSTGRES_SYNTAX_ERROR_CODE, POSTGRES_INTERNAL_ERROR_CODE
+)
 from mindsdb.api.postgres.postgres_proxy.postgres_packets.postgres_fields import GenericField, PostgresField
 from mindsdb.api.postgres.postgres_proxy.postgres_packets.postgres_message_formats import Terminate, \
     Query, AuthenticationClearTextPassword, AuthenticationOk, RowDescriptions, DataRow, CommandComplete, \
@@ -183,7 +185,7 @@ class PostgresProxyHandler(socketserver.StreamRequestHandler):
         if message.describe_type == b'P':
             if message.name:
                 describing = self.named_portals[message.name]
-            elif self.unnamed_statement:
+            elif self.unnamed_portal:
                 describing = self.unnamed_portal
             else:
                 self.send(InvalidSQLStatementName("Portal Does not Exist"))
@@ -201,7 +203,8 @@ class PostgresProxyHandler(socketserver.StreamRequestHandler):
             self.send(DataException(message="Describe did not have correct type. Can be 'P' or 'S'"))
             return True
 
-        fields = self.to_postgres_fields(describing["executor"].columns)
+        executor = describing["executor"]
+        fields = self.to_postgres_fields(executor.to_postgres_columns(executor.columns))
         self.send(RowDescriptions(fields=fields))
         return True
 
@@ -215,8 +218,12 @@ class PostgresProxyHandler(socketserver.StreamRequestHandler):
             self.send(InvalidSQLStatementName("Portal does not exist"))
 
         executor = portal["executor"]
-        params = portal["bind"].parameters
-        executor.stmt_execute(param_values=params)
+        bind = portal["bind"]
+        executor.stmt_execute(
+            param_values=bind.parameters,
+            format_codes=bind.format_codes,
+            param_types=portal["parse"].parameters
+        )
         sql_answer = self.return_executor_data(executor)
         self.respond_from_sql_answer(sql=executor.sql, sql_answer=sql_answer, row_descs=False)
         return True
@@ -258,7 +265,7 @@ class PostgresProxyHandler(socketserver.StreamRequestHandler):
         )
         self.logger.debug("processing query\n%s", sql)
         try:
-            executor.query_execute(sql)
+            executor.query_execute(sql, stream=True)
         except Exception as e:
             return SQLAnswer(
                 resp_type=RESPONSE_TYPE.ERROR,
@@ -279,7 +286,8 @@ class PostgresProxyHandler(socketserver.StreamRequestHandler):
                 state_track=executor.state_track,
                 columns=executor.to_postgres_columns(executor.columns),
                 data=executor.data,
-                status=executor.server_status
+                status=executor.server_status,
+                data_batches=executor.data_batches
             )
         return resp
 
@@ -353,15 +361,33 @@ class PostgresProxyHandler(socketserver.StreamRequestHandler):
 
     def return_table(self, sql_answer: SQLAnswer, row_descs=True):
         fields = self.to_postgres_fields(sql_answer.columns)
-        rows = self.to_postgres_rows(sql_answer.data)
         if row_descs:
             self.send(RowDescriptions(fields=fields))
-        self.send(DataRow(rows=rows))
         encoding = self.get_encoding()
-        tag = ('SELECT %s' % str(len(rows))).encode(encoding)
+        count = self.send_rows(sql_answer.data)
+        try:
+            for data in sql_answer.data_batches or []:
+                count += self.send_rows(data)
+        except Exception as e:
+            # rows are already sent, error finishes the result
+            self.logger.error(f'Error while sending the result: {e}')
+            self.send(Error.from_answer(
+                error_code=POSTGRES_INTERNAL_ERROR_CODE.encode(encoding),
+                error_message=str(e).encode(encoding)
+            ))
+            return True
+        tag = ('SELECT %s' % str(count)).encode(encoding)
         self.send(CommandComplete(tag=tag))
         return True
 
+    def send_rows(self, data) -> int:
+        # convert and send rows by chunks, to not keep encoded copy of all rows in memory
+        data = data or []
+        for i in range(0, len(data), SEND_ROWS_CHUNK_SIZE):
+            rows = self.to_postgres_rows(data[i:i + SEND_ROWS_CHUNK_SIZE])
+            self.send(DataRow(rows=rows))
+        return len(data)
+
     def return_error(self, sql_answer: SQLAnswer):
         self.send(Error.from_answer(error_code=sql_answer.error_code, error_message=sql_answer.error_message))
         return True
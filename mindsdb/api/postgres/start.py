@@ -1,11 +1,13 @@
 import mindsdb.interfaces.storage.db as db
 from mindsdb.api.postgres.postgres_proxy.postgres_proxy import PostgresProxyHandler
 from mindsdb.utilities import log
+from mindsdb.interfaces.model.model_warmup import model_warmup
 
 
 def start(verbose=False):
     logger = log.getLogger(__name__)
     logger.info("Postgres API is starting..")
     db.init()
+    model_warmup.start(warm_shared=False)
 
     PostgresProxyHandler.startProxy()
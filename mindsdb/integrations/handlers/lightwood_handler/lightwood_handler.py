@@ -2,7 +2,6 @@ import copy
 import json
 import sys
 from datetime import datetime
-from functools import lru_cache
 from typing import Dict, Optional
 
 import lightwood
@@ -45,6 +44,8 @@ class NumpyJSONEncoder(json.JSONEncoder):
 
 class LightwoodHandler(BaseMLEngine):
     name = 'lightwood'
+    _predictor = None
+    _predictor_key = None
 
     @staticmethod
     def create_validation(target, args=None, **kwargs):
@@ -85,11 +86,28 @@ class LightwoodHandler(BaseMLEngine):
     ) -> None:
         run_finetune(df, args, self.model_storage)
 
-    @staticmethod
-    @lru_cache(maxsize=5)
-    def get_predictor(predictor_path, predictor_code):
-        predictor = lightwood.predictor_from_state(predictor_path, predictor_code)
-        return predictor
+    def get_predictor(self, predictor_code):
+        """ load predictor from model storage. It is kept in the handler until close(),
+            the handler itself is cached by ML handlers cache of the process
+        """
+        self.model_storage.fileStorage.pull()
+        predictor_path = (
+            self.model_storage.fileStorage.folder_path
+            / self.model_storage.fileStorage.folder_name
+        )
+        key = (str(predictor_path), predictor_code)
+        if self._predictor is None or self._predictor_key != key:
+            self._predictor = lightwood.predictor_from_state(predictor_path, predictor_code)
+            self._predictor_key = key
+        return self._predictor
+
+    def warmup(self, args=None):
+        self.get_predictor(args['code'])
+
+    def close(self):
+        # release the model: handler is evicted from the cache
+        self._predictor = None
+        self._predictor_key = None
 
     @profiler.profile('LightwoodHandler.predict')
     def predict(self, df, args=None):
@@ -97,14 +115,9 @@ class LightwoodHandler(BaseMLEngine):
         predictor_code = args['code']
         learn_args = args['learn_args']
         pred_args = args.get('predict_params', {})
-        self.model_storage.fileStorage.pull()
 
         with profiler.Context('load model'):
-            predictor_path = (
-                self.model_storage.fileStorage.folder_path
-                / self.model_storage.fileStorage.folder_name
-            )
-            predictor = LightwoodHandler.get_predictor(predictor_path, predictor_code)
+            predictor = self.get_predictor(predictor_code)
 
         dtype_dict = predictor.dtype_dict
 
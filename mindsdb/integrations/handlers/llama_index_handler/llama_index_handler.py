@@ -17,6 +17,7 @@ from llama_hub.github_repo import GithubClient, GithubRepositoryReader
 from llama_hub.youtube_transcript import YoutubeTranscriptReader, is_youtube_video
 
 from mindsdb.integrations.libs.base import BaseMLEngine
+from mindsdb.integrations.libs.training_data import iter_batches
 from mindsdb.utilities.config import Config
 from mindsdb.utilities.security import is_private_url
 from mindsdb.integrations.handlers.llama_index_handler import config
@@ -43,6 +44,8 @@ class LlamaIndexHandler(BaseMLEngine):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.generative = True
+        # rows of DFReader are converted to documents by batches
+        self.supports_training_data_iterator = True
         self.default_index_class = "GPTVectorStoreIndex"
         self.supported_index_class = ["GPTVectorStoreIndex", "VectorStoreIndex"]
         self.default_reader = "DFReader"
@@ -100,17 +103,22 @@ class LlamaIndexHandler(BaseMLEngine):
             )
 
         # workaround to create llama model without input data
-        if df is None or df.empty:
+        if df is None or len(df) == 0:
             df = pd.DataFrame([{"text": ""}])
 
         if args["using"]["reader"] == "DFReader":
-            dstrs = df.apply(
-                lambda x: ", ".join(
-                    [f"{col}: {str(entry)}" for col, entry in zip(df.columns, x)]
-                ),
-                axis=1,
-            )
-            reader = list(map(lambda x: Document(text=x), dstrs.tolist()))
+            # whole training data is not kept in memory with documents made from it
+            reader = []
+            for batch in iter_batches(df):
+                if len(batch) == 0:
+                    continue
+                dstrs = batch.apply(
+                    lambda x: ", ".join(
+                        [f"{col}: {str(entry)}" for col, entry in zip(batch.columns, x)]
+                    ),
+                    axis=1,
+                )
+                reader.extend(map(lambda x: Document(text=x), dstrs.tolist()))
 
         elif args["using"]["reader"] == "SimpleWebPageReader":
             url = args["using"]["source_url_link"]
@@ -14,6 +14,7 @@ from mindsdb.integrations.libs.response import RESPONSE_TYPE
 from mindsdb.integrations.libs.response import HandlerResponse
 from mindsdb.integrations.libs.vectordatabase_handler import (
     FilterCondition,
+    TableField,
     VectorStoreHandler,
 )
 from mindsdb.utilities import log
@@ -214,6 +215,36 @@ class PgVectorHandler(VectorStoreHandler, PostgresHandler):
             cur.executemany(insert_statement, transposed_data)
             self.connection.commit()
 
+    def upsert(self, table_name: str, data: pd.DataFrame):
+        """
+        Insert data into the pgvector table database, existing rows are updated.
+        It requires unique constraint on id column (it is created by create_table).
+        If table doesn't have it: fallback to select and split data to update and insert
+        """
+        data_dict = data.to_dict(orient="list")
+        transposed_data = list(zip(*data_dict.values()))
+
+        columns = ", ".join(data.keys())
+        values = ", ".join(["%s"] * len(data.keys()))
+        update_columns = ", ".join(
+            f"{col} = EXCLUDED.{col}" for col in data.keys() if col != TableField.ID.value
+        )
+
+        on_conflict = f"DO UPDATE SET {update_columns}" if update_columns else "DO NOTHING"
+        upsert_statement = (
+            f"INSERT INTO {table_name} ({columns}) VALUES ({values}) "
+            f"ON CONFLICT ({TableField.ID.value}) {on_conflict}"
+        )
+
+        try:
+            with self.connection.cursor() as cur:
+                cur.executemany(upsert_statement, transposed_data)
+                self.connection.commit()
+        except psycopg.errors.InvalidColumnReference:
+            # there is no unique constraint on id
+            self.connection.rollback()
+            self._upsert_by_select(table_name, data)
+
     def update(
         self, table_name: str, data: pd.DataFrame, key_columns: List[str] = None
     ):
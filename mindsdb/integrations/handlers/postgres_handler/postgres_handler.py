@@ -3,11 +3,12 @@ from collections import OrderedDict
 import psycopg
 from psycopg.postgres import types
 from psycopg.pq import ExecStatus
-from pandas import DataFrame
+from pandas import DataFrame, concat
 
 from mindsdb_sql import parse_sql
 from mindsdb_sql.render.sqlalchemy_render import SqlalchemyRender
 from mindsdb_sql.parser.ast.base import ASTNode
+from mindsdb_sql.parser.ast import Select
 
 from mindsdb.integrations.libs.base import DatabaseHandler
 from mindsdb.integrations.libs.const import HANDLER_CONNECTION_ARG_TYPE as ARG_TYPE
@@ -36,6 +37,9 @@ class PostgresHandler(DatabaseHandler):
         self.database = self.connection_args.get('database')
         self.renderer = SqlalchemyRender('postgres')
 
+        # if it is set: select queries are fetched using server-side cursor by batches of this size
+        self.fetch_size = self.connection_args.get('fetch_size')
+
         self.connection = None
         self.is_connected = False
 
@@ -131,20 +135,57 @@ class PostgresHandler(DatabaseHandler):
                 if pg_type is not None and pg_type.name in types_map:
                     df[column_name] = df[column_name].astype(types_map[pg_type.name])
 
+    def _fetch_batches(self, cur) -> DataFrame:
+        """ Fetch result of the query from server-side cursor by batches.
+            Every batch is converted to dataframe right after fetching,
+            so the whole result is never kept in memory as list of tuples.
+            Batches are concatenated at the end: peak memory is about twice the size of the result
+            (tuples of all rows with fetchall take more, see tests/scripts/postgres_fetch_memory_benchmark.py)
+
+            Args:
+                cur (psycopg.ServerCursor): cursor with executed query
+
+            Returns:
+                DataFrame
+        """
+        columns = [x.name for x in cur.description]
+        frames = []
+        while True:
+            rows = cur.fetchmany(int(self.fetch_size))
+            if len(rows) == 0:
+                break
+            frames.append(DataFrame(rows, columns=columns))
+
+        if len(frames) == 0:
+            return DataFrame([], columns=columns)
+        # types of the columns can be different between batches, infer them again
+        return concat(frames, ignore_index=True).infer_objects()
+
     @profiler.profile()
-    def native_query(self, query: str) -> Response:
+    def native_query(self, query: str, server_side: bool = False) -> Response:
         """
         Receive SQL query and runs it
         :param query: The SQL query to run in PostgreSQL
+        :param server_side: fetch result using server-side cursor. Can be used only for queries returning rows
         :return: returns the records from the current recordset
         """
         need_to_close = self.is_connected is False
 
         connection = self.connect()
-        with connection.cursor() as cur:
+        cursor_args = {}
+        if server_side:
+            cursor_args['name'] = 'mindsdb_fetch_cursor'
+        with connection.cursor(**cursor_args) as cur:
             try:
                 cur.execute(query)
-                if ExecStatus(cur.pgresult.status) == ExecStatus.COMMAND_OK:
+                if server_side:
+                    df = self._fetch_batches(cur)
+                    self._cast_dtypes(df, cur.description)
+                    response = Response(
+                        RESPONSE_TYPE.TABLE,
+                        df
+                    )
+                elif ExecStatus(cur.pgresult.status) == ExecStatus.COMMAND_OK:
                     response = Response(RESPONSE_TYPE.OK)
                 else:
                     result = cur.fetchall()
@@ -178,7 +219,64 @@ class PostgresHandler(DatabaseHandler):
         Retrieve the data from the SQL statement with eliminated rows that dont satisfy the WHERE condition
         """
         query_str = self.renderer.get_string(query, with_failback=True)
-        return self.native_query(query_str)
+        server_side = self.fetch_size is not None and isinstance(query, Select)
+        return self.native_query(query_str, server_side=server_side)
+
+    def query_stream(self, query: ASTNode) -> Response:
+        """
+        Retrieve result of SELECT query by batches of 'fetch_size' rows using server-side cursor.
+        The first batch is fetched at once, the next ones while the response is iterated
+        """
+        if self.fetch_size is None or not isinstance(query, Select):
+            return self.query(query)
+
+        query_str = self.renderer.get_string(query, with_failback=True)
+        need_to_close = self.is_connected is False
+        connection = self.connect()
+        cur = connection.cursor(name='mindsdb_stream_cursor')
+        try:
+            cur.execute(query_str)
+            df = self._fetch_batch(cur)
+        except Exception as e:
+            logger.error(f'Error running query: {query_str} on {self.database}!')
+            cur.close()
+            connection.rollback()
+            if need_to_close is True:
+                self.disconnect()
+            return Response(
+                RESPONSE_TYPE.ERROR,
+                error_code=0,
+                error_message=str(e)
+            )
+
+        return Response(
+            RESPONSE_TYPE.TABLE,
+            df,
+            data_batches=self._stream_batches(connection, cur, need_to_close)
+        )
+
+    def _fetch_batch(self, cur) -> DataFrame:
+        rows = cur.fetchmany(int(self.fetch_size))
+        df = DataFrame(rows, columns=[x.name for x in cur.description])
+        self._cast_dtypes(df, cur.description)
+        return df
+
+    def _stream_batches(self, connection, cur, need_to_close: bool):
+        # cursor is closed when batches are over or iteration is stopped
+        try:
+            while True:
+                df = self._fetch_batch(cur)
+                if len(df) == 0:
+                    break
+                yield df
+            cur.close()
+            connection.commit()
+        finally:
+            if not cur.closed:
+                cur.close()
+                connection.rollback()
+            if need_to_close is True:
+                self.disconnect()
 
     def get_tables(self) -> Response:
         """
@@ -252,6 +350,12 @@ connection_args = OrderedDict(
         'description': 'sslmode that will be used for connection.',
         'required': False,
         'label': 'sslmode'
+    },
+    fetch_size={
+        'type': ARG_TYPE.INT,
+        'description': 'If it is set, results of SELECT queries are fetched using server-side cursor by batches of this size.',
+        'required': False,
+        'label': 'Fetch size'
     }
 )
 
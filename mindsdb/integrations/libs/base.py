@@ -76,6 +76,21 @@ class BaseHandler:
         """
         raise NotImplementedError()
 
+    def query_stream(self, query: ASTNode) -> HandlerResponse:
+        """Receive SELECT query as AST and return its result by batches.
+
+        Handler can return the first batch of the result in 'data_frame' of the response
+        and the iterator of the next batches in 'data_batches'. By default, the whole result
+        is returned as one batch.
+
+        Args:
+            query (ASTNode): sql query represented as AST
+
+        Returns:
+            HandlerResponse
+        """
+        return self.query(query)
+
     def get_tables(self) -> HandlerResponse:
         """ Return list of entities
 
@@ -298,6 +313,8 @@ class BaseMLEngine(ArgProbeMixin):
         self.model_storage = model_storage
         self.engine_storage = engine_storage
         self.generative = False  # if True, the target column name does not have to be specified at creation time
+        # if True, `df` of create/finetune is TrainingData object, which can be read by batches
+        self.supports_training_data_iterator = False
 
         if kwargs.get('base_model_storage'):
             self.base_model_storage = kwargs['base_model_storage']  # available when updating a model
@@ -324,6 +341,15 @@ class BaseMLEngine(ArgProbeMixin):
         """
         raise NotImplementedError
 
+    def warmup(self, args: Optional[Dict] = None) -> None:
+        """
+        Optional.
+
+        Loads the model into memory in advance, so the first call of `predict` does not have to do it.
+        `args` are the same that would be passed to `predict`.
+        """
+        pass
+
     def finetune(self, df: Optional[pd.DataFrame] = None, args: Optional[Dict] = None) -> None:
         """
         Optional.
@@ -1,8 +1,12 @@
-import time
+import gc
 import importlib
+import threading
 import traceback
 import datetime as dt
-from collections import UserDict
+from typing import Optional
+from collections import OrderedDict
+
+import psutil
 
 from mindsdb_sql import parse_sql
 from mindsdb_sql.parser.ast import Identifier, Select, Star, NativeQuery
@@ -11,68 +15,197 @@ import mindsdb.interfaces.storage.db as db
 from mindsdb.api.executor import SQLQuery
 from mindsdb.integrations.utilities.sql_utils import make_sql_session
 from mindsdb.integrations.libs.const import PREDICTOR_STATUS
+from mindsdb.integrations.libs.training_data import TrainingData
 from mindsdb.interfaces.storage.model_fs import ModelStorage, HandlerStorage
 from mindsdb.interfaces.model.functions import get_model_records
 from mindsdb.integrations.utilities.utils import format_exception_error
 import mindsdb.utilities.profiler as profiler
 from mindsdb.utilities.functions import mark_process
 from mindsdb.utilities.context import context as ctx
+from mindsdb.utilities.context_executor import ContextThreadPoolExecutor
 from mindsdb.utilities.config import Config
 from mindsdb.utilities import log
 
 logger = log.getLogger(__name__)
 
 
-class HandlersCache(UserDict):
-    def __init__(self, max_size: int = 5) -> None:
-        self._max_size = max_size
-        super().__init__()
+class HandlersCache:
+    """ LRU cache of ML handlers in the process. Cached handler keeps model loaded between predictions.
+        Weight of the record is memory which was allocated by the process while handler was created
+        and used first time. Records are evicted if count of them or their total weight exceed limits.
+    """
 
-    def __setitem__(self, key, value) -> None:
-        if len(self.data) > self._max_size:
-            sorted_elements = sorted(
-                self.data.items(),
-                key=lambda x: x[1]['last_usage_at']
-            )
-            del self.data[sorted_elements[0][0]]
-        self.data[key] = {
-            'last_usage_at': time.time(),
-            'handler': value
+    def __init__(self, max_size: int = 5, max_memory: Optional[int] = None) -> None:
+        """
+            Args:
+                max_size (int): max count of handlers in cache
+                max_memory (int): max total weight of handlers in bytes, None - no limit
+        """
+        self._max_size = max_size
+        self._max_memory = max_memory
+        self.data = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'memory_freed': 0
         }
 
-    def __getitem__(self, key: int) -> object:
-        el = super().__getitem__(key)
-        el['last_usage_at'] = time.time()
-        return el['handler']
-
-
-handlers_cacher = HandlersCache()
-
-
-@mark_process(name='learn')
-def predict_process(payload, dataframe):
-    db.init()
+    def __contains__(self, key: int) -> bool:
+        return key in self.data
+
+    def get(self, key: int) -> Optional[object]:
+        """ get handler from cache
+
+            Args:
+                key (int): predictor id
+
+            Returns:
+                Optional[object]: handler or None
+        """
+        with self._lock:
+            record = self.data.get(key)
+            if record is None:
+                self.stats['misses'] += 1
+                return None
+            self.stats['hits'] += 1
+            self.data.move_to_end(key)
+            return record['handler']
+
+    def set(self, key: int, handler: object, size: int = 0) -> None:
+        """ add handler to cache
+
+            Args:
+                key (int): predictor id
+                handler (object): ML handler
+                size (int): memory used by handler in bytes
+        """
+        with self._lock:
+            self.data.pop(key, None)
+            self.data[key] = {
+                'handler': handler,
+                'size': size
+            }
+            evicted = self._evict()
+        self._release(evicted)
+
+    def set_size(self, key: int, size: int) -> None:
+        """ update memory weight of the record
+        """
+        with self._lock:
+            if key not in self.data:
+                return
+            self.data[key]['size'] = size
+            evicted = self._evict()
+        self._release(evicted)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                **self.stats,
+                'size': len(self.data),
+                'memory': sum(x['size'] for x in self.data.values())
+            }
+
+    def _evict(self) -> list:
+        """ remove least recently used handlers while limits are exceeded.
+            Last added handler is always kept.
+
+            Returns:
+                list: removed records
+        """
+        evicted = []
+        while len(self.data) > 1:
+            total_size = sum(x['size'] for x in self.data.values())
+            if (
+                len(self.data) <= self._max_size
+                and (self._max_memory is None or total_size <= self._max_memory)
+            ):
+                break
+            _key, record = self.data.popitem(last=False)
+            self.stats['evictions'] += 1
+            evicted.append(record)
+        return evicted
+
+    def _release(self, evicted: list) -> None:
+        """ close evicted handlers: handler has to drop the model it keeps.
+            Memory returned to OS is measured and counted in stats
+
+            Args:
+                evicted (list): removed records
+        """
+        if len(evicted) == 0:
+            return
+        rss_before = get_process_rss()
+        for record in evicted:
+            try:
+                record['handler'].close()
+            except Exception:
+                pass
+        evicted.clear()
+        gc.collect()
+        freed = max(rss_before - get_process_rss(), 0)
+        with self._lock:
+            self.stats['memory_freed'] += freed
+        logger.debug(f'ML handlers cache: memory freed after eviction: {freed} bytes')
+
+
+def get_process_rss() -> int:
+    return psutil.Process().memory_info().rss
+
+
+training_data_config = Config().get('training_data', {})
+handlers_cache_config = Config().get('ml_handlers_cache', {})
+handlers_cacher = HandlersCache(
+    max_size=handlers_cache_config.get('max_size', 5),
+    max_memory=handlers_cache_config.get('max_memory')
+)
+
+
+def _get_ml_handler(payload: dict) -> tuple:
+    """ get handler of the model from cache or create new one
+
+        Returns:
+            tuple: handler and memory used by process before handler was created (None if handler is cached)
+    """
     integration_id = payload['handler_meta']['integration_id']
     predictor_record = payload['predictor_record']
-    args = payload['args']
     module_path = payload['handler_meta']['module_path']
     class_name = payload['handler_meta']['class_name']
-    ml_engine_name = payload['handler_meta']['engine']
 
     module = importlib.import_module(module_path)
     HandlerClass = getattr(module, class_name)
     handler_class = HandlerClass
 
-    if predictor_record.id not in handlers_cacher:
+    ml_handler = handlers_cacher.get(predictor_record.id)
+    rss_before = None
+    if ml_handler is None:
+        rss_before = get_process_rss()
         handlerStorage = HandlerStorage(integration_id)
         modelStorage = ModelStorage(predictor_record.id)
         ml_handler = handler_class(
             engine_storage=handlerStorage,
             model_storage=modelStorage,
         )
-        handlers_cacher[predictor_record.id] = ml_handler
-    else:
-        ml_handler = handlers_cacher[predictor_record.id]
+        handlers_cacher.set(predictor_record.id, ml_handler)
+    return ml_handler, rss_before
+
+
+def _update_handler_size(predictor_id: int, rss_before: Optional[int]) -> None:
+    if rss_before is not None:
+        # model is loaded during first prediction
+        handlers_cacher.set_size(predictor_id, max(get_process_rss() - rss_before, 0))
+
+
+@mark_process(name='learn')
+def predict_process(payload, dataframe):
+    db.init()
+    predictor_record = payload['predictor_record']
+    args = payload['args']
+    ml_engine_name = payload['handler_meta']['engine']
+
+    ml_handler, rss_before = _get_ml_handler(payload)
 
     if ml_engine_name == 'lightwood':
         args['code'] = predictor_record.code
@@ -92,10 +225,93 @@ def predict_process(payload, dataframe):
         args['executor'] = command_executor
 
     predictions = ml_handler.predict(dataframe, args)
-    ml_handler.close()
+    _update_handler_size(predictor_record.id, rss_before)
     return predictions
 
 
+@mark_process(name='learn')
+def warmup_process(payload, dataframe):
+    """ create handler of the model and load model, so next prediction in that process is fast
+    """
+    db.init()
+    predictor_record = payload['predictor_record']
+    args = payload['args']
+
+    ml_handler, rss_before = _get_ml_handler(payload)
+
+    if payload['handler_meta']['engine'] == 'lightwood':
+        args['code'] = predictor_record.code
+
+    ml_handler.warmup(args)
+    _update_handler_size(predictor_record.id, rss_before)
+
+
+def _fetch_training_data(
+    training_data: TrainingData, data_integration_ref: dict, fetch_data_query: str,
+    project_name: str, fetch_data_options: dict
+) -> None:
+    """ fetch training data of the model into TrainingData object.
+        If 'partition_column' and 'partitions' are in fetch_data_options, then native query
+        is split by remainder of partition column and partitions are fetched in parallel
+
+        Args:
+            training_data (TrainingData): storage for fetched data
+            data_integration_ref (dict): source of the data
+            fetch_data_query (str): query to get data
+            project_name (str): name of the project, used to get view
+            fetch_data_options (dict): options of fetching
+    """
+    from mindsdb.interfaces.database.database import DatabaseController
+
+    database_controller = DatabaseController()
+    if data_integration_ref['type'] == 'view':
+        project = database_controller.get_project(project_name)
+        query_ast = parse_sql(fetch_data_query, dialect='mindsdb')
+        view_meta = project.query_view(query_ast)
+        sqlquery = SQLQuery(view_meta['query_ast'], session=make_sql_session())
+        training_data.add(sqlquery.fetch(view='dataframe')['result'])
+        return
+
+    integration_name = database_controller.get_integration(data_integration_ref['id'])['name']
+
+    partition_column = fetch_data_options.get('partition_column')
+    partitions = int(fetch_data_options.get('partitions', 1))
+    if partition_column is not None and partitions > 1:
+        base_query = fetch_data_query.strip().rstrip(';')
+        native_queries = []
+        for i in range(partitions):
+            condition = f'ABS(MOD({partition_column}, {partitions})) = {i}'
+            if i == 0:
+                condition += f' OR {partition_column} IS NULL'
+            native_queries.append(f'SELECT * FROM ({base_query}) AS training_data WHERE {condition}')
+    else:
+        native_queries = [fetch_data_query]
+
+    def fetch(native_query):
+        query = Select(
+            targets=[Star()],
+            from_table=NativeQuery(
+                integration=Identifier(integration_name),
+                query=native_query
+            )
+        )
+        try:
+            sqlquery = SQLQuery(query, session=make_sql_session())
+            training_data.add(sqlquery.fetch(view='dataframe')['result'])
+        finally:
+            if len(native_queries) > 1:
+                db.session.remove()
+
+    if len(native_queries) == 1:
+        fetch(native_queries[0])
+        return
+
+    with ContextThreadPoolExecutor(max_workers=len(native_queries)) as executor:
+        futures = [executor.submit(fetch, native_query) for native_query in native_queries]
+        for future in futures:
+            future.result()
+
+
 @mark_process(name='learn')
 def learn_process(payload, dataframe):
     ctx.profiling = {
@@ -106,7 +322,6 @@ def learn_process(payload, dataframe):
     }
     profiler.set_meta(query='learn_process', api='http', environment=Config().get('environment'))
     with profiler.Context('learn_process'):
-        from mindsdb.interfaces.database.database import DatabaseController
         db.init()
 
         data_integration_ref = payload['data_integration_ref']
@@ -120,41 +335,8 @@ def learn_process(payload, dataframe):
         set_active = payload['set_active']
         class_path = (payload['handler_meta']['module_path'], payload['handler_meta']['class_name'])
 
+        training_data = None
         try:
-            target = problem_definition.get('target', None)
-            training_data_df = None
-            if data_integration_ref is not None:
-                database_controller = DatabaseController()
-                sql_session = make_sql_session()
-                if data_integration_ref['type'] == 'integration':
-                    integration_name = database_controller.get_integration(data_integration_ref['id'])['name']
-                    query = Select(
-                        targets=[Star()],
-                        from_table=NativeQuery(
-                            integration=Identifier(integration_name),
-                            query=fetch_data_query
-                        )
-                    )
-                    sqlquery = SQLQuery(query, session=sql_session)
-                elif data_integration_ref['type'] == 'view':
-                    project = database_controller.get_project(project_name)
-                    query_ast = parse_sql(fetch_data_query, dialect='mindsdb')
-                    view_meta = project.query_view(query_ast)
-                    sqlquery = SQLQuery(view_meta['query_ast'], session=sql_session)
-
-                result = sqlquery.fetch(view='dataframe')
-                training_data_df = result['result']
-
-            training_data_columns_count, training_data_rows_count = 0, 0
-            if training_data_df is not None:
-                training_data_columns_count = len(training_data_df.columns)
-                training_data_rows_count = len(training_data_df)
-
-            predictor_record = db.Predictor.query.with_for_update().get(predictor_id)
-            predictor_record.training_data_columns_count = training_data_columns_count
-            predictor_record.training_data_rows_count = training_data_rows_count
-            db.session.commit()
-
             module_name, class_name = class_path
             module = importlib.import_module(module_name)
             HandlerClass = getattr(module, class_name)
@@ -173,12 +355,43 @@ def learn_process(payload, dataframe):
                 model_storage=modelStorage,
                 **kwargs
             )
-            handlers_cacher[predictor_record.id] = ml_handler
+
+            target = problem_definition.get('target', None)
+            # spooled data is read by batches only by engines which support it,
+            # for other engines it would be written to files and loaded back to memory
+            training_data = TrainingData(
+                spool=training_data_config.get('spool', False) and ml_handler.supports_training_data_iterator,
+                batch_size=training_data_config.get('batch_size', 100000)
+            )
+            if data_integration_ref is not None:
+                _fetch_training_data(
+                    training_data, data_integration_ref, fetch_data_query, project_name,
+                    payload.get('fetch_data_options') or {}
+                )
+
+            training_data_columns_count, training_data_rows_count = 0, 0
+            if training_data.columns is not None:
+                training_data_columns_count = len(training_data.columns)
+                training_data_rows_count = training_data.rows_count
+
+            predictor_record = db.Predictor.query.with_for_update().get(predictor_id)
+            predictor_record.training_data_columns_count = training_data_columns_count
+            predictor_record.training_data_rows_count = training_data_rows_count
+            db.session.commit()
+
+            handlers_cacher.set(predictor_record.id, ml_handler)
 
             if not ml_handler.generative:
-                if training_data_df is not None and target not in training_data_df.columns:
+                if training_data.columns is not None and target not in training_data.columns:
                     raise Exception(
-                        f'Prediction target "{target}" not found in training dataframe: {list(training_data_df.columns)}')
+                        f'Prediction target "{target}" not found in training dataframe: {training_data.columns}')
+
+            if training_data.columns is None:
+                training_data_df = None
+            elif ml_handler.supports_training_data_iterator:
+                training_data_df = training_data
+            else:
+                training_data_df = training_data.to_df()
 
             # create new model
             if base_predictor_id is None:
@@ -215,6 +428,9 @@ def learn_process(payload, dataframe):
             predictor_record.data = {"error": error_message}
             predictor_record.status = PREDICTOR_STATUS.ERROR
             db.session.commit()
+        finally:
+            if training_data is not None:
+                training_data.close()
 
         predictor_record.training_stop_at = dt.datetime.now()
         db.session.commit()
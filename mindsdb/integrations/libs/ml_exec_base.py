@@ -48,6 +48,7 @@ import mindsdb.utilities.profiler as profiler
 from mindsdb.utilities.ml_task_queue.producer import MLTaskProducer
 from mindsdb.utilities.ml_task_queue.const import ML_TASK_TYPE
 from mindsdb.integrations.libs.process_cache import process_cache, empty_callback
+from mindsdb.interfaces.model.model_warmup import model_warmup
 
 try:
     import torch.multiprocessing as mp
@@ -155,6 +156,7 @@ class BaseMLEngineExec:
         label=None,
         is_retrain=False,
         set_active=True,
+        fetch_data_options=None,
     ):
         # TODO move to model_controller
         """ Trains a model given some data-gathering SQL statement. """
@@ -218,6 +220,7 @@ class BaseMLEngineExec:
                 'set_active': set_active,
                 'data_integration_ref': data_integration_ref,
                 'fetch_data_query': fetch_data_query,
+                'fetch_data_options': fetch_data_options,
                 'project_name': project_name
             }
         )
@@ -230,8 +233,37 @@ class BaseMLEngineExec:
             # to prevent memory leak need to add any callback
             task.add_done_callback(empty_callback)
 
+        if model_warmup.enabled:
+            predictor_id = predictor_record.id
+            task.add_done_callback(lambda _task: model_warmup.add_model(predictor_id))
+
         return predictor_record
 
+    def warmup(self, predictor_record):
+        """ Load the model into ML process without making predictions
+
+            Args:
+                predictor_record (db.Predictor): model to load
+
+            Returns:
+                task of ML process
+        """
+        return self.base_ml_executor.apply_async(
+            task_type=ML_TASK_TYPE.WARMUP,
+            model_id=predictor_record.id,
+            payload={
+                'handler_meta': {
+                    'module_path': self.handler_class.__module__,
+                    'class_name': self.handler_class.__name__,
+                    'engine': self.engine,
+                    'integration_id': self.integration_id
+                },
+                'context': ctx.dump(),
+                'predictor_record': predictor_record,
+                'args': {}
+            }
+        )
+
     @profiler.profile()
     @mark_process(name='predict')
     def predict(self, model_name: str, data: list, pred_format: str = 'dict',
@@ -299,6 +331,7 @@ class BaseMLEngineExec:
             columns_in_count=df.shape[1],
             rows_out_count=len(predictions)
         )
+        model_warmup.touch(predictor_record.id)
         return predictions
 
     @profiler.profile()
@@ -310,7 +343,8 @@ class BaseMLEngineExec:
             join_learn_process=False,
             label=None,
             set_active=True,
-            args: Optional[dict] = None
+            args: Optional[dict] = None,
+            fetch_data_options=None
     ):
         # generate new record from latest version as starting point
         project = self.database_controller.get_project(name=project_name)
@@ -390,6 +424,7 @@ class BaseMLEngineExec:
                 'base_model_id': base_predictor_record.id,
                 'data_integration_ref': data_integration_ref,
                 'fetch_data_query': fetch_data_query,
+                'fetch_data_options': fetch_data_options,
                 'project_name': project_name
             }
         )
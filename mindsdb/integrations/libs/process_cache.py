@@ -2,20 +2,24 @@ import sys
 import time
 import threading
 from typing import Optional, Callable
+from collections import deque
 from concurrent.futures import ProcessPoolExecutor, Future
 
+import psutil
+import pandas as pd
 from pandas import DataFrame
 
 from mindsdb.utilities.config import Config
 from mindsdb.utilities.context import context as ctx
+from mindsdb.utilities.cache import json_checksum
 from mindsdb.utilities.ml_task_queue.const import ML_TASK_TYPE
-from mindsdb.integrations.libs.learn_process import learn_process, predict_process
+from mindsdb.integrations.libs.learn_process import learn_process, predict_process, warmup_process
 
 
 def init_ml_handler(module_path):
     import importlib  # noqa
 
-    from mindsdb.integrations.libs.learn_process import learn_process, predict_process  # noqa
+    from mindsdb.integrations.libs.learn_process import learn_process, predict_process, warmup_process  # noqa
 
     importlib.import_module(module_path)
 
@@ -45,6 +49,8 @@ class WarmProcess:
         self.pool = ProcessPoolExecutor(1, initializer=initializer, initargs=initargs)
         self.last_usage_at = time.time()
         self._markers = set()
+        # process has warmed up model: it is not stopped by idle ttl
+        self.keep_warm = False
         # region bacause of ProcessPoolExecutor does not start new process
         # untill it get a task, we need manually run dummy task to force init.
         self.task = self.pool.submit(dummy_task)
@@ -117,6 +123,34 @@ class WarmProcess:
         """
         return len(self._markers) > 0
 
+    def get_rss(self) -> int:
+        """ get memory used by the process
+
+            Returns:
+                int: resident set size in bytes
+        """
+        rss = 0
+        for pid in list((self.pool._processes or {}).keys()):
+            try:
+                rss += psutil.Process(pid).memory_info().rss
+            except psutil.Error:
+                pass
+        return rss
+
+    def get_info(self) -> dict:
+        """ get state of the process
+
+            Returns:
+                dict
+        """
+        return {
+            'ready': self.task is None or self.task.done(),
+            'rss': self.get_rss(),
+            'models': list(self._markers),
+            'last_usage_at': self.last_usage_at,
+            'keep_warm': self.keep_warm
+        }
+
     def apply_async(self, func: Callable, *args: tuple, **kwargs: dict) -> Future:
         """ Run new task
 
@@ -146,16 +180,157 @@ def warm_function(func, context: str, *args, **kwargs):
         raise RuntimeError(str(e)) from e
 
 
+class PredictBatcher:
+    """ Collects predict tasks for the same model which came within short time window
+        and runs them in ML process as one task. Result of the task is split back to callers.
+    """
+    def __init__(self, run_task: Callable, max_rows: int = 1000, window: float = 0.005):
+        """ Args:
+            run_task (Callable): function to run a task in ML process
+            max_rows (int): batch is sent immediately if it has this count of rows
+            window (float): time (in seconds) to wait for other tasks after the first task of the batch came
+        """
+        self._run_task = run_task
+        self.max_rows = max_rows
+        self.window = window
+        self._batches = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def get_batch_key(model_id: int, payload: dict, dataframe: DataFrame) -> Optional[tuple]:
+        """ get key of the batch for the task. Tasks can be combined if
+            they are for the same model, with the same args and input columns
+
+            Returns:
+                Optional[tuple]: None if task can not be combined with other tasks
+        """
+        if dataframe is None:
+            return None
+        predictor_record = payload['predictor_record']
+        if predictor_record.learn_args.get('timeseries_settings', {}).get('is_timeseries') is True:
+            # forecast depends on all input rows
+            return None
+        try:
+            args_key = json_checksum(payload['args'])
+        except Exception:
+            return None
+        return (
+            model_id,
+            payload['context']['company_id'],
+            args_key,
+            tuple(dataframe.columns)
+        )
+
+    def submit(self, key: tuple, model_id: int, payload: dict, dataframe: DataFrame) -> Future:
+        """ add task to the batch
+
+            Returns:
+                Future: future with predictions for the dataframe
+        """
+        future = Future()
+        with self._lock:
+            batch = self._batches.get(key)
+            if batch is None:
+                batch = {
+                    'model_id': model_id,
+                    'payload': payload,
+                    'items': [],
+                    'rows': 0
+                }
+                self._batches[key] = batch
+                timer = threading.Timer(self.window, self._flush, args=(key, batch))
+                timer.daemon = True
+                timer.start()
+            batch['items'].append((dataframe, future))
+            batch['rows'] += len(dataframe)
+            is_full = batch['rows'] >= self.max_rows
+            if is_full:
+                del self._batches[key]
+        if is_full:
+            self._run_batch(batch)
+        return future
+
+    def _flush(self, key: tuple, batch: dict) -> None:
+        """ run batch if it was not run yet
+        """
+        with self._lock:
+            if self._batches.get(key) is not batch:
+                return
+            del self._batches[key]
+        self._run_batch(batch)
+
+    def _run_batch(self, batch: dict) -> None:
+        items = batch['items']
+        if len(items) == 1:
+            dataframe = items[0][0]
+        else:
+            dataframe = pd.concat([df for df, _ in items], ignore_index=True)
+        try:
+            task = self._run_task(ML_TASK_TYPE.PREDICT, batch['model_id'], batch['payload'], dataframe)
+        except Exception as e:
+            for _, future in items:
+                future.set_exception(e)
+            return
+        task.add_done_callback(lambda t: self._split_result(t, items))
+
+    @staticmethod
+    def _split_result(task: Future, items: list) -> None:
+        """ set result of each task of the batch
+        """
+        exception = task.exception()
+        if exception is None and len(items) > 1:
+            result = task.result()
+            if len(result) != sum(len(df) for df, _ in items):
+                exception = Exception('Count of predicted rows differs from count of input rows')
+        if exception is not None:
+            for _, future in items:
+                future.set_exception(exception)
+            return
+
+        result = task.result()
+        if len(items) == 1:
+            items[0][1].set_result(result)
+            return
+        offset = 0
+        for df, future in items:
+            future.set_result(result.iloc[offset:offset + len(df)].reset_index(drop=True))
+            offset += len(df)
+
+
+def _copy_future_state(source: Future, target: Future) -> None:
+    exception = source.exception()
+    if exception is not None:
+        target.set_exception(exception)
+    else:
+        target.set_result(source.result())
+
+
 class ProcessCache:
-    """ simple cache for WarmProcess-es
+    """ cache for WarmProcess-es.
+        Count of processes is limited per handler and globally. If there is no free process
+        and limit is reached: task waits in queue until some process finished its task.
     """
     def __init__(self, ttl: int = 120):
         """ Args:
             ttl (int) time to live for unused process
         """
+        config = Config().get('process_cache', {})
+        self._max_processes = config.get('max_processes', 16)
+        self._max_processes_per_handler = config.get('max_processes_per_handler', 8)
+        self._max_memory_usage = config.get('max_memory_usage', 90)
+        self._queue = deque()
+
+        self.batcher = None
+        batching_config = config.get('predict_batching', {})
+        if batching_config.get('enabled') is True:
+            self.batcher = PredictBatcher(
+                self._apply_async,
+                max_rows=batching_config.get('max_rows', 1000),
+                window=batching_config.get('window', 0.005)
+            )
         self.cache = {}
         self._init = False
-        self._lock = threading.Lock()
+        self._lock = threading.RLock()
         self._ttl = ttl
         self._keep_alive = {}
         self._stop_event = threading.Event()
@@ -219,6 +394,25 @@ class ProcessCache:
                     }
 
     def apply_async(self, task_type: ML_TASK_TYPE, model_id: int, payload: dict, dataframe: DataFrame = None) -> Future:
+        """ run new task. If predict batching is enabled: predict task can be combined with
+            other predict tasks for the same model
+
+            Args:
+                task_type (ML_TASK_TYPE): type of the task
+                model_id (int): model identifier
+                payload (dict): task data
+                dataframe (DataFrame): input data
+
+            Returns:
+                Future
+        """
+        if task_type == ML_TASK_TYPE.PREDICT and self.batcher is not None:
+            batch_key = self.batcher.get_batch_key(model_id, payload, dataframe)
+            if batch_key is not None:
+                return self.batcher.submit(batch_key, model_id, payload, dataframe)
+        return self._apply_async(task_type, model_id, payload, dataframe)
+
+    def _apply_async(self, task_type: ML_TASK_TYPE, model_id: int, payload: dict, dataframe: DataFrame = None) -> Future:
         """ run new task. If possible - do it in existing process, if not - start new one.
 
             Args: TODO rewrite!
@@ -235,6 +429,8 @@ class ProcessCache:
             func = learn_process
         elif task_type == ML_TASK_TYPE.PREDICT:
             func = predict_process
+        elif task_type == ML_TASK_TYPE.WARMUP:
+            func = warmup_process
         else:
             raise Exception(f'Unknown ML task type: {task_type}')
 
@@ -243,68 +439,172 @@ class ProcessCache:
         model_marker = (model_id, payload['context']['company_id'])
         with self._lock:
             if handler_name not in self.cache:
-                warm_process = WarmProcess(init_ml_handler, (handler_module_path,))
                 self.cache[handler_name] = {
                     'last_usage_at': None,
                     'handler_module': handler_module_path,
-                    'processes': [warm_process]
+                    'processes': []
                 }
-            else:
-                warm_process = None
-                if model_marker is not None:
-                    try:
-                        warm_process = next(
-                            p for p in self.cache[handler_name]['processes']
-                            if p.ready() and p.has_marker(model_marker)
-                        )
-                    except StopIteration:
-                        pass
-                if warm_process is None:
-                    try:
-                        warm_process = next(
-                            p for p in self.cache[handler_name]['processes']
-                            if p.ready()
-                        )
-                    except StopIteration:
-                        pass
-                if warm_process is None:
-                    warm_process = WarmProcess(init_ml_handler, (handler_module_path,))
-                    self.cache[handler_name]['processes'].append(warm_process)
+            warm_process = self._get_process(handler_name, model_marker)
+            if warm_process is None:
+                # limit of processes is reached
+                future = Future()
+                self._queue.append({
+                    'handler_name': handler_name,
+                    'model_marker': model_marker,
+                    'func': func,
+                    'payload': payload,
+                    'dataframe': dataframe,
+                    'future': future
+                })
+                return future
+            return self._run_task(warm_process, handler_name, model_marker, func, payload, dataframe)
+
+    def _processes_count(self) -> int:
+        return sum(len(x['processes']) for x in self.cache.values())
+
+    def _get_process(self, handler_name: str, model_marker: tuple) -> Optional[WarmProcess]:
+        """ find free process for the task: at first process which already used the model,
+            then any free process of the handler, then start new process if limits allow it
 
-            task = warm_process.apply_async(warm_function, func, payload['context'], payload, dataframe)
-            self.cache[handler_name]['last_usage_at'] = time.time()
-            warm_process.add_marker(model_marker)
+            Returns:
+                Optional[WarmProcess]: None if there is no free process
+        """
+        processes = self.cache[handler_name]['processes']
+        ready_processes = [p for p in processes if p.ready()]
+        if len(ready_processes) > 0:
+            return next(
+                (p for p in ready_processes if p.has_marker(model_marker)),
+                ready_processes[0]
+            )
+
+        if len(processes) >= self._max_processes_per_handler:
+            return None
+        if self._processes_count() >= self._max_processes:
+            # free place: stop least recently used process of other handler
+            if self._evict_idle_process() is None:
+                return None
+
+        warm_process = WarmProcess(init_ml_handler, (self.cache[handler_name]['handler_module'],))
+        processes.append(warm_process)
+        return warm_process
+
+    def _evict_idle_process(self) -> Optional[int]:
+        """ stop least recently used process which is not busy
+
+            Returns:
+                Optional[int]: memory used by stopped process, None if there is no process to stop
+        """
+        idle = [
+            (process, record['processes'])
+            for record in self.cache.values()
+            for process in record['processes']
+            if process.ready()
+        ]
+        if len(idle) == 0:
+            return None
+        process, processes = min(idle, key=lambda x: x[0].last_usage_at)
+        rss = process.get_rss()
+        processes.remove(process)
+        process.shutdown()
+        return rss
+
+    def _run_task(self, warm_process: WarmProcess, handler_name: str, model_marker: tuple,
+                  func: Callable, payload: dict, dataframe: DataFrame) -> Future:
+        task = warm_process.apply_async(warm_function, func, payload['context'], payload, dataframe)
+        self.cache[handler_name]['last_usage_at'] = time.time()
+        warm_process.add_marker(model_marker)
+        if func is warmup_process:
+            warm_process.keep_warm = True
+        task.add_done_callback(self._run_queued_tasks)
         return task
 
+    def _run_queued_tasks(self, _task=None) -> None:
+        """ send waiting tasks to processes which became free
+        """
+        with self._lock:
+            for item in list(self._queue):
+                warm_process = self._get_process(item['handler_name'], item['model_marker'])
+                if warm_process is None:
+                    continue
+                self._queue.remove(item)
+                try:
+                    task = self._run_task(
+                        warm_process, item['handler_name'], item['model_marker'],
+                        item['func'], item['payload'], item['dataframe']
+                    )
+                except Exception as e:
+                    item['future'].set_exception(e)
+                    continue
+                future = item['future']
+                task.add_done_callback(lambda t, future=future: _copy_future_state(t, future))
+
+    def get_processes_info(self) -> dict:
+        """ get state of all processes
+
+            Returns:
+                dict: handler name -> list of processes states
+        """
+        with self._lock:
+            return {
+                handler_name: [p.get_info() for p in record['processes']]
+                for handler_name, record in self.cache.items()
+            }
+
+    def _is_expired(self, process: WarmProcess, now: float) -> bool:
+        """ check if used process is idle longer than ttl. Processes with warmed up models
+            are kept, they can be stopped only by limits of processes count or memory
+
+            Args:
+                process (WarmProcess): process to check
+                now (float): current time
+
+            Returns:
+                bool
+        """
+        return (
+            process.ready()
+            and process.is_marked()
+            and not process.keep_warm
+            and (now - process.last_usage_at) > self._ttl
+        )
+
     def _clean(self) -> None:
         """ worker that stop unused processes
         """
         while self._stop_event.wait(timeout=10) is False:
             with self._lock:
+                now = time.time()
                 for handler_name in self.cache.keys():
                     processes = self.cache[handler_name]['processes']
-                    processes.sort(key=lambda x: x.is_marked())
 
                     expected_count = 0
                     if handler_name in self._keep_alive:
                         expected_count = self._keep_alive[handler_name]
 
                     # stop processes which was used, it needs to free memory
-                    for i, process in enumerate(processes):
-                        if (
-                            process.ready()
-                            and process.is_marked()
-                            and (time.time() - process.last_usage_at) > self._ttl
-                        ):
-                            processes.pop(i)
-                            # del process
+                    for process in list(processes):
+                        if self._is_expired(process, now):
+                            processes.remove(process)
                             process.shutdown()
-                            break
 
-                    while expected_count > len(processes):
+                    while (
+                        expected_count > len(processes)
+                        and self._processes_count() < self._max_processes
+                    ):
                         processes.append(
                             WarmProcess(init_ml_handler, (self.cache[handler_name]['handler_module'],))
                         )
 
+                # memory pressure: stop least recently used processes until enough memory is freed
+                memory = psutil.virtual_memory()
+                excess = memory.used - memory.total * self._max_memory_usage / 100
+                while excess > 0:
+                    freed = self._evict_idle_process()
+                    if freed is None:
+                        break
+                    excess -= freed
+
+                self._run_queued_tasks()
+
 
 process_cache = ProcessCache()
@@ -1,3 +1,5 @@
+from typing import Iterator
+
 from pandas import DataFrame
 
 from mindsdb.utilities import log
@@ -9,10 +11,14 @@ logger = log.getLogger(__name__)
 
 class HandlerResponse:
     def __init__(self, resp_type: RESPONSE_TYPE, data_frame: DataFrame = None,
-                 query: ASTNode = 0, error_code: int = 0, error_message: str = None) -> None:
+                 query: ASTNode = 0, error_code: int = 0, error_message: str = None,
+                 data_batches: Iterator[DataFrame] = None) -> None:
         self.resp_type = resp_type
         self.query = query
         self.data_frame = data_frame
+        # if the result is streamed (see BaseHandler.query_stream): data_frame is the first batch
+        #   and data_batches are the rest of them
+        self.data_batches = data_batches
         self.error_code = error_code
         self.error_message = error_message
 
@@ -0,0 +1,138 @@
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+import pandas as pd
+
+from mindsdb.utilities.config import Config
+from mindsdb.utilities.ml_task_queue.utils import to_arrow
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+
+class TrainingData:
+    """ Training data of the model. It is filled by chunks (for example, by partitions of fetch query),
+        which can be spooled to local arrow files to not keep whole dataset in memory during fetching.
+        Engines with 'supports_training_data_iterator' get this object instead of dataframe
+        and can read it by batches, other engines get dataframe from 'to_df'.
+        Chunks are spooled only for engines which read them by batches (for example, llama_index with DFReader).
+        Chunks which can not be converted to arrow losslessly are kept in memory.
+    """
+
+    def __init__(self, spool: bool = False, batch_size: int = 100000):
+        """
+            Args:
+                spool (bool): write chunks to local files
+                batch_size (int): max count of rows in one record batch of the file
+        """
+        self.spool = spool and pa is not None
+        self.batch_size = batch_size
+        self.columns = None
+        self.rows_count = 0
+        self._chunks = []
+        self._lock = threading.Lock()
+        self._path = None
+
+    def add(self, df: pd.DataFrame) -> None:
+        """ add chunk of data. Can be called from different threads
+
+            Args:
+                df (DataFrame): chunk of data
+        """
+        if df is None:
+            return
+        with self._lock:
+            if self.columns is None:
+                self.columns = list(df.columns)
+            elif list(df.columns) != self.columns:
+                raise Exception(f'Columns of training data chunks are different: {self.columns}, {list(df.columns)}')
+            self.rows_count += len(df)
+
+        table = to_arrow(df) if self.spool else None
+        if table is None:
+            with self._lock:
+                self._chunks.append(df)
+            return
+
+        with self._lock:
+            if self._path is None:
+                tmp_dir = Path(Config()['paths']['tmp'])
+                tmp_dir.mkdir(parents=True, exist_ok=True)
+                self._path = Path(tempfile.mkdtemp(prefix='training_data_', dir=tmp_dir))
+            file_path = self._path / f'{len(self._chunks)}.arrow'
+            self._chunks.append(file_path)
+
+        with pa.OSFile(str(file_path), 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table, max_chunksize=self.batch_size)
+
+    def __len__(self) -> int:
+        return self.rows_count
+
+    @staticmethod
+    def _open(file_path: Path) -> 'pa.ipc.RecordBatchFileReader':
+        return pa.ipc.open_file(pa.memory_map(str(file_path), 'r'))
+
+    def iter_batches(self) -> Iterator[pd.DataFrame]:
+        """ read data by batches
+
+            Returns:
+                Iterator[DataFrame]: batches of data
+        """
+        for chunk in self._chunks:
+            if isinstance(chunk, pd.DataFrame):
+                yield chunk
+                continue
+            reader = self._open(chunk)
+            for i in range(reader.num_record_batches):
+                yield reader.get_batch(i).to_pandas()
+
+    def to_df(self) -> Optional[pd.DataFrame]:
+        """ get all data as one dataframe. Spooled chunks are read from memory-mapped files
+
+            Returns:
+                Optional[DataFrame]: data or None if nothing was added
+        """
+        if self.columns is None:
+            return None
+        frames: List[pd.DataFrame] = []
+        for chunk in self._chunks:
+            if isinstance(chunk, pd.DataFrame):
+                frames.append(chunk)
+            else:
+                frames.append(self._open(chunk).read_all().to_pandas(split_blocks=True))
+        if len(frames) == 1:
+            return frames[0]
+        return pd.concat(frames, ignore_index=True)
+
+    def close(self) -> None:
+        """ remove spooled files
+        """
+        self._chunks = []
+        if self._path is not None and os.path.exists(self._path):
+            shutil.rmtree(self._path, ignore_errors=True)
+        self._path = None
+
+
+def iter_batches(data) -> Iterator[pd.DataFrame]:
+    """ read training data by batches. Is used by engines with 'supports_training_data_iterator',
+        they can get dataframe as well (for example, from grpc wrapper)
+
+        Args:
+            data (Union[TrainingData, DataFrame, None]): training data
+
+        Returns:
+            Iterator[DataFrame]: batches of data
+    """
+    if data is None:
+        return
+    if isinstance(data, TrainingData):
+        yield from data.iter_batches()
+    else:
+        yield data
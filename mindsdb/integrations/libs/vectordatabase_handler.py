@@ -27,6 +27,9 @@ from .base import BaseHandler
 
 LOG = log.getLogger(__name__)
 
+# max count of ids in one request to check existing records in upsert
+UPSERT_CHECK_CHUNK_SIZE = 1000
+
 
 class FilterOperator(Enum):
     """
@@ -326,36 +329,49 @@ class VectorStoreHandler(BaseHandler):
 
         if id_col not in df.columns:
             # generate for all
-            df[id_col] = df[content_col].apply(gen_hash)
+            df[id_col] = [gen_hash(v) for v in df[content_col]]
         else:
             # generate for empty
-            for i in range(len(df)):
-                if pd.isna(df.loc[i, id_col]):
-                    df.loc[i, id_col] = gen_hash(df.loc[i, content_col])
+            empty_ids = df[id_col].isna()
+            if empty_ids.any():
+                df.loc[empty_ids, id_col] = [gen_hash(v) for v in df.loc[empty_ids, content_col]]
 
         # remove duplicated ids
         df = df.drop_duplicates([TableField.ID.value])
 
         # id is string TODO is it ok?
-        df[id_col] = df[id_col].apply(str)
+        df[id_col] = df[id_col].astype(str)
 
         if hasattr(self, 'upsert'):
             self.upsert(table_name, df)
             return
 
-        # find existing ids
-        res = self.select(
-            table_name,
-            columns=[id_col],
-            conditions=[
-                FilterCondition(column=id_col, op=FilterOperator.IN, value=list(df[id_col]))
-            ]
-        )
-        existed_ids = list(res[id_col])
+        self._upsert_by_select(table_name, df)
+
+    def _upsert_by_select(self, table_name, df):
+        """
+        Upsert for handlers without native upsert: existing ids are selected from the table
+        and data is split to update and insert
+        """
+        id_col = TableField.ID.value
+
+        # find existing ids, by chunks to not send too long condition
+        ids = list(df[id_col])
+        existed_ids = []
+        for start in range(0, len(ids), UPSERT_CHECK_CHUNK_SIZE):
+            res = self.select(
+                table_name,
+                columns=[id_col],
+                conditions=[
+                    FilterCondition(column=id_col, op=FilterOperator.IN, value=ids[start:start + UPSERT_CHECK_CHUNK_SIZE])
+                ]
+            )
+            existed_ids.extend(res[id_col])
 
         # update existed
-        df_update = df[df[id_col].isin(existed_ids)]
-        df_insert = df[~df[id_col].isin(existed_ids)]
+        existed_ids = df[id_col].isin(existed_ids)
+        df_update = df[existed_ids]
+        df_insert = df[~existed_ids]
 
         if not df_update.empty:
             self.update(table_name, df_update, [id_col])
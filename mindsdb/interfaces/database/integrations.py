@@ -36,18 +36,34 @@ logger = log.getLogger(__name__)
 
 
 class HandlersCache:
-    """ Cache for data handlers that keep connections opened during ttl time from handler last use
+    """ Pool of data handlers that keep connections opened during ttl time from handler last use.
+        Each integration has own pool of handlers. Handler is used only by one thread at the time:
+        thread keeps its handler while it alive, after that handler can be taken by another thread.
+        Handler is in use while somebody except the cache keeps reference to it: such handler is not
+        closed by ttl or by deleting from the cache.
+        If the pool is full, new connection is not created: thread waits for an idle handler of the pool.
     """
 
-    def __init__(self, ttl: int = 60):
+    def __init__(self, ttl: int = 60, max_size: int = 10, min_size: int = 0, wait_timeout: int = 30):
         """ init cache
 
             Args:
-                ttl (int): time to live (in seconds) for record in cache
+                ttl (int): time to live (in seconds) for idle handler in cache
+                max_size (int): max count of handlers for one integration
+                min_size (int): count of handlers for one integration that are not removed after ttl
+                wait_timeout (int): time (in seconds) to wait for idle handler if the pool is full
         """
         self.ttl = ttl
+        self.max_size = max_size
+        self.min_size = min_size
+        self.wait_timeout = wait_timeout
+        # (name, company_id) -> list of records {'handler', 'thread_id', 'expired_at'}
         self.handlers = {}
+        # (name, company_id) -> count of handlers which are connecting to be added to the pool
+        self.pending = {}
+        self.stats = {}
         self._lock = threading.RLock()
+        self._released = threading.Condition(self._lock)
         self._stop_event = threading.Event()
         self.cleaner_thread = None
 
@@ -72,29 +88,132 @@ class HandlersCache:
         """
         self._stop_event.set()
 
-    def set(self, handler: DatabaseHandler):
-        """ add (or replace) handler in cache
+    def _get_stats(self, key: tuple) -> dict:
+        if key not in self.stats:
+            self.stats[key] = {
+                'hits': 0,
+                'misses': 0,
+                'created': 0,
+                'reused': 0,
+                'evicted': 0,
+                'rejected': 0
+            }
+        return self.stats[key]
+
+    @staticmethod
+    def _is_in_use(record: dict) -> bool:
+        # references: record and argument of getrefcount, others are from users of the handler
+        return sys.getrefcount(record['handler']) > 2
+
+    @staticmethod
+    def _disconnect(handler: DatabaseHandler) -> None:
+        try:
+            handler.disconnect()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _is_healthy(handler: DatabaseHandler) -> bool:
+        try:
+            return handler.check_connection().success is True
+        except Exception:
+            return False
+
+    def set(self, handler: DatabaseHandler) -> DatabaseHandler:
+        """ connect the handler, add it to the pool and assign it to the current thread.
+            If the pool is full, the handler is not connected: idle handler of the pool is
+            assigned to the current thread instead (it is waited for not longer than wait_timeout)
 
             Args:
                 handler (DatabaseHandler)
+
+            Returns:
+                DatabaseHandler: handler to use
         """
         # do not cache connections in handlers processes
         if multiprocessing.current_process().name.startswith('HandlerProcess'):
-            return
+            return handler
+
+        key = (handler.name, ctx.company_id)
+        thread_id = threading.get_native_id()
+        deadline = time() + self.wait_timeout
+        while True:
+            replaced = None
+            idle = pooled = None
+            with self._lock:
+                pool = self.handlers.setdefault(key, [])
+                stats = self._get_stats(key)
+                existing = next((x for x in pool if x['handler'] is handler), None)
+                if existing is not None:
+                    # handler is already in the pool
+                    existing['thread_id'] = thread_id
+                    existing['expired_at'] = time() + self.ttl
+                    return handler
+                for record in pool:
+                    if record['thread_id'] == thread_id and not self._is_in_use(record):
+                        # replace handler of the current thread
+                        replaced = record['handler']
+                        pool.remove(record)
+                        break
+                if len(pool) + self.pending.get(key, 0) < self.max_size:
+                    # reserve place in the pool before connecting
+                    self.pending[key] = self.pending.get(key, 0) + 1
+                    break
+                idle = next((x for x in pool if not self._is_in_use(x)), None)
+                if idle is not None:
+                    # reference to handler makes it in use for other threads
+                    pooled = idle['handler']
+                    idle['thread_id'] = thread_id
+                    stats['reused'] += 1
+                elif time() > deadline:
+                    stats['rejected'] += 1
+                    raise Exception(
+                        f"Pool of connections to '{handler.name}' is full, no idle connection for {self.wait_timeout}s"
+                    )
+                else:
+                    # handlers in use are released without notification, the pool is checked periodically
+                    self._released.wait(timeout=0.1)
+
+            if replaced is not None:
+                self._disconnect(replaced)
+            if pooled is not None:
+                if self._is_healthy(pooled):
+                    with self._lock:
+                        idle['expired_at'] = time() + self.ttl
+                    return pooled
+                with self._lock:
+                    if idle in pool:
+                        pool.remove(idle)
+                    stats['evicted'] += 1
+                self._disconnect(pooled)
+                pooled = None
+
+        if replaced is not None:
+            self._disconnect(replaced)
+
+        # connecting can be slow, it is done without lock
+        connected = True
+        try:
+            handler.connect()
+        except Exception:
+            connected = False
+
         with self._lock:
-            try:
-                key = (handler.name, ctx.company_id, threading.get_native_id())
-                handler.connect()
-                self.handlers[key] = {
+            self.pending[key] -= 1
+            if connected:
+                self.handlers.setdefault(key, []).append({
                     'handler': handler,
+                    'thread_id': thread_id,
                     'expired_at': time() + self.ttl
-                }
-            except Exception:
-                pass
-            self._start_clean()
+                })
+                stats['created'] += 1
+                self._start_clean()
+            self._released.notify_all()
+        return handler
 
     def get(self, name: str) -> Optional[DatabaseHandler]:
-        """ get handler from cache by name
+        """ get handler from the pool by name. If current thread has no handler,
+            then it takes idle handler of the thread that is not alive anymore
 
             Args:
                 name (str): handler name
@@ -102,50 +221,111 @@ class HandlersCache:
             Returns:
                 DatabaseHandler
         """
+        key = (name, ctx.company_id)
+        thread_id = threading.get_native_id()
         with self._lock:
-            key = (name, ctx.company_id, threading.get_native_id())
-            if (
-                key not in self.handlers
-                or self.handlers[key]['expired_at'] < time()
-            ):
+            pool = self.handlers.get(key, [])
+            stats = self._get_stats(key)
+
+            record = next((x for x in pool if x['thread_id'] == thread_id), None)
+            taken = False
+            if record is None:
+                alive_threads = set(x.native_id for x in threading.enumerate())
+                record = next((
+                    x for x in pool
+                    if x['thread_id'] not in alive_threads and not self._is_in_use(x)
+                ), None)
+                if record is not None:
+                    # reserve it for the current thread before checking
+                    record['thread_id'] = thread_id
+                    stats['reused'] += 1
+                    taken = True
+            if record is None:
+                stats['misses'] += 1
                 return None
-            self.handlers[key]['expired_at'] = time() + self.ttl
-            return self.handlers[key]['handler']
+            # handler of another thread or kept longer than ttl (min_size) can be disconnected by server
+            need_check = taken or record['expired_at'] < time()
+            handler = record['handler']
+
+        if need_check and not self._is_healthy(handler):
+            with self._lock:
+                if record in pool:
+                    pool.remove(record)
+                stats['evicted'] += 1
+                stats['misses'] += 1
+            self._disconnect(handler)
+            return None
+
+        with self._lock:
+            record['expired_at'] = time() + self.ttl
+            stats['hits'] += 1
+        return handler
 
     def delete(self, name: str) -> None:
-        """ delete handler from cache
+        """ delete all handlers of integration from the pool. Handlers in use are not disconnected,
+            they will be closed when their users release them
 
             Args:
                 name (str): handler name
         """
         with self._lock:
-            key = (name, ctx.company_id, threading.get_native_id())
-            if key in self.handlers:
-                try:
-                    self.handlers[key].disconnect()
-                except Exception:
-                    pass
-                del self.handlers[key]
+            key = (name, ctx.company_id)
+            to_disconnect = [
+                record['handler']
+                for record in self.handlers.pop(key, [])
+                if not self._is_in_use(record)
+            ]
             if len(self.handlers) == 0:
                 self._stop_clean()
+        for handler in to_disconnect:
+            self._disconnect(handler)
+
+    def get_metrics(self) -> list:
+        """ get state of pools
+
+            Returns:
+                list[dict]: metrics for every integration
+        """
+        with self._lock:
+            metrics = []
+            for key, stats in self.stats.items():
+                name, company_id = key
+                pool = self.handlers.get(key, [])
+                in_use = len([x for x in pool if self._is_in_use(x)])
+                metrics.append({
+                    'name': name,
+                    'company_id': company_id,
+                    'size': len(pool),
+                    'in_use': in_use,
+                    'idle': len(pool) - in_use,
+                    **stats
+                })
+            return metrics
 
     def _clean(self) -> None:
-        """ worker that delete from cache handlers that was not in use for ttl
+        """ worker that delete from the pool handlers that was not in use for ttl
         """
         while self._stop_event.wait(timeout=3) is False:
+            to_disconnect = []
             with self._lock:
+                now = time()
                 for key in list(self.handlers.keys()):
-                    if (
-                        self.handlers[key]['expired_at'] < time()
-                        and sys.getrefcount(self.handlers[key]) == 2    # returned ref count is always 1 higher
-                    ):
-                        try:
-                            self.handlers[key].disconnect()
-                        except Exception:
-                            pass
+                    pool = self.handlers[key]
+                    # oldest first
+                    for record in sorted(pool, key=lambda x: x['expired_at']):
+                        if len(pool) <= self.min_size:
+                            break
+                        if record['expired_at'] < now and not self._is_in_use(record):
+                            to_disconnect.append(record['handler'])
+                            pool.remove(record)
+                            self._get_stats(key)['evicted'] += 1
+                    if len(pool) == 0:
                         del self.handlers[key]
                 if len(self.handlers) == 0:
                     self._stop_event.set()
+            for handler in to_disconnect:
+                self._disconnect(handler)
+            to_disconnect = None
 
 
 class IntegrationController:
@@ -155,7 +335,8 @@ class IntegrationController:
 
     def __init__(self):
         self._load_handler_modules()
-        self.handlers_cache = HandlersCache()
+        handlers_cache_config = Config().get('handlers_cache', {})
+        self.handlers_cache = HandlersCache(**handlers_cache_config)
 
     def _add_integration_record(self, name, engine, connection_args):
         integration_record = db.Integration(
@@ -512,7 +693,7 @@ class IntegrationController:
             logger.info("%s.get_handler: create a client to db service of %s type, args - %s", self.__class__.__name__, integration_engine, handler_ars)
             handler = HandlerClass(**handler_ars)
             # handler = DBClient(integration_engine, HandlerClass, **handler_ars)
-            self.handlers_cache.set(handler)
+            handler = self.handlers_cache.set(handler)
 
         return handler
 
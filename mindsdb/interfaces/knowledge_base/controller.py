@@ -1,4 +1,5 @@
 import copy
+import hashlib
 from typing import List
 
 import pandas as pd
@@ -17,7 +18,11 @@ from mindsdb_sql.parser.dialects.mindsdb import CreatePredictor
 
 import mindsdb.interfaces.storage.db as db
 from mindsdb.integrations.libs.vectordatabase_handler import TableField
+from mindsdb.interfaces.knowledge_base.embeddings_cache import embeddings_cache
 from mindsdb.utilities.exception import EntityExistsError, EntityNotExistsError
+from mindsdb.utilities.context_executor import ContextThreadPoolExecutor
+from mindsdb.utilities.config import Config
+from mindsdb.utilities.cache import get_cache
 
 
 class KnowledgeBaseTable:
@@ -29,6 +34,7 @@ class KnowledgeBaseTable:
     def __init__(self, kb: db.KnowledgeBase, session):
         self._kb = kb
         self._vector_db = None
+        self._model_info = None
         self.session = session
 
     def select_query(self, query: Select) -> pd.DataFrame:
@@ -103,6 +109,7 @@ class KnowledgeBaseTable:
         # send to vectordb
         db_handler = self._get_vector_db()
         db_handler.query(query)
+        self._drop_insert_checkpoint()
 
     def clear(self):
         """
@@ -111,24 +118,93 @@ class KnowledgeBaseTable:
         """
         db_handler = self._get_vector_db()
         db_handler.delete(self._kb.vector_database_table)
+        self._drop_insert_checkpoint()
 
     def insert(self, df: pd.DataFrame):
         """
         Insert dataframe to KB table
-        Adds embedding column to dataframe and calls .upsert method of vector db
+        Adds embedding column to dataframe and calls .upsert method of vector db.
+        Big dataframe is inserted by batches: embeddings for next batch are calculated
+        while previous batch is being written to vector db.
+        Count of stored rows is checkpointed after every batch: if insert fails,
+        repeated insert of the same dataframe continues from the last stored batch
         :param df: input dataframe
 
         """
         if df.empty:
             return
 
-        # add embeddings
+        batch_size = Config().get('knowledge_bases', {}).get('insert_batch_size', 1000)
+        db_handler = self._get_vector_db()
+
+        if len(df) <= batch_size:
+            self._upsert(db_handler, self._add_embeddings(df))
+            return
+
+        checkpoints = get_cache('kb_insert_checkpoints')
+        checkpoint_key = str(self._kb.id)
+        df_hash = self._get_df_hash(df)
+
+        inserted = 0
+        checkpoint = checkpoints.get(checkpoint_key)
+        if checkpoint is not None and df_hash is not None and checkpoint['hash'] == df_hash:
+            inserted = checkpoint['inserted']
+
+        def save_progress(rows):
+            nonlocal inserted
+            inserted += rows
+            if df_hash is not None:
+                checkpoints.set(checkpoint_key, {'hash': df_hash, 'inserted': inserted})
+
+        write_future = None
+        with ContextThreadPoolExecutor(max_workers=1) as executor:
+            try:
+                for start in range(inserted, len(df), batch_size):
+                    df_batch = df.iloc[start:start + batch_size]
+                    df_batch = self._add_embeddings(df_batch)
+
+                    # only one batch is written at the time
+                    if write_future is not None:
+                        save_progress(write_future.result())
+                    write_future = executor.submit(self._upsert, db_handler, df_batch)
+                if write_future is not None:
+                    save_progress(write_future.result())
+            except Exception as e:
+                raise RuntimeError(
+                    f'Insert to knowledge base failed, {inserted} of {len(df)} rows were stored: {e}'
+                ) from e
+
+        self._drop_insert_checkpoint()
+
+    @staticmethod
+    def _get_df_hash(df: pd.DataFrame):
+        """
+        Hash of dataframe content, it is used to match checkpoint with repeated insert
+        :param df: input dataframe
+        :return: hash or None if content is not hashable
+        """
+        try:
+            rows_hash = pd.util.hash_pandas_object(df, index=False).values
+        except TypeError:
+            return None
+        return hashlib.sha256(rows_hash.tobytes()).hexdigest()
+
+    def _drop_insert_checkpoint(self):
+        """
+        Remove checkpoint of failed insert: it is not valid after the content of KB is changed
+        """
+        checkpoints = get_cache('kb_insert_checkpoints')
+        checkpoint_key = str(self._kb.id)
+        if checkpoints.get(checkpoint_key) is not None:
+            checkpoints.delete(checkpoint_key)
+
+    def _add_embeddings(self, df: pd.DataFrame) -> pd.DataFrame:
         df_emb = self._df_to_embeddings(df)
-        df = pd.concat([df, df_emb], axis=1)
+        return pd.concat([df, df_emb], axis=1)
 
-        # send to vector db
-        db_handler = self._get_vector_db()
+    def _upsert(self, db_handler, df: pd.DataFrame) -> int:
         db_handler.do_upsert(self._kb.vector_database_table, df)
+        return len(df)
 
     def _replace_query_content(self, node, **kwargs):
         if isinstance(node, BinaryOperation):
@@ -148,46 +224,81 @@ class KnowledgeBaseTable:
             self._vector_db = self.session.integration_controller.get_handler(database_name)
         return self._vector_db
 
+    def _get_model_info(self) -> dict:
+        """
+        Returns description of embedding model. It is loaded from db once for KB table
+        :return: dict with model description
+        """
+        if self._model_info is None:
+            model_id = self._kb.embedding_model_id
+            model_rec = db.session.query(db.Predictor).filter_by(id=model_id).first()
+
+            assert model_rec is not None, f"Model not found: {model_id}"
+            model_project = db.session.query(db.Project).filter_by(id=model_rec.project_id).first()
+
+            self._model_info = {
+                'name': model_rec.name,
+                'project_name': model_project.name,
+                'input_col': model_rec.learn_args.get('using', {}).get('question_column'),
+                'target': model_rec.to_predict[0],
+                # namespace in embeddings cache
+                'cache_key': str(model_rec.id)
+            }
+        return self._model_info
+
     def _df_to_embeddings(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Returns embeddings for input dataframe.
         Uses model embedding model to convert content to embeddings.
-        Automatically detects input and output of model using model description
+        Automatically detects input and output of model using model description.
+        Embeddings of already seen content are taken from cache
         :param df:
         :return: dataframe with embeddings
         """
 
-        model_id = self._kb.embedding_model_id
-        # get the input columns
-        model_rec = db.session.query(db.Predictor).filter_by(id=model_id).first()
+        if df.empty:
+            return pd.DataFrame([], columns=[TableField.EMBEDDINGS.value])
 
-        assert model_rec is not None, f"Model not found: {model_id}"
-        model_project = db.session.query(db.Project).filter_by(id=model_rec.project_id).first()
+        model_info = self._get_model_info()
 
-        project_datanode = self.session.datahub.get(model_project.name)
+        contents = None
+        if TableField.CONTENT.value in df.columns:
+            contents = df[TableField.CONTENT.value].tolist()
+            embeddings = embeddings_cache.get_many(model_info['cache_key'], contents)
+        else:
+            embeddings = [None] * len(df)
 
-        # TODO adjust input
-        input_col = model_rec.learn_args.get('using', {}).get('question_column')
-        if input_col is not None and input_col != TableField.CONTENT.value:
-            df = df.rename(columns={TableField.CONTENT.value: input_col})
+        missed = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if len(missed) > 0:
+            df_missed = df.iloc[missed]
 
-        if df.empty:
-            df_out = pd.DataFrame([], columns=[TableField.EMBEDDINGS.value])
-        else:
-            data = df.to_dict('records')
+            # TODO adjust input
+            input_col = model_info['input_col']
+            if input_col is not None and input_col != TableField.CONTENT.value:
+                df_missed = df_missed.rename(columns={TableField.CONTENT.value: input_col})
 
+            project_datanode = self.session.datahub.get(model_info['project_name'])
             df_out = project_datanode.predict(
-                model_name=model_rec.name,
-                data=data,
+                model_name=model_info['name'],
+                data=df_missed.to_dict('records'),
             )
 
-            target = model_rec.to_predict[0]
+            target = model_info['target']
             if target != TableField.EMBEDDINGS.value:
                 # adapt output for vectordb
                 df_out = df_out.rename(columns={target: TableField.EMBEDDINGS.value})
-            df_out = df_out[[TableField.EMBEDDINGS.value]]
-
-        return df_out
+            new_embeddings = df_out[TableField.EMBEDDINGS.value].tolist()
+
+            for i, embedding in zip(missed, new_embeddings):
+                embeddings[i] = embedding
+            if contents is not None:
+                embeddings_cache.set_many(
+                    model_info['cache_key'],
+                    [contents[i] for i in missed],
+                    new_embeddings
+                )
+
+        return pd.DataFrame({TableField.EMBEDDINGS.value: embeddings}, index=df.index)
 
     def _content_to_embeddings(self, content: str) -> List[float]:
         """
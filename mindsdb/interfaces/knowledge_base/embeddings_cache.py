@@ -0,0 +1,119 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+
+import numpy as np
+
+from mindsdb.utilities.config import Config
+from mindsdb.utilities.cache import get_cache
+from mindsdb.utilities import log
+
+logger = log.getLogger(__name__)
+
+
+class EmbeddingsCache:
+    """ LRU cache of embeddings.
+        Key of the record is hash of the content, records are namespaced by embedding model.
+        Embeddings are kept in memory as float32 arrays, total size of them is limited by 'max_bytes'.
+        If 'persistent' is enabled: missed records are also searched in mindsdb cache (file or redis)
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, persistent: bool = False, max_size: int = 10000):
+        """
+            Args:
+                max_bytes (int): max size of embeddings kept in memory
+                persistent (bool): use mindsdb cache as second level of cache
+                max_size (int): max count of embeddings kept in mindsdb cache
+        """
+        self.max_bytes = max_bytes
+        self.persistent = persistent
+        self.max_size = max_size
+        self._data = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(model_key: str, content: str) -> str:
+        content_hash = hashlib.sha256(str(content).encode()).hexdigest()
+        return f'{model_key}_{content_hash}'
+
+    def _get_persistent_cache(self):
+        return get_cache('embeddings', max_size=self.max_size)
+
+    def get_many(self, model_key: str, contents: List[str]) -> List[Optional[list]]:
+        """ get embeddings for list of contents
+
+            Args:
+                model_key (str): namespace of embedding model
+                contents (List[str]): list of contents
+
+            Returns:
+                List[Optional[list]]: embeddings, None for contents missing in cache
+        """
+        keys = [self._key(model_key, content) for content in contents]
+        result = []
+        with self._lock:
+            for key in keys:
+                value = self._data.get(key)
+                if value is not None:
+                    self._data.move_to_end(key)
+                result.append(value)
+
+        if self.persistent and any(x is None for x in result):
+            try:
+                cache = self._get_persistent_cache()
+                found = {}
+                for i, key in enumerate(keys):
+                    if result[i] is None:
+                        value = cache.get(key)
+                        if value is not None:
+                            result[i] = found[key] = np.asarray(value, dtype=np.float32)
+                self._put(found)
+            except Exception as e:
+                logger.warning(f'Unable to read embeddings from cache: {e}')
+        return [None if value is None else value.tolist() for value in result]
+
+    def set_many(self, model_key: str, contents: List[str], embeddings: List[list]) -> None:
+        """ put embeddings to cache
+
+            Args:
+                model_key (str): namespace of embedding model
+                contents (List[str]): list of contents
+                embeddings (List[list]): embeddings of contents
+        """
+        records = {
+            self._key(model_key, content): np.asarray(embedding, dtype=np.float32)
+            for content, embedding in zip(contents, embeddings)
+        }
+        self._put(records)
+
+        if self.persistent:
+            try:
+                cache = self._get_persistent_cache()
+                for key, embedding in records.items():
+                    cache.set(key, embedding)
+            except Exception as e:
+                logger.warning(f'Unable to save embeddings to cache: {e}')
+
+    def _put(self, records: dict) -> None:
+        with self._lock:
+            for key, embedding in records.items():
+                if embedding.nbytes > self.max_bytes:
+                    continue
+                old = self._data.pop(key, None)
+                if old is not None:
+                    self._bytes -= old.nbytes
+                self._data[key] = embedding
+                self._bytes += embedding.nbytes
+            while self._bytes > self.max_bytes:
+                _, embedding = self._data.popitem(last=False)
+                self._bytes -= embedding.nbytes
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+
+embeddings_cache = EmbeddingsCache(**Config().get('knowledge_bases', {}).get('embeddings_cache', {}))
@@ -254,6 +254,23 @@ class ModelController():
                 }
         return data_integration_ref, fetch_data_query
 
+    @staticmethod
+    def _pop_fetch_data_options(using: dict) -> dict:
+        """ extract options of training data fetching from USING of the statement:
+            partitioning of fetch query, partition column must be integer
+
+            Args:
+                using (dict): USING clause of the statement, options are removed from it
+
+            Returns:
+                dict: options of fetching
+        """
+        fetch_data_options = {}
+        for key in ('fetch_partition_column', 'fetch_partitions'):
+            if key in using:
+                fetch_data_options[key[len('fetch_'):]] = using.pop(key)
+        return fetch_data_options
+
     def prepare_create_statement(self, statement, database_controller):
         # extract data from Create model or Retrain statement and prepare it for using in crate and retrain functions
         project_name = statement.name.parts[0].lower()
@@ -293,6 +310,8 @@ class ModelController():
             join_learn_process = problem_definition['using']['join_learn_process']
             del problem_definition['using']['join_learn_process']
 
+        fetch_data_options = self._pop_fetch_data_options(problem_definition.get('using', {}))
+
         return dict(
             model_name=model_name,
             project_name=project_name,
@@ -300,7 +319,8 @@ class ModelController():
             fetch_data_query=fetch_data_query,
             problem_definition=problem_definition,
             join_learn_process=join_learn_process,
-            label=label
+            label=label,
+            fetch_data_options=fetch_data_options
         )
 
     def create_model(self, statement, ml_handler):
@@ -372,6 +392,7 @@ class ModelController():
             args = statement.using
 
         join_learn_process = args.pop('join_learn_process', False)
+        fetch_data_options = self._pop_fetch_data_options(args)
 
         base_predictor_record = get_model_record(
             name=model_name,
@@ -394,7 +415,8 @@ class ModelController():
             args=args,
             join_learn_process=join_learn_process,
             label=label,
-            set_active=set_active
+            set_active=set_active,
+            fetch_data_options=fetch_data_options
         )
 
     @profiler.profile()
@@ -0,0 +1,223 @@
+import os
+import json
+import time
+import queue
+import tempfile
+import threading
+import datetime as dt
+from pathlib import Path
+
+import psutil
+
+from mindsdb.interfaces.storage import db
+from mindsdb.integrations.libs.const import PREDICTOR_STATUS
+from mindsdb.utilities.config import Config
+from mindsdb.utilities.context import context as ctx
+from mindsdb.utilities import log
+
+logger = log.getLogger(__name__)
+
+# interval (in seconds) of saving models' last_predicted_at to db
+TOUCH_INTERVAL = 60
+
+
+class ModelWarmup:
+    """ Loads models into ML processes in background, so first prediction does not wait for model loading.
+        Models are warmed up on server start (most recently used ones) and after training.
+        Every API process has own ML processes and warms up models for them. Status of every API process
+        is saved to a file in 'status_path', so readiness can be checked for all of them from one process.
+    """
+
+    def __init__(self, status_path: str = None):
+        config = Config().get('model_warmup', {})
+        self.enabled = config.get('enabled', False)
+        self.models_count = config.get('models_count', 5)
+        if status_path is None:
+            status_path = Path(tempfile.gettempdir()) / 'mindsdb' / 'model_warmup'
+        self.status_path = Path(status_path)
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._touched = {}
+        self._touch_thread = None
+        self._thread = None
+        self._pending = 0
+        self.stats = {
+            'done': 0,
+            'failed': 0
+        }
+
+    def touch(self, predictor_id: int) -> None:
+        """ remember time of model usage, it is saved to db in background
+
+            Args:
+                predictor_id (int): id of the model
+        """
+        if self.enabled is False:
+            return
+        with self._lock:
+            self._touched[predictor_id] = dt.datetime.now()
+            if self._touch_thread is None:
+                self._touch_thread = threading.Thread(target=self._touch_worker, name='model_warmup_touch')
+                self._touch_thread.daemon = True
+                self._touch_thread.start()
+
+    def _touch_worker(self) -> None:
+        while True:
+            time.sleep(TOUCH_INTERVAL)
+            self.save_touched()
+
+    def save_touched(self) -> None:
+        """ save last_predicted_at of used models to db in one transaction
+        """
+        with self._lock:
+            touched, self._touched = self._touched, {}
+        if len(touched) == 0:
+            return
+        try:
+            for predictor_id, last_predicted_at in touched.items():
+                db.session.query(db.Predictor).filter_by(id=predictor_id).update({
+                    'last_predicted_at': last_predicted_at,
+                    # keep updated_at unchanged
+                    'updated_at': db.Predictor.updated_at
+                }, synchronize_session=False)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.warning(f'Unable to save time of models usage: {e}')
+        finally:
+            db.session.remove()
+
+    def start(self, warm_shared: bool = True) -> None:
+        """ warm up most recently used models
+
+            Args:
+                warm_shared (bool): warm up models if ML processes are shared between API processes
+                    (redis ML task queue is used). Only one API process has to do it
+        """
+        if self.enabled is False:
+            return
+        if warm_shared is False and Config()['ml_task_queue']['type'] == 'redis':
+            self._save_status()
+            return
+        records = db.session.query(db.Predictor.id).filter(
+            db.Predictor.active == True,  # noqa
+            db.Predictor.status == PREDICTOR_STATUS.COMPLETE,
+            db.Predictor.deleted_at == None  # noqa
+        ).order_by(
+            db.Predictor.last_predicted_at.is_(None),
+            db.Predictor.last_predicted_at.desc(),
+            db.Predictor.training_stop_at.desc()
+        ).limit(self.models_count).all()
+        for record in records:
+            self.add_model(record.id)
+        # process without models to warm up is ready
+        self._save_status()
+
+    def add_model(self, predictor_id: int) -> None:
+        """ add model to the warmup queue
+
+            Args:
+                predictor_id (int): id of the model
+        """
+        if self.enabled is False:
+            return
+        with self._lock:
+            self._pending += 1
+            self._queue.put(predictor_id)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._worker, name='model_warmup')
+                self._thread.daemon = True
+                self._thread.start()
+        self._save_status()
+
+    def is_ready(self) -> bool:
+        """ check if all models in queue are warmed up
+        """
+        return self._pending == 0
+
+    def _get_own_status(self) -> dict:
+        return {
+            'ready': self.is_ready(),
+            'pending': self._pending,
+            **self.stats
+        }
+
+    def _save_status(self) -> None:
+        try:
+            self.status_path.mkdir(parents=True, exist_ok=True)
+            pid = os.getpid()
+            tmp_path = self.status_path / f'{pid}.tmp'
+            tmp_path.write_text(json.dumps(self._get_own_status()))
+            os.replace(tmp_path, self.status_path / str(pid))
+        except Exception as e:
+            logger.warning(f'Unable to save status of models warmup: {e}')
+
+    def get_status(self) -> dict:
+        """ status of warmup in all API processes
+
+            Returns:
+                dict: total status and status of every process
+        """
+        pid = os.getpid()
+        processes = {pid: self._get_own_status()}
+        if self.status_path.is_dir():
+            for path in self.status_path.iterdir():
+                if not path.name.isdigit() or int(path.name) == pid:
+                    continue
+                if not psutil.pid_exists(int(path.name)):
+                    path.unlink(missing_ok=True)
+                    continue
+                try:
+                    processes[int(path.name)] = json.loads(path.read_text())
+                except Exception:
+                    continue
+
+        return {
+            'enabled': self.enabled,
+            'ready': all(status['ready'] for status in processes.values()),
+            'pending': sum(status['pending'] for status in processes.values()),
+            'done': sum(status['done'] for status in processes.values()),
+            'failed': sum(status['failed'] for status in processes.values()),
+            'processes': processes
+        }
+
+    def _worker(self) -> None:
+        while True:
+            with self._lock:
+                try:
+                    predictor_id = self._queue.get_nowait()
+                except queue.Empty:
+                    self._thread = None
+                    return
+            try:
+                self._warmup_model(predictor_id)
+                self.stats['done'] += 1
+            except Exception as e:
+                self.stats['failed'] += 1
+                logger.warning(f'Unable to warm up model {predictor_id}: {e}')
+            finally:
+                with self._lock:
+                    self._pending -= 1
+                db.session.remove()
+                self._save_status()
+
+    def _warmup_model(self, predictor_id: int) -> None:
+        from mindsdb.interfaces.database.integrations import integration_controller
+
+        predictor_record = db.Predictor.query.get(predictor_id)
+        if (
+            predictor_record is None
+            or predictor_record.deleted_at is not None
+            or predictor_record.status != PREDICTOR_STATUS.COMPLETE
+        ):
+            return
+
+        ctx.set_default()
+        ctx.company_id = predictor_record.company_id
+        integration_record = db.Integration.query.get(predictor_record.integration_id)
+        ml_handler = integration_controller.get_handler(integration_record.name)
+        ml_handler.warmup(predictor_record).result()
+
+
+model_warmup = ModelWarmup()
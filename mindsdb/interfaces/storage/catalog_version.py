@@ -0,0 +1,104 @@
+"""
+Version of the catalog of the company: projects, integrations, views and models.
+
+The version is changed after commit of any change of these objects and is used to invalidate
+caches which depend on the catalog (cache of query plans). Versions are shared between processes:
+they are stored in redis if it is used as cache, or in files otherwise.
+Read versions are kept in the process for LOCAL_TTL seconds, so changes made by other
+processes are visible with this delay. Changes made by the process are visible at once.
+"""
+import time
+from typing import Optional
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from mindsdb.interfaces.storage import db
+from mindsdb.utilities.cache import get_versions
+from mindsdb.utilities.context import context as ctx
+from mindsdb.utilities import log
+
+logger = log.getLogger(__name__)
+
+# changes of other columns of model (training progress, last_predicted_at) don't affect the catalog
+PREDICTOR_COLUMNS = (
+    'name', 'active', 'deleted_at', 'status', 'data', 'learn_args', 'project_id', 'version', 'dtype_dict'
+)
+
+# seconds to keep read version in the process
+LOCAL_TTL = 1
+
+_registered = False
+# company_id -> (version, time of expiration)
+_local_versions = {}
+
+
+def _version_name(company_id) -> str:
+    return str(company_id)
+
+
+def get_catalog_version(company_id=None) -> Optional[str]:
+    """ get version of the catalog
+
+        Args:
+            company_id: id of the company, by default it is taken from the context
+
+        Returns:
+            Optional[str]: version, None if catalog was never changed
+    """
+    if company_id is None:
+        company_id = ctx.company_id
+    record = _local_versions.get(company_id)
+    if record is not None and record[1] > time.monotonic():
+        return record[0]
+    version = get_versions('catalog').get(_version_name(company_id))
+    _local_versions[company_id] = (version, time.monotonic() + LOCAL_TTL)
+    return version
+
+
+def bump_catalog_version(company_id=None) -> None:
+    if company_id is None:
+        company_id = ctx.company_id
+    version = get_versions('catalog').bump(_version_name(company_id))
+    _local_versions[company_id] = (version, time.monotonic() + LOCAL_TTL)
+
+
+def _on_change(mapper, connection, target):
+    session = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault('catalog_changes', set()).add(target.company_id)
+
+
+def _on_update(mapper, connection, target):
+    if isinstance(target, db.Predictor):
+        state = inspect(target)
+        if not any(state.attrs[column].history.has_changes() for column in PREDICTOR_COLUMNS):
+            return
+    _on_change(mapper, connection, target)
+
+
+def _after_commit(session):
+    for company_id in session.info.pop('catalog_changes', ()):
+        try:
+            bump_catalog_version(company_id)
+        except Exception as e:
+            logger.warning(f'Unable to change version of catalog: {e}')
+
+
+def _after_rollback(session):
+    session.info.pop('catalog_changes', None)
+
+
+def register_events() -> None:
+    """ track changes of the catalog, it is called once per process
+    """
+    global _registered
+    if _registered:
+        return
+    for model in (db.Predictor, db.Integration, db.View, db.Project):
+        event.listen(model, 'after_insert', _on_change)
+        event.listen(model, 'after_update', _on_update)
+        event.listen(model, 'after_delete', _on_change)
+    event.listen(Session, 'after_commit', _after_commit)
+    event.listen(Session, 'after_rollback', _after_rollback)
+    _registered = True
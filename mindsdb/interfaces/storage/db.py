@@ -53,6 +53,9 @@ def init(connection_str: str = None):
     session = scoped_session(sessionmaker(bind=engine, autoflush=True))
     Base.query = session.query_property()
 
+    from mindsdb.interfaces.storage.catalog_version import register_events
+    register_events()
+
 
 def serializable_insert(record: Base, try_count: int = 100):
     """Do serializeble insert. If fail - repeat it {try_count} times.
@@ -195,6 +198,7 @@ class Predictor(Base):
     training_phase_total = Column(Integer)
     training_phase_name = Column(String)
     hostname = Column(String)
+    last_predicted_at = Column(DateTime, nullable=True)
 
     @staticmethod
     def get_name_and_version(full_name):
@@ -1,11 +1,12 @@
 import os
 import io
+import stat
 import shutil
 import tarfile
 import hashlib
 from pathlib import Path
 from abc import ABC, abstractmethod
-from typing import Union, Optional
+from typing import Callable, Union, Optional
 from dataclasses import dataclass
 from datetime import datetime
 import threading
@@ -211,6 +212,188 @@ class FileLock:
             pass
 
 
+def unshare_files(path: Path) -> None:
+    """ replace files which are hard links to the artifacts cache with own writable copies,
+        so they can be modified in place
+
+        Args:
+            path (Path): file or folder
+    """
+    if path.is_file():
+        files = [path]
+    else:
+        files = [file_path for file_path in path.rglob('*') if file_path.is_file()]
+    for file_path in files:
+        file_stat = file_path.stat()
+        if file_stat.st_nlink < 2:
+            continue
+        tmp_path = file_path.with_name(file_path.name + '.unshare')
+        shutil.copyfile(file_path, tmp_path)
+        os.chmod(tmp_path, file_stat.st_mode | stat.S_IWUSR)
+        os.replace(tmp_path, file_path)
+
+
+class ArtifactsCache:
+    """ Host-level cache of extracted archives from remote storage. Entry of the cache is identified
+        by content hash of the archive, so all processes on the host share one extracted copy of each
+        resource version. Files are provided to resource folder as read-only hard links (copied if linking
+        is not possible). Files have to be replaced, not modified in place: FileStorage.get_path gives
+        own copies of files before they can be changed by caller.
+    """
+
+    COMPLETE_MARK_FILE_NAME = '.complete'
+
+    def __init__(self, path: Union[str, Path], max_size: Optional[int] = None):
+        """
+            Args:
+                path (Union[str, Path]): dir of the cache
+                max_size (int): max size of cached files in bytes, None - no limit
+        """
+        self.path = Path(path)
+        self.max_size = max_size
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def _entry_path(self, content_hash: str) -> Path:
+        return self.path / hashlib.sha256(content_hash.encode()).hexdigest()
+
+    def _lock(self, entry_path: Path) -> Optional[int]:
+        if os.name != 'posix':
+            return None
+        fd = os.open(str(entry_path) + '.lock', os.O_RDWR | os.O_CREAT)
+        fcntl.lockf(fd, fcntl.LOCK_EX)
+        return fd
+
+    @staticmethod
+    def _unlock(fd: Optional[int]) -> None:
+        if fd is None:
+            return
+        try:
+            fcntl.lockf(fd, fcntl.LOCK_UN)
+            os.close(fd)
+        except Exception:
+            pass
+
+    @staticmethod
+    def _link_tree(src: Path, dest: Path) -> None:
+        """ make hard links in dest to all files from src
+
+            Args:
+                src (Path): cache entry
+                dest (Path): resource folder
+        """
+        for src_dir, _dirs, files in os.walk(src):
+            dest_dir = dest / Path(src_dir).relative_to(src)
+            dest_dir.mkdir(parents=True, exist_ok=True)
+            for file_name in files:
+                if file_name in SERVICE_FILES_NAMES or file_name == ArtifactsCache.COMPLETE_MARK_FILE_NAME:
+                    continue
+                src_file = Path(src_dir) / file_name
+                dest_file = dest_dir / file_name
+                if dest_file.exists() and dest_file.samefile(src_file):
+                    continue
+                try:
+                    dest_file.unlink()
+                except FileNotFoundError:
+                    pass
+                try:
+                    os.link(src_file, dest_file)
+                except OSError:
+                    shutil.copyfile(src_file, dest_file)
+
+    def get(self, content_hash: str, dest: Path) -> bool:
+        """ provide files of cached entry to dest folder
+
+            Args:
+                content_hash (str): hash of the archive
+                dest (Path): resource folder
+
+            Returns:
+                bool: False if there is no such entry in cache
+        """
+        entry_path = self._entry_path(content_hash)
+        mark_path = entry_path / self.COMPLETE_MARK_FILE_NAME
+        if mark_path.is_file() is False:
+            return False
+        try:
+            self._link_tree(entry_path, dest)
+            mark_path.touch()
+        except FileNotFoundError:
+            # entry was evicted
+            return False
+        return True
+
+    def put(self, content_hash: str, extract: Callable, dest: Path) -> None:
+        """ extract archive to the cache (if it is not extracted by other process yet) and provide files to dest folder
+
+            Args:
+                content_hash (str): hash of the archive
+                extract (Callable): function which extracts archive to the given dir
+                dest (Path): resource folder
+        """
+        entry_path = self._entry_path(content_hash)
+        fd = self._lock(entry_path)
+        try:
+            if (entry_path / self.COMPLETE_MARK_FILE_NAME).is_file() is False:
+                tmp_path = Path(str(entry_path) + '.tmp')
+                shutil.rmtree(tmp_path, ignore_errors=True)
+                shutil.rmtree(entry_path, ignore_errors=True)
+                tmp_path.mkdir(parents=True)
+                extract(tmp_path)
+                # archive contains one folder with name of resource
+                content = list(tmp_path.iterdir())
+                if len(content) == 1 and content[0].is_dir():
+                    content[0].rename(entry_path)
+                    shutil.rmtree(tmp_path, ignore_errors=True)
+                else:
+                    tmp_path.rename(entry_path)
+                # shared files must not be modified in place
+                for file_path in entry_path.rglob('*'):
+                    if file_path.is_file():
+                        os.chmod(file_path, file_path.stat().st_mode & ~(stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH))
+                (entry_path / self.COMPLETE_MARK_FILE_NAME).touch()
+            self._link_tree(entry_path, dest)
+        finally:
+            self._unlock(fd)
+        self._evict()
+
+    def _evict(self) -> None:
+        """ remove least recently used entries while size of the cache exceeds the limit.
+            Files of removed entry which are linked to resource folders are not removed from disk
+        """
+        if self.max_size is None:
+            return
+        entries = []
+        for mark_path in self.path.glob(f'*/{self.COMPLETE_MARK_FILE_NAME}'):
+            try:
+                entries.append((mark_path.stat().st_mtime, get_dir_size(mark_path.parent), mark_path.parent))
+            except FileNotFoundError:
+                pass
+        total_size = sum(x[1] for x in entries)
+        for _mtime, size, entry_path in sorted(entries, key=lambda x: x[0]):
+            if total_size <= self.max_size:
+                break
+            fd = self._lock(entry_path)
+            try:
+                shutil.rmtree(entry_path, ignore_errors=True)
+            finally:
+                self._unlock(fd)
+            total_size -= size
+
+
+def get_artifacts_cache() -> Optional[ArtifactsCache]:
+    """ get host-level cache of extracted archives, if it is enabled in config
+
+        Returns:
+            Optional[ArtifactsCache]
+    """
+    config = Config()
+    cache_config = config.get('artifacts_cache', {})
+    if cache_config.get('enabled', False) is False:
+        return None
+    path = cache_config.get('path') or os.path.join(config['paths']['root'], 'artifacts_cache')
+    return ArtifactsCache(path, max_size=cache_config.get('max_size'))
+
+
 class S3FSStore(BaseFSStore):
     """Storage that stores files in amazon s3
     """
@@ -225,6 +408,7 @@ class S3FSStore(BaseFSStore):
             self.s3 = boto3.client('s3')
         self.bucket = self.config['permanent_storage']['bucket']
         self._thread_lock = threading.Lock()
+        self.artifacts_cache = get_artifacts_cache()
 
     def _get_remote_last_modified(self, object_name: str) -> datetime:
         """ get time when object was created/modified
@@ -280,7 +464,8 @@ class S3FSStore(BaseFSStore):
     @profiler.profile()
     def _download(self, base_dir: str, remote_ziped_name: str,
                   local_ziped_path: str, last_modified: datetime = None):
-        """ download file to s3 and unarchive it
+        """ download file to s3 and unarchive it. If artifacts cache is enabled and it is model storage,
+            then archive is extracted to the cache and files are linked to base_dir
 
             Args:
                 base_dir (str)
@@ -290,20 +475,26 @@ class S3FSStore(BaseFSStore):
         """
         os.makedirs(base_dir, exist_ok=True)
 
-        remote_size = self.s3.get_object_attributes(
+        attributes = self.s3.get_object_attributes(
             Bucket=self.bucket,
             Key=remote_ziped_name,
-            ObjectAttributes=['ObjectSize']
-        )['ObjectSize']
-        if (remote_size * 2) > psutil.virtual_memory().available:
-            fh = io.BytesIO()
-            self.s3.download_fileobj(self.bucket, remote_ziped_name, fh)
-            with tarfile.open(fileobj=fh) as tar:
-                tar.extractall(path=base_dir)
+            ObjectAttributes=['ObjectSize', 'ETag']
+        )
+        remote_size = attributes['ObjectSize']
+        local_name = remote_ziped_name.replace('.tar.gz', '')
+
+        # only models are cached: storages of handlers are changed in place
+        if self.artifacts_cache is None or not local_name.startswith(f'{RESOURCE_GROUP.PREDICTOR}_'):
+            self._extract(base_dir, remote_ziped_name, local_ziped_path, remote_size)
         else:
-            self.s3.download_file(self.bucket, remote_ziped_name, local_ziped_path)
-            shutil.unpack_archive(local_ziped_path, base_dir)
-            os.remove(local_ziped_path)
+            content_hash = f"{attributes['ETag']}-{remote_size}"
+            folder_path = Path(base_dir) / local_name
+            if self.artifacts_cache.get(content_hash, folder_path) is False:
+                self.artifacts_cache.put(
+                    content_hash,
+                    lambda path: self._extract(str(path), remote_ziped_name, local_ziped_path, remote_size),
+                    folder_path
+                )
 
         # os.system(f'chmod -R 777 {base_dir}')
 
@@ -311,10 +502,30 @@ class S3FSStore(BaseFSStore):
             last_modified = self._get_remote_last_modified(remote_ziped_name)
         self._save_local_last_modified(
             base_dir,
-            remote_ziped_name.replace('.tar.gz', ''),
+            local_name,
             last_modified
         )
 
+    def _extract(self, base_dir: str, remote_ziped_name: str, local_ziped_path: str, remote_size: int):
+        """ download archive from s3 and extract it to base_dir
+
+            Args:
+                base_dir (str)
+                remote_ziped_name (str)
+                local_ziped_path (str)
+                remote_size (int): size of archive
+        """
+        if (remote_size * 2) > psutil.virtual_memory().available:
+            fh = io.BytesIO()
+            self.s3.download_fileobj(self.bucket, remote_ziped_name, fh)
+            fh.seek(0)
+            with tarfile.open(fileobj=fh) as tar:
+                tar.extractall(path=base_dir)
+        else:
+            self.s3.download_file(self.bucket, remote_ziped_name, local_ziped_path)
+            shutil.unpack_archive(local_ziped_path, base_dir)
+            os.remove(local_ziped_path)
+
     @profiler.profile()
     def get(self, local_name, base_dir):
         remote_name = local_name
@@ -467,6 +678,11 @@ class FileStorage:
         with FileLock(self.folder_path, mode='w'):
 
             dest_abs_path = self.folder_path / name
+            # file may be a link to the artifacts cache, it must be replaced, not modified
+            try:
+                dest_abs_path.unlink()
+            except FileNotFoundError:
+                pass
 
             with open(dest_abs_path, 'wb') as fd:
                 fd.write(content)
@@ -517,6 +733,9 @@ class FileStorage:
             else:
                 dest_abs_path = self.folder_path / dest_rel_path
 
+            if dest_abs_path.exists() and getattr(self.fs_store, 'artifacts_cache', None) is not None:
+                unshare_files(dest_abs_path)
+
             copy(
                 str(path),
                 str(dest_abs_path)
@@ -556,6 +775,11 @@ class FileStorage:
                 # raise Exception('Path does not exists')
                 os.makedirs(ret_path)
 
+        if getattr(self.fs_store, 'artifacts_cache', None) is not None:
+            # caller can change files in place: they must not be shared with the cache
+            with FileLock(self.folder_path, mode='w'):
+                unshare_files(ret_path)
+
         return ret_path
 
     def delete(self, relative_path: Union[str, Path] = '.'):
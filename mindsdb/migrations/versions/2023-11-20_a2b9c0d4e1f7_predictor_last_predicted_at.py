@@ -0,0 +1,26 @@
+"""predictor_last_predicted_at
+
+Revision ID: a2b9c0d4e1f7
+Revises: c67822e96833
+Create Date: 2023-11-20 12:10:41.508337
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import mindsdb.interfaces.storage.db # noqa
+
+# revision identifiers, used by Alembic.
+revision = 'a2b9c0d4e1f7'
+down_revision = 'c67822e96833'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('predictor', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('last_predicted_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('predictor', schema=None) as batch_op:
+        batch_op.drop_column('last_predicted_at')
@@ -14,11 +14,22 @@ How to use it:
         df_predict = predictor.predict(df)
         cache.set(key, df_predict)
 
+    # many records at once
+    values = cache.get_many([key1, key2])
+    cache.set_many({key1: value1, key2: value2})
+
+    # versions of objects to invalidate cached records, they are never evicted
+    versions = get_versions('tables')
+    versions.bump(name)
+    version = versions.get(name)  # None if object was never changed
+
 
 
 Configuration:
 
 - max_size size of cache in count of records, default is 50
+- max_bytes size of cache in bytes, default is None (no limit). If it is set,
+    least recently used records are removed first
 - serializer, module for serialization, default is dill
 
 It can be set via:
@@ -58,6 +69,7 @@ from abc import ABC
 from pathlib import Path
 import hashlib
 import typing as t
+from uuid import uuid4
 
 import pandas as pd
 import walrus
@@ -84,11 +96,12 @@ def str_checksum(obj: str):
 
 
 class BaseCache(ABC):
-    def __init__(self, max_size=None, serializer=None):
+    def __init__(self, max_size=None, serializer=None, max_bytes=None):
         self.config = Config()
         if max_size is None:
             max_size = self.config["cache"].get("max_size", 50)
         self.max_size = max_size
+        self.max_bytes = max_bytes
         if serializer is None:
             serializer_module = self.config["cache"].get('serializer')
             if serializer_module == 'pickle':
@@ -105,6 +118,13 @@ class BaseCache(ABC):
     def get_df(self, name):
         return self.get(name)
 
+    def get_many(self, names: list) -> list:
+        return [self.get(name) for name in names]
+
+    def set_many(self, values: dict):
+        for name, value in values.items():
+            self.set(name, value)
+
     def serialize(self, value):
         return self.serializer.dumps(value)
 
@@ -133,6 +153,9 @@ class FileCache(BaseCache):
             # buffer to delete, to not run delete on every adding
             buffer_size = 5
 
+            if self.max_bytes is not None:
+                self.clear_by_size()
+
             if self.max_size is None:
                 return
 
@@ -146,6 +169,26 @@ class FileCache(BaseCache):
                 except FileNotFoundError:
                     pass
 
+    def clear_by_size(self):
+        # remove least recently used files (mtime is updated on reading) until size of cache fits max_bytes
+        files = []
+        for file in Path(self.path).iterdir():
+            try:
+                stat = file.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, file))
+        total_size = sum(x[1] for x in files)
+        files.sort(key=lambda x: x[0])
+        for _, size, file in files:
+            if total_size <= self.max_bytes:
+                break
+            try:
+                self.delete_file(file)
+            except FileNotFoundError:
+                pass
+            total_size -= size
+
     def file_path(self, name):
         return self.path / name
 
@@ -178,9 +221,37 @@ class FileCache(BaseCache):
                 return None
             with open(path, 'rb') as fd:
                 value = fd.read()
+            if self.max_bytes is not None:
+                # mark as recently used
+                os.utime(path)
         value = self.deserialize(value)
         return value
 
+    def get_many(self, names):
+        values = []
+        with FileLock(self.path):
+            for name in names:
+                path = self.file_path(name)
+                if not os.path.exists(path):
+                    values.append(None)
+                    continue
+                with open(path, 'rb') as fd:
+                    values.append(fd.read())
+                if self.max_bytes is not None:
+                    # mark as recently used
+                    os.utime(path)
+        return [
+            None if value is None else self.deserialize(value)
+            for value in values
+        ]
+
+    def set_many(self, values):
+        for name, value in values.items():
+            path = self.file_path(name)
+            with open(path, 'wb') as fd:
+                fd.write(self.serialize(value))
+        self.clear_old_cache()
+
     def delete(self, name):
         path = self.file_path(name)
         self.delete_file(path)
@@ -205,8 +276,9 @@ class RedisCache(BaseCache):
         if self.max_size is None:
             return
 
-        # buffer to delete, to not run delete on every adding
-        buffer_size = 5
+        # buffer to delete, to not run delete on every adding.
+        # For big caches it is proportional to size: all keys are read to find the oldest
+        buffer_size = max(5, self.max_size // 10)
 
         cur_count = self.client.hlen(self.category)
 
@@ -226,6 +298,26 @@ class RedisCache(BaseCache):
     def redis_key(self, name):
         return f'{self.category}_{name}'
 
+    def sizes_key(self):
+        return f'{self.category}_sizes'
+
+    def clear_by_size(self):
+        # remove least recently used keys until size of cache fits max_bytes
+        sizes = {
+            key: int(size)
+            for key, size in self.client.hgetall(self.sizes_key()).items()
+        }
+        total_size = sum(sizes.values())
+        if total_size <= self.max_bytes:
+            return
+        keys = list(self.client.hgetall(self.category).items())
+        keys.sort(key=lambda x: int(x[1]))
+        for key, _ in keys:
+            if total_size <= self.max_bytes:
+                break
+            self.delete_key(key)
+            total_size -= sizes.get(key, 0)
+
     def set(self, name, value):
         key = self.redis_key(name)
         value = self.serialize(value)
@@ -234,6 +326,10 @@ class RedisCache(BaseCache):
         # using key with category name to store all keys with modify time
         self.client.hset(self.category, key, int(time.time() * 1000))
 
+        if self.max_bytes is not None:
+            self.client.hset(self.sizes_key(), key, len(value))
+            self.clear_by_size()
+
         self.clear_old_cache(key)
 
     def get(self, name):
@@ -242,8 +338,45 @@ class RedisCache(BaseCache):
         if value is None:
             # no value in cache
             return None
+        if self.max_bytes is not None:
+            # mark as recently used
+            self.client.hset(self.category, key, int(time.time() * 1000))
         return self.deserialize(value)
 
+    def get_many(self, names):
+        if len(names) == 0:
+            return []
+        keys = [self.redis_key(name) for name in names]
+        values = self.client.mget(keys)
+        if self.max_bytes is not None:
+            # mark as recently used
+            timestamp = int(time.time() * 1000)
+            found = {key: timestamp for key, value in zip(keys, values) if value is not None}
+            if len(found) > 0:
+                self.client.hset(self.category, mapping=found)
+        return [
+            None if value is None else self.deserialize(value)
+            for value in values
+        ]
+
+    def set_many(self, values):
+        if len(values) == 0:
+            return
+        timestamp = int(time.time() * 1000)
+        pipeline = self.client.pipeline()
+        for name, value in values.items():
+            key = self.redis_key(name)
+            value = self.serialize(value)
+            pipeline.set(key, value)
+            pipeline.hset(self.category, key, timestamp)
+            if self.max_bytes is not None:
+                pipeline.hset(self.sizes_key(), key, len(value))
+        pipeline.execute()
+
+        if self.max_bytes is not None:
+            self.clear_by_size()
+        self.clear_old_cache(None)
+
     def delete(self, name):
         key = self.redis_key(name)
 
@@ -252,6 +385,8 @@ class RedisCache(BaseCache):
     def delete_key(self, key):
         self.client.delete(key)
         self.client.hdel(self.category, key)
+        if self.max_bytes is not None:
+            self.client.hdel(self.sizes_key(), key)
 
 
 class NoCache:
@@ -267,6 +402,96 @@ class NoCache:
     def set(self, name, value):
         pass
 
+    def get_many(self, names):
+        return [None] * len(names)
+
+    def set_many(self, values):
+        pass
+
+    def delete(self, name):
+        pass
+
+
+class FileVersions:
+    """ Versions of objects, used to invalidate cached records which depend on the objects.
+        Versions are never evicted: missing version means that object was never changed.
+        Every version is stored in own file
+    """
+
+    def __init__(self, category, path=None):
+        if path is None:
+            path = Config()['paths']['cache']
+        self.path = Path(path) / f'{category}_versions'
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def get_many(self, names: list) -> list:
+        values = []
+        for name in names:
+            try:
+                values.append((self.path / name).read_text())
+            except FileNotFoundError:
+                values.append(None)
+        return values
+
+    def get(self, name: str) -> t.Optional[str]:
+        return self.get_many([name])[0]
+
+    def bump(self, name: str) -> str:
+        version = uuid4().hex
+        tmp_path = self.path / f'{name}.{version}'
+        tmp_path.write_text(version)
+        os.replace(tmp_path, self.path / name)
+        return version
+
+
+class RedisVersions:
+    """ Versions of objects stored in redis hash, see FileVersions
+    """
+
+    def __init__(self, category, connection_info=None):
+        if connection_info is None:
+            connection_info = Config()["cache"].get("connection", {})
+        self.client = walrus.Database(**connection_info)
+        self.key = f'{category}_versions'
+
+    def get_many(self, names: list) -> list:
+        if len(names) == 0:
+            return []
+        return [
+            None if value is None else value.decode()
+            for value in self.client.hmget(self.key, names)
+        ]
+
+    def get(self, name: str) -> t.Optional[str]:
+        return self.get_many([name])[0]
+
+    def bump(self, name: str) -> str:
+        version = uuid4().hex
+        self.client.hset(self.key, name, version)
+        return version
+
+
+_versions_clients = {}
+
+
+def get_versions(category, cache_type=None):
+    """ get client of versions, clients are created once per process
+    """
+    config = Config()
+    if cache_type is None:
+        cache_type = config.get('cache')['type']
+    if cache_type == 'redis':
+        key = ('redis', category)
+        cls = RedisVersions
+    else:
+        key = (config['paths']['cache'], category)
+        cls = FileVersions
+    client = _versions_clients.get(key)
+    if client is None:
+        client = cls(category)
+        _versions_clients[key] = client
+    return client
+
 
 def get_cache(category, **kwargs):
     config = Config()
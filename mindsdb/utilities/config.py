@@ -102,6 +102,8 @@ class Config():
             ml_queue['db'] = int(os.environ.get('MINDSDB_ML_QUEUE_DB', 0))
             ml_queue['username'] = os.environ.get('MINDSDB_ML_QUEUE_USERNAME')
             ml_queue['password'] = os.environ.get('MINDSDB_ML_QUEUE_PASSWORD')
+            ml_queue['compression'] = os.environ.get('MINDSDB_ML_QUEUE_COMPRESSION')
+            ml_queue['codec'] = os.environ.get('MINDSDB_ML_QUEUE_CODEC', 'auto')
 
         api_host = "127.0.0.1" if not self.use_docker_env else "0.0.0.0"
         self._default_config = {
@@ -152,7 +154,77 @@ class Config():
                 }
             },
             "cache": {
-                "type": "local"
+                "type": "local",
+                "predict_rows_cache": False,
+                "predict_rows_max_size": 100000
+            },
+            "handlers_cache": {
+                "ttl": 60,
+                "max_size": 10,
+                "min_size": 0,
+                "wait_timeout": 30
+            },
+            "knowledge_bases": {
+                "insert_batch_size": 1000,
+                "embeddings_cache": {
+                    "max_bytes": 64 * 1024 * 1024,
+                    "persistent": False,
+                    "max_size": 10000
+                }
+            },
+            "ml_handlers_cache": {
+                "max_size": 5,
+                "max_memory": 4 * 1024 * 1024 * 1024
+            },
+            "process_cache": {
+                "max_processes": 16,
+                "max_processes_per_handler": 8,
+                "max_memory_usage": 90,
+                "predict_batching": {
+                    "enabled": False,
+                    "max_rows": 1000,
+                    "window": 0.005
+                }
+            },
+            "artifacts_cache": {
+                "enabled": False,
+                "path": None,
+                "max_size": None
+            },
+            "training_data": {
+                "spool": False,
+                "batch_size": 100000
+            },
+            "model_warmup": {
+                "enabled": False,
+                "models_count": 5
+            },
+            "executor": {
+                "max_workers": 1,
+                "dag_max_workers": 1,
+                "dag_wait_pushdown": False,
+                "integration_max_workers": {},
+                "release_step_results": True,
+                "spill_rows_threshold": None
+            },
+            "plan_cache": {
+                "enabled": False,
+                "max_size": 1000
+            },
+            "query_cache": {
+                "enabled": False,
+                "type": None,
+                "ttl": 60,
+                "integrations_ttl": {},
+                "max_bytes": 512 * 1024 * 1024,
+                "max_records": 1000
+            },
+            "metadata_catalog": {
+                "enabled": False,
+                "ttl": 60,
+                "max_stale": 3600,
+                "timeout": 10,
+                "max_workers": 16
             },
             'ml_task_queue': ml_queue
         }
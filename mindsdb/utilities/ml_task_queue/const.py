@@ -1,15 +1,42 @@
 from enum import Enum
 
 
+# lane of learn/finetune tasks
 TASKS_STREAM_NAME = b'ml-tasks'
+# lane of predict tasks, it is read before learn lane
+TASKS_PREDICT_STREAM_NAME = b'ml-tasks-predict'
+# prefix of consumer's own lane: predict tasks for models loaded by the consumer
+TASKS_CONSUMER_STREAM_PREFIX = 'ml-tasks-consumer-'
 TASKS_STREAM_CONSUMER_GROUP_NAME = 'ml_executors'
-TASKS_STREAM_CONSUMER_NAME = 'ml_executor'
+# hash with state of alive consumers: consumer name -> loaded models and load
+CONSUMERS_REGISTRY_KEY = 'ml-consumers'
+# consumer is alive if it updated its state in registry during this time (seconds)
+CONSUMER_TTL = 15
+# messages of other consumer's lane, which are waiting longer that this time (seconds), can be taken by idle consumer
+STEAL_AFTER = 2
 
 
 class ML_TASK_TYPE(Enum):
     LEARN = b'learn'
     PREDICT = b'predict'
     FINETUNE = b'finetune'
+    WARMUP = b'warmup'
+
+
+PREDICT_TASK_TYPES = (ML_TASK_TYPE.PREDICT, ML_TASK_TYPE.WARMUP)
+
+# estimation of resources which task requires:
+#   max_cpu_usage: task is not started if CPU usage (%) is higher
+#   cpu_share: share of consumer's CPU occupied by the task. Task is not started if total share
+#       of running tasks would exceed 1 (but one task can always be started)
+ML_TASK_RESOURCES = {
+    ML_TASK_TYPE.PREDICT: {'max_cpu_usage': 90, 'cpu_share': 0.05},
+    ML_TASK_TYPE.WARMUP: {'max_cpu_usage': 60, 'cpu_share': 0.05},
+    ML_TASK_TYPE.LEARN: {'max_cpu_usage': 60, 'cpu_share': 0.4},
+    ML_TASK_TYPE.FINETUNE: {'max_cpu_usage': 60, 'cpu_share': 0.4},
+}
+# share of consumer's CPU which can't be occupied by learn and finetune tasks: it is left for predictions
+RESERVED_PREDICT_SHARE = 0.2
 
 
 class ML_TASK_STATUS(Enum):
@@ -18,3 +45,8 @@ class ML_TASK_STATUS(Enum):
     COMPLETE = b'complete'
     ERROR = b'error'
     TIMEOUT = b'timeout'
+
+
+class DATAFRAME_CODEC(Enum):
+    ARROW = b'arrow'
+    PICKLE = b'pickle'
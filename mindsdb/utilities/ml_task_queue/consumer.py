@@ -1,30 +1,41 @@
 import os
 import time
 import signal
+import socket
 import tempfile
 import threading
+from uuid import uuid4
 from pathlib import Path
 from functools import wraps
 from collections.abc import Callable
+from typing import List, Optional
 
 import psutil
 from walrus import Database
 from pandas import DataFrame
-from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import ConnectionError as RedisConnectionError, ResponseError as RedisResponseError
 
 from mindsdb.utilities.config import Config
 from mindsdb.utilities.context import context as ctx
 from mindsdb.integrations.libs.process_cache import process_cache
-from mindsdb.utilities.ml_task_queue.utils import RedisKey, StatusNotifier, to_bytes, from_bytes
+from mindsdb.utilities.ml_task_queue.utils import (
+    RedisKey, StatusNotifier, ConsumersRegistry, to_bytes, from_bytes, set_dataframe, get_dataframe,
+    get_consumer_stream_name
+)
 from mindsdb.utilities.ml_task_queue.base import BaseRedisQueue
 from mindsdb.utilities.fs import clean_unlinked_process_marks
 from mindsdb.utilities.functions import mark_process
 from mindsdb.utilities.ml_task_queue.const import (
     ML_TASK_TYPE,
     ML_TASK_STATUS,
+    ML_TASK_RESOURCES,
+    PREDICT_TASK_TYPES,
+    RESERVED_PREDICT_SHARE,
     TASKS_STREAM_NAME,
-    TASKS_STREAM_CONSUMER_NAME,
-    TASKS_STREAM_CONSUMER_GROUP_NAME
+    TASKS_PREDICT_STREAM_NAME,
+    TASKS_STREAM_CONSUMER_GROUP_NAME,
+    CONSUMER_TTL,
+    STEAL_AFTER
 )
 from mindsdb.utilities import log
 
@@ -50,16 +61,21 @@ def _save_thread_link(func: Callable) -> Callable:
 class MLTaskConsumer(BaseRedisQueue):
     """ Listener of ML tasks queue and tasks executioner.
         Each new message waited and executed in separate thread.
+        Tasks are read by priority: own lane (predict tasks for models loaded by the consumer),
+        common predict lane, own lanes of other consumers (if tasks wait there too long),
+        learn lane. Task is read only if there are enough free resources for it.
 
         Attributes:
+            name (str): unique name of the consumer
+            stream_name (str): name of the consumer's own lane
             _ready_event (Event): set if ready to start new queue listen thread
             _stop_event (Event): set if need to stop all threads/processes
             cpu_stat (list[float]): CPU usage statistic. Each value is 0-100 float representing CPU usage in %
             _collect_cpu_stat_thread (Thread): pointer to thread that collecting CPU usage statistic
             _listen_message_threads (list[Thread]): list of pointers to threads where queue messages are listening/processing
+            _running (dict): types of running tasks, by thread id
             db (Redis): database object
-            cache: redis cache abstrtaction
-            consumer_group: redis consumer group object
+            status_notifier (StatusNotifier): sender of statuses of executing tasks
     """
 
     def __init__(self) -> None:
@@ -71,6 +87,10 @@ class MLTaskConsumer(BaseRedisQueue):
 
         process_cache.init()
 
+        self.name = f'{socket.gethostname()}-{os.getpid()}-{uuid4().hex[:8]}'
+        self.stream_name = get_consumer_stream_name(self.name)
+        self._running = {}
+
         # region collect cpu usage statistic
         self.cpu_stat = [0] * 10
         self._collect_cpu_stat_thread = threading.Thread(target=self._collect_cpu_stat)
@@ -91,21 +111,44 @@ class MLTaskConsumer(BaseRedisQueue):
         )
         self.wait_redis_ping(60)
 
-        self.db.Stream(TASKS_STREAM_NAME)
-        self.cache = self.db.cache()
-        self.consumer_group = self.db.consumer_group(TASKS_STREAM_CONSUMER_GROUP_NAME, [TASKS_STREAM_NAME])
-        self.consumer_group.create()
-        self.consumer_group.consumer(TASKS_STREAM_CONSUMER_NAME)
+        self.status_notifier = StatusNotifier(self.db)
+        self.status_notifier.start()
+        self.compression = config.get('compression')
+        self.codec = config.get('codec', 'auto')
+        self._create_groups()
+        self._update_registry()
         # endregion
 
     def _collect_cpu_stat(self) -> None:
         """ Collect CPU usage statistic. Executerd in thread.
         """
+        i = 0
         while self._stop_event.is_set() is False:
             self.cpu_stat = self.cpu_stat[1:]
             self.cpu_stat.append(psutil.cpu_percent())
+            i += 1
+            if i % 5 == 0:
+                try:
+                    self._update_registry()
+                except Exception as e:
+                    logger.warning(f"Can't update consumer state: {e}")
             time.sleep(1)
 
+    def _create_groups(self) -> None:
+        """ create consumer group in streams which are read by the consumer
+        """
+        for stream_name in (self.stream_name, TASKS_PREDICT_STREAM_NAME, TASKS_STREAM_NAME):
+            self.db.consumer_group(TASKS_STREAM_CONSUMER_GROUP_NAME, [stream_name]).create()
+
+    def _update_registry(self) -> None:
+        """ save list of models loaded by the consumer and its load to redis
+        """
+        models = set()
+        for processes in process_cache.get_processes_info().values():
+            for process in processes:
+                models.update(model_id for model_id, _company_id in process['models'])
+        ConsumersRegistry.update(self.db, self.name, list(models), len(self._running))
+
     def get_avg_cpu_usage(self) -> float:
         """ get average CPU usage for last period (10s by default)
 
@@ -114,39 +157,196 @@ class MLTaskConsumer(BaseRedisQueue):
         """
         return sum(self.cpu_stat) / len(self.cpu_stat)
 
-    def wait_free_resources(self) -> None:
-        """ Sleep in thread untill there are free resources. Checks:
-            - avg CPU usage is less than 60%
-            - current CPU usage is less than 60%
-            - current tasks count is less than (N CPU cores) / 8
+    def can_start(self, task_type: ML_TASK_TYPE) -> bool:
+        """ check if there are enough free resources to start the task:
+            - avg and current CPU usage are less than task's limit
+            - total CPU share of running tasks and new task is not more than 1
+            - total CPU share of running learn/finetune tasks and new one is not more than 1 - RESERVED_PREDICT_SHARE
+            - for learn tasks in cloud: count of learn processes is less than (N CPU cores) / 8
+
+            Args:
+                task_type (ML_TASK_TYPE): type of the task
+
+            Returns:
+                bool
         """
-        config = Config()
-        is_cloud = config.get('cloud', False)
-        processes_dir = Path(tempfile.gettempdir()).joinpath('mindsdb/processes/learn/')
-        while True:
-            while self.get_avg_cpu_usage() > 60 or max(self.cpu_stat[-3:]) > 60:
-                time.sleep(1)
-            if is_cloud and processes_dir.is_dir():
+        resources = ML_TASK_RESOURCES[task_type]
+        max_cpu_usage = resources['max_cpu_usage']
+        if self.get_avg_cpu_usage() > max_cpu_usage or max(self.cpu_stat[-3:]) > max_cpu_usage:
+            return False
+
+        running = list(self._running.values())
+        if len(running) > 0:
+            cpu_share = sum(ML_TASK_RESOURCES[x]['cpu_share'] for x in running)
+            if cpu_share + resources['cpu_share'] > 1:
+                return False
+            if task_type not in PREDICT_TASK_TYPES:
+                cpu_share = sum(ML_TASK_RESOURCES[x]['cpu_share'] for x in running if x not in PREDICT_TASK_TYPES)
+                if cpu_share + resources['cpu_share'] > 1 - RESERVED_PREDICT_SHARE:
+                    return False
+
+        if task_type in (ML_TASK_TYPE.LEARN, ML_TASK_TYPE.FINETUNE) and Config().get('cloud', False):
+            processes_dir = Path(tempfile.gettempdir()).joinpath('mindsdb/processes/learn/')
+            if processes_dir.is_dir():
                 clean_unlinked_process_marks()
-                while (len(list(processes_dir.iterdir())) * 8) >= os.cpu_count():
-                    time.sleep(1)
-                    clean_unlinked_process_marks()
-            if (self.get_avg_cpu_usage() > 60 or max(self.cpu_stat[-3:]) > 60) is False:
-                return
+                if (len(list(processes_dir.iterdir())) * 8) >= os.cpu_count():
+                    return False
+        return True
+
+    def _read(self, stream_names: List[str], block: Optional[int] = None) -> List[tuple]:
+        """ read messages from streams as member of consumer group. Read messages are removed from streams
+
+            Args:
+                stream_names (List[str]): names of streams
+                block (int): milliseconds to wait messages, None - do not wait
+
+            Returns:
+                List[tuple]: list of (stream name, message content), ordered as stream_names
+        """
+        response = self.db.xreadgroup(
+            TASKS_STREAM_CONSUMER_GROUP_NAME, self.name,
+            {stream_name: '>' for stream_name in stream_names},
+            count=1, block=block
+        )
+        if isinstance(response, dict):
+            # RESP3
+            response = [(stream_name, messages[0]) for stream_name, messages in response.items()]
+        messages = {}
+        pipeline = self.db.pipeline()
+        for stream_name, stream_messages in response or []:
+            if isinstance(stream_name, bytes):
+                stream_name = stream_name.decode()
+            for message_id, message_content in stream_messages:
+                pipeline.xack(stream_name, TASKS_STREAM_CONSUMER_GROUP_NAME, message_id)
+                pipeline.xdel(stream_name, message_id)
+                messages[stream_name] = message_content
+        if len(messages) > 0:
+            pipeline.execute()
+        result = []
+        for stream_name in stream_names:
+            if isinstance(stream_name, bytes):
+                stream_name = stream_name.decode()
+            if stream_name in messages:
+                result.append((stream_name, messages[stream_name]))
+        return result
+
+    def _read_first(self, stream_names: List[str]) -> Optional[dict]:
+        """ read one message from streams without waiting. Streams are read one by one in order of priority,
+            so messages from other streams stay available for other consumers
+
+            Args:
+                stream_names (List[str]): names of streams, ordered by priority
+
+            Returns:
+                Optional[dict]: message content or None if there are no messages
+        """
+        for stream_name in stream_names:
+            messages = self._read([stream_name])
+            if len(messages) > 0:
+                return messages[0][1]
+        return None
+
+    def _wait(self, stream_names: List[str], block: int) -> Optional[dict]:
+        """ wait message from any of streams. If messages came to several streams at once,
+            only the first one by priority is taken, others are added back to their streams
+
+            Args:
+                stream_names (List[str]): names of streams, ordered by priority
+                block (int): milliseconds to wait messages
+
+            Returns:
+                Optional[dict]: message content or None if there are no messages
+        """
+        messages = self._read(stream_names, block=block)
+        if len(messages) == 0:
+            return None
+        if len(messages) > 1:
+            pipeline = self.db.pipeline()
+            for stream_name, message_content in messages[1:]:
+                pipeline.xadd(stream_name, message_content)
+            pipeline.execute()
+        return messages[0][1]
+
+    def _steal(self) -> Optional[dict]:
+        """ read message from own lane of other consumer, if it waits there longer than STEAL_AFTER.
+            Lanes of consumers which are not alive are removed, if they are empty
+
+            Returns:
+                Optional[dict]: message content or None
+        """
+        consumers = ConsumersRegistry.get_all(self.db)
+        names = [name for name in consumers if name != self.name]
+        if len(names) == 0:
+            return None
+        pipeline = self.db.pipeline()
+        for name in names:
+            pipeline.xrange(get_consumer_stream_name(name), count=1)
+        first_messages = pipeline.execute()
+
+        now = time.time()
+        for name, first_message in zip(names, first_messages):
+            stream_name = get_consumer_stream_name(name)
+            if len(first_message) == 0:
+                if now - consumers[name]['updated_at'] > CONSUMER_TTL * 4:
+                    ConsumersRegistry.remove(self.db, name)
+                    self.db.delete(stream_name)
+                continue
+            message_id = first_message[0][0]
+            if isinstance(message_id, bytes):
+                message_id = message_id.decode()
+            if now - int(message_id.split('-')[0]) / 1000 < STEAL_AFTER:
+                continue
+            try:
+                messages = self._read([stream_name])
+            except RedisResponseError:
+                # lane was removed
+                continue
+            if len(messages) > 0:
+                return messages[0][1]
+        return None
+
+    def _get_message(self) -> Optional[dict]:
+        """ get next message according to lanes priority and free resources
+
+            Returns:
+                Optional[dict]: message content or None if there are no messages
+        """
+        predict_streams = [self.stream_name, TASKS_PREDICT_STREAM_NAME]
+        can_predict = self.can_start(ML_TASK_TYPE.PREDICT)
+        if can_predict:
+            message = self._read_first(predict_streams) or self._steal()
+            if message is None and self.can_start(ML_TASK_TYPE.LEARN):
+                message = self._read_first([TASKS_STREAM_NAME])
+            if message is None:
+                message = self._wait(predict_streams, block=1000)
+        elif self.can_start(ML_TASK_TYPE.LEARN):
+            message = self._read_first([TASKS_STREAM_NAME])
+        else:
+            message = None
+
+        if message is None and can_predict is False:
+            time.sleep(1)
+        return message
 
     @_save_thread_link
     def _listen(self) -> None:
         """ Listen message queue untill get new message. Execute task.
         """
-        message = None
-        while message is None:
-            self.wait_free_resources()
+        message_content = None
+        thread_id = threading.get_ident()
+        while message_content is None:
             self.wait_redis_ping()
             if self._stop_event.is_set():
                 return
 
             try:
-                message = self.consumer_group.read(count=1, block=1000, consumer=TASKS_STREAM_CONSUMER_NAME)
+                message_content = self._get_message()
+            except RedisResponseError as e:
+                if 'NOGROUP' not in str(e):
+                    self._stop_event.set()
+                    raise
+                # own lane was removed as lane of not alive consumer
+                self._create_groups()
             except RedisConnectionError as e:
                 logger.error(f"Can't connect to Redis: {e}")
                 self._stop_event.set()
@@ -155,30 +355,21 @@ class MLTaskConsumer(BaseRedisQueue):
                 self._stop_event.set()
                 raise
 
-            if message.get(TASKS_STREAM_NAME) is None or len(message.get(TASKS_STREAM_NAME)) == 0:
-                message = None
-
         try:
-            message = message[TASKS_STREAM_NAME][0][0]
-            message_id = message[0].decode()
-            message_content = message[1]
-            self.consumer_group.streams[TASKS_STREAM_NAME].ack(message_id)
-            self.consumer_group.streams[TASKS_STREAM_NAME].delete(message_id)
-
             payload = from_bytes(message_content[b'payload'])
             task_type = ML_TASK_TYPE(message_content[b'task_type'])
+            self._running[thread_id] = task_type
             model_id = int(message_content[b'model_id'])
             company_id = message_content[b'company_id']
             if len(company_id) == 0:
                 company_id = None
             redis_key = RedisKey(message_content.get(b'redis_key'))
+            reply_channel = message_content.get(b'reply_channel')
+            if reply_channel is not None:
+                reply_channel = reply_channel.decode()
 
             # region read dataframe
-            dataframe_bytes = self.cache.get(redis_key.dataframe)
-            dataframe = None
-            if dataframe_bytes is not None:
-                dataframe = from_bytes(dataframe_bytes)
-                self.cache.delete(redis_key.dataframe)
+            dataframe = get_dataframe(self.db, redis_key.dataframe)
             # endregion
 
             ctx.load(payload['context'])
@@ -186,30 +377,26 @@ class MLTaskConsumer(BaseRedisQueue):
             self._ready_event.set()
 
         try:
+            self.status_notifier.add(redis_key, reply_channel, ML_TASK_STATUS.PROCESSING)
             task = process_cache.apply_async(
                 task_type=task_type,
                 model_id=model_id,
                 payload=payload,
                 dataframe=dataframe
             )
-            status_notifier = StatusNotifier(redis_key, ML_TASK_STATUS.PROCESSING, self.db, self.cache)
-            status_notifier.start()
             result = task.result()
         except Exception as e:
             self.wait_redis_ping()
-            status_notifier.stop()
             exception_bytes = to_bytes(e)
-            self.cache.set(redis_key.exception, exception_bytes, 10)
-            self.db.publish(redis_key.status, ML_TASK_STATUS.ERROR.value)
-            self.cache.set(redis_key.status, ML_TASK_STATUS.ERROR.value, 180)
+            self.db.set(redis_key.exception, exception_bytes, ex=180)
+            self.status_notifier.finish(redis_key, reply_channel, ML_TASK_STATUS.ERROR)
         else:
             self.wait_redis_ping()
-            status_notifier.stop()
             if isinstance(result, DataFrame):
-                dataframe_bytes = to_bytes(result)
-                self.cache.set(redis_key.dataframe, dataframe_bytes, 10)
-            self.db.publish(redis_key.status, ML_TASK_STATUS.COMPLETE.value)
-            self.cache.set(redis_key.status, ML_TASK_STATUS.COMPLETE.value, 180)
+                set_dataframe(self.db, redis_key.dataframe, result, 180, self.compression, self.codec)
+            self.status_notifier.finish(redis_key, reply_channel, ML_TASK_STATUS.COMPLETE)
+        finally:
+            self._running.pop(thread_id, None)
 
     def run(self) -> None:
         """ Start new listen thread each time when _ready_event is set
@@ -227,12 +414,20 @@ class MLTaskConsumer(BaseRedisQueue):
         """ Stop all executing threads
         """
         self._stop_event.set()
+        self.status_notifier.stop()
         for thread in (*self._listen_message_threads, self._collect_cpu_stat_thread):
             try:
                 if thread.is_alive():
                     thread.join()
             except Exception:
                 pass
+        try:
+            # not empty lane will be processed by other consumers
+            if self.db.xlen(self.stream_name) == 0:
+                ConsumersRegistry.remove(self.db, self.name)
+                self.db.delete(self.stream_name)
+        except Exception:
+            pass
 
 
 @mark_process(name='internal', custom_mark='ml_task_consumer')
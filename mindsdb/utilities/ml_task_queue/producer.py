@@ -5,11 +5,15 @@ from pandas import DataFrame
 
 from mindsdb.utilities.context import context as ctx
 from mindsdb.utilities.config import Config
-from mindsdb.utilities.ml_task_queue.utils import RedisKey, to_bytes
-from mindsdb.utilities.ml_task_queue.task import Task
+from mindsdb.utilities.ml_task_queue.utils import (
+    RedisKey, ConsumersRegistry, set_dataframe, get_consumer_stream_name
+)
+from mindsdb.utilities.ml_task_queue.task import Task, TaskListener
 from mindsdb.utilities.ml_task_queue.base import BaseRedisQueue
 from mindsdb.utilities.ml_task_queue.const import (
     TASKS_STREAM_NAME,
+    TASKS_PREDICT_STREAM_NAME,
+    PREDICT_TASK_TYPES,
     ML_TASK_TYPE,
     ML_TASK_STATUS
 )
@@ -17,15 +21,15 @@ from mindsdb.utilities import log
 
 logger = log.getLogger(__name__)
 
+consumers_registry = ConsumersRegistry()
+
 
 class MLTaskProducer(BaseRedisQueue):
     """ Interface around the redis for putting tasks to the queue
 
         Attributes:
             db (Redis): database object
-            stream
-            cache
-            pubsub
+            listener (TaskListener): receiver of tasks statuses of the process
     """
 
     def __init__(self) -> None:
@@ -41,9 +45,10 @@ class MLTaskProducer(BaseRedisQueue):
         )
         self.wait_redis_ping(60)
 
-        self.stream = self.db.Stream(TASKS_STREAM_NAME)
-        self.cache = self.db.cache()
-        self.pubsub = self.db.pubsub()
+        self.compression = config.get('compression')
+        self.codec = config.get('codec', 'auto')
+
+        self.listener = TaskListener.get(self.db)
 
     def apply_async(self, task_type: ML_TASK_TYPE, model_id: int, payload: dict, dataframe: DataFrame = None) -> Task:
         ''' Add tasks to the queue
@@ -65,16 +70,37 @@ class MLTaskProducer(BaseRedisQueue):
                 "company_id": '' if ctx.company_id is None else ctx.company_id,     # None can not be dumped
                 "model_id": model_id,
                 "payload": payload,
-                "redis_key": redis_key.base
+                "redis_key": redis_key.base,
+                "reply_channel": self.listener.channel
             }
 
             self.wait_redis_ping()
             if dataframe is not None:
-                self.cache.set(redis_key.dataframe, to_bytes(dataframe), 180)
-            self.cache.set(redis_key.status, ML_TASK_STATUS.WAITING, 180)
+                set_dataframe(self.db, redis_key.dataframe, dataframe, 180, self.compression, self.codec)
+            self.db.set(redis_key.status, ML_TASK_STATUS.WAITING.value, ex=180)
 
-            self.stream.add(message)
-            return Task(self.db, redis_key)
+            task = Task(self.db, redis_key)
+            self.listener.register(task)
+            self.db.xadd(self._get_stream_name(task_type, model_id), message)
+            return task
         except ConnectionError:
             logger.error('Cant send message to redis: connect failed')
             raise
+
+    def _get_stream_name(self, task_type: ML_TASK_TYPE, model_id: int) -> str:
+        """ choose lane for the task: predict tasks go to the consumer which has the model loaded,
+            or to the common predict lane. Other tasks go to the learn lane
+
+            Args:
+                task_type (ML_TASK_TYPE): type of the task
+                model_id (int): model identifier
+
+            Returns:
+                str: name of the stream
+        """
+        if task_type not in PREDICT_TASK_TYPES:
+            return TASKS_STREAM_NAME
+        consumer_name = consumers_registry.get_consumer_for_model(self.db, model_id)
+        if consumer_name is not None:
+            return get_consumer_stream_name(consumer_name)
+        return TASKS_PREDICT_STREAM_NAME
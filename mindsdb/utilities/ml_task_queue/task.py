@@ -1,10 +1,22 @@
+import os
+import time
+import socket
+import threading
+from uuid import uuid4
+from typing import List
 from collections.abc import Callable
 
 import redis
 from pandas import DataFrame
 
-from mindsdb.utilities.ml_task_queue.utils import RedisKey, from_bytes
+from mindsdb.utilities.ml_task_queue.utils import RedisKey, from_bytes, dataframe_from_chunks
 from mindsdb.utilities.ml_task_queue.const import ML_TASK_STATUS
+from mindsdb.utilities import log
+
+logger = log.getLogger(__name__)
+
+# if there are no notifications about the task for this time, then status of the task is requested from redis
+STATUS_POLL_INTERVAL = 10
 
 
 class Task:
@@ -15,6 +27,7 @@ class Task:
             redis_key (RedisKey): redis keys associated with task
             dataframe (DataFrame): task result
             exception (Exception): task exeuton  runtime exception
+            last_update (float): time of last notification about the task
             _timeout (int): max time without status updating
     """
 
@@ -23,49 +36,59 @@ class Task:
         self.redis_key = redis_key
         self.dataframe = None
         self.exception = None
+        self.last_update = time.time()
         self._timeout = 30
+        self._status = ML_TASK_STATUS.WAITING
+        self._done_event = threading.Event()
+        self._result_lock = threading.Lock()
+        self._result_fetched = False
+
+    def set_status(self, ml_task_status: ML_TASK_STATUS) -> None:
+        """ set final status of the task. Called by TaskListener, result is fetched by waiting thread
 
-    def subscribe(self) -> ML_TASK_STATUS:
-        """ return tasks status untill it is not done or failed
+            Args:
+                ml_task_status (ML_TASK_STATUS): status of the task
         """
-        pubsub = self.db.pubsub()
-        cache = self.db.cache()
-        pubsub.subscribe(self.redis_key.status)
-        while (msg := pubsub.get_message(timeout=self._timeout)):
-            if msg['type'] not in pubsub.PUBLISH_MESSAGE_TYPES:
-                continue
-            ml_task_status = ML_TASK_STATUS(msg['data'])
-            if ml_task_status == ML_TASK_STATUS.COMPLETE:
-                dataframe_bytes = cache.get(self.redis_key.dataframe)
-                if dataframe_bytes is not None:
-                    self.dataframe = from_bytes(dataframe_bytes)
-                cache.delete(self.redis_key.dataframe)
-            elif ml_task_status == ML_TASK_STATUS.ERROR:
-                exception_bytes = cache.get(self.redis_key.exception)
-                if exception_bytes is not None:
-                    self.exception = from_bytes(exception_bytes)
-            yield ml_task_status
-        else:
-            # there is no mesasges, timeout
-            ml_task_status = ML_TASK_STATUS.TIMEOUT
-            yield ml_task_status
+        self._status = ml_task_status
+        self._done_event.set()
+
+    def done(self) -> bool:
+        return self._done_event.is_set()
+
+    def _fetch_result(self) -> None:
+        """ read result and exception of the finished task from redis and delete them
+        """
+        with self._result_lock:
+            if self._result_fetched:
+                return
+            pipeline = self.db.pipeline()
+            pipeline.lrange(self.redis_key.dataframe, 0, -1)
+            pipeline.get(self.redis_key.exception)
+            pipeline.delete(self.redis_key.dataframe, self.redis_key.exception)
+            dataframe_chunks, exception_bytes, _ = pipeline.execute()
+            if dataframe_chunks:
+                self.dataframe = dataframe_from_chunks(dataframe_chunks)
+            if exception_bytes is not None:
+                self.exception = from_bytes(exception_bytes)
+            self._result_fetched = True
 
     def wait(self, status: ML_TASK_STATUS = ML_TASK_STATUS.COMPLETE) -> None:
         """ block threasd untill task is not done or failed
         """
-        for status in self.subscribe():
-            if status in (ML_TASK_STATUS.WAITING, ML_TASK_STATUS.PROCESSING):
-                continue
-            if status == ML_TASK_STATUS.ERROR:
-                if self.exception is not None:
-                    raise self.exception
-                else:
-                    raise Exception('Unknown error during ML task execution')
-            if status == ML_TASK_STATUS.TIMEOUT:
-                raise Exception(f"Can't get answer in {self._timeout} seconds")
-            if status == ML_TASK_STATUS.COMPLETE:
-                return
-            raise KeyError('Unknown task status')
+        self._done_event.wait()
+        status = self._status
+        if status in (ML_TASK_STATUS.COMPLETE, ML_TASK_STATUS.ERROR):
+            self._fetch_result()
+        if status == ML_TASK_STATUS.ERROR:
+            if self.exception is not None:
+                raise self.exception
+            else:
+                raise Exception('Unknown error during ML task execution')
+        if status == ML_TASK_STATUS.TIMEOUT:
+            raise Exception(f"Can't get answer in {self._timeout} seconds")
+        if status == ML_TASK_STATUS.COMPLETE:
+            return
+        raise KeyError('Unknown task status')
 
     def result(self) -> DataFrame:
         """ wait task is done and return result
@@ -80,3 +103,129 @@ class Task:
         """ need for compatability with concurrent.futures.Future interface
         """
         pass
+
+
+class TaskListener(threading.Thread):
+    """ Receives statuses of all tasks sent by the process. Consumers publish statuses to the one channel
+        of the process, listener dispatches them to the local Task objects. Result and exception of
+        finished task are fetched by the thread which waits the task.
+        Status of tasks without notifications is requested in batch.
+
+        Attributes:
+            db (Redis): database object
+            channel (str): name of the channel
+            tasks (dict): not finished tasks, key is task's redis base key
+    """
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def get(cls, db: redis.Redis) -> 'TaskListener':
+        """ get listener of the current process, start it if needed
+
+            Args:
+                db (Redis): database object
+
+            Returns:
+                TaskListener
+        """
+        with cls._instance_lock:
+            if cls._instance is None or cls._instance.pid != os.getpid():
+                cls._instance = cls(db)
+                cls._instance.start()
+                cls._instance.wait_subscribed(30)
+            return cls._instance
+
+    def __init__(self, db: redis.Redis) -> None:
+        threading.Thread.__init__(self, daemon=True, name='ml_task_listener')
+        self.db = db
+        self.pid = os.getpid()
+        self.channel = f'ml-task-status-{socket.gethostname()}-{self.pid}-{uuid4().hex}'
+        self.tasks = {}
+        self._lock = threading.Lock()
+        self._subscribed = threading.Event()
+        self._last_poll = 0
+
+    def wait_subscribed(self, timeout: int) -> None:
+        if self._subscribed.wait(timeout) is False:
+            raise redis.exceptions.ConnectionError(f"Can't subscribe to channel {self.channel}")
+
+    def register(self, task: Task) -> None:
+        """ start to wait notifications about task
+        """
+        with self._lock:
+            task.last_update = time.time()
+            self.tasks[task.redis_key.base] = task
+
+    def run(self) -> None:
+        while True:
+            try:
+                pubsub = self.db.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                self._subscribed.set()
+                while True:
+                    msg = pubsub.get_message(timeout=1)
+                    if msg is not None and msg['type'] in pubsub.PUBLISH_MESSAGE_TYPES:
+                        self.dispatch(from_bytes(msg['data']))
+                    self.poll()
+            except Exception as e:
+                # notifications may be lost during reconnection, they will be recovered by polling
+                logger.warning(f'ML tasks listener error: {e}')
+                time.sleep(1)
+
+    def dispatch(self, updates: List[tuple]) -> None:
+        """ handle notification from consumer
+
+            Args:
+                updates (List[tuple]): pairs of task's redis base key and task's status
+        """
+        now = time.time()
+        finished = []
+        with self._lock:
+            for key, status in updates:
+                task = self.tasks.get(key)
+                if task is None:
+                    continue
+                task.last_update = now
+                status = ML_TASK_STATUS(status)
+                if status in (ML_TASK_STATUS.COMPLETE, ML_TASK_STATUS.ERROR):
+                    finished.append((task, status))
+        self._finish(finished)
+
+    def poll(self) -> None:
+        """ request statuses of tasks without notifications for a long time.
+            Tasks which are not finished and exceeded its timeout are finished with TIMEOUT status
+        """
+        now = time.time()
+        if now - self._last_poll < 1:
+            return
+        self._last_poll = now
+        with self._lock:
+            tasks = [
+                task for task in self.tasks.values()
+                if now - task.last_update > STATUS_POLL_INTERVAL
+            ]
+        if len(tasks) == 0:
+            return
+        statuses = self.db.mget([task.redis_key.status for task in tasks])
+        finished = []
+        for task, status in zip(tasks, statuses):
+            if status in (ML_TASK_STATUS.COMPLETE.value, ML_TASK_STATUS.ERROR.value):
+                finished.append((task, ML_TASK_STATUS(status)))
+            elif now - task.last_update > task._timeout:
+                finished.append((task, ML_TASK_STATUS.TIMEOUT))
+        self._finish(finished)
+
+    def _finish(self, finished: List[tuple]) -> None:
+        """ set final statuses to tasks. Results are fetched by threads which wait the tasks,
+            so the listener is not blocked by reading of big dataframes
+
+            Args:
+                finished (List[tuple]): pairs of task and its final status
+        """
+        with self._lock:
+            for task, _status in finished:
+                self.tasks.pop(task.redis_key.base, None)
+        for task, status in finished:
+            task.set_status(status)
@@ -2,12 +2,29 @@ import time
 import pickle
 import socket
 import threading
+from typing import List, Optional
 
+import pandas as pd
 from walrus import Database
 from redis.exceptions import ConnectionError as RedisConnectionError
 
 from mindsdb.utilities.context import context as ctx
-from mindsdb.utilities.ml_task_queue.const import ML_TASK_STATUS
+from mindsdb.utilities.ml_task_queue.const import (
+    ML_TASK_STATUS, DATAFRAME_CODEC, CONSUMERS_REGISTRY_KEY, CONSUMER_TTL, TASKS_CONSUMER_STREAM_PREFIX
+)
+from mindsdb.utilities import log
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+logger = log.getLogger(__name__)
+
+# max size of one chunk of dataframe stored in redis
+DATAFRAME_CHUNK_SIZE = 64 * 1024 * 1024
+# min count of rows to use arrow codec in 'auto' mode: for small dataframes conversion overhead is bigger than gain
+ARROW_MIN_ROWS = 1000
 
 
 def to_bytes(obj: object) -> bytes:
@@ -34,6 +51,137 @@ def from_bytes(b: bytes) -> object:
     return pickle.loads(b)
 
 
+def to_arrow(df: pd.DataFrame) -> Optional['pa.Table']:
+    """ convert dataframe to arrow table, if it can be restored back without changes.
+        Object columns are allowed only if they contain strings: other objects (lists, dicts, mixed types)
+        are not converted back to same python objects.
+
+        Args:
+            df (DataFrame): dataframe to convert
+
+        Returns:
+            Optional[pa.Table]: arrow table or None if dataframe can not be converted
+    """
+    if pa is None:
+        return None
+    if df.columns.has_duplicates or not all(isinstance(col, str) for col in df.columns):
+        return None
+    for col in df.columns:
+        if df[col].dtype == object and pd.api.types.infer_dtype(df[col], skipna=True) not in ('string', 'empty'):
+            return None
+    try:
+        return pa.Table.from_pandas(df)
+    except pa.ArrowException:
+        return None
+
+
+def is_arrow_preferred(df: pd.DataFrame) -> bool:
+    """ check if arrow codec is faster than pickle for the dataframe. Pickle (protocol 5) dumps numeric
+        blocks without copying, so arrow is faster only for big dataframes where most of columns are strings
+
+        Args:
+            df (DataFrame): dataframe to check
+
+        Returns:
+            bool
+    """
+    if len(df) < ARROW_MIN_ROWS or len(df.columns) == 0:
+        return False
+    object_columns = sum(1 for dtype in df.dtypes if dtype == object)
+    return object_columns * 2 >= len(df.columns)
+
+
+def dataframe_to_chunks(df: pd.DataFrame, compression: Optional[str] = None,
+                        chunk_size: int = DATAFRAME_CHUNK_SIZE, codec: str = 'auto') -> List[bytes]:
+    """ dump dataframe into list of chunks. First element of the list is codec marker.
+        Dataframe is converted to arrow IPC streams by record batches if it is possible and arrow codec is chosen,
+        otherwise pickled bytes are split to chunks
+
+        Args:
+            df (DataFrame): dataframe to dump
+            compression (str): compression of arrow buffers: 'lz4', 'zstd' or None
+            chunk_size (int): approximate size of chunk in bytes
+            codec (str): 'arrow', 'pickle' or 'auto'. In 'auto' mode arrow is used if compression is set
+                or if it is faster for the dataframe
+
+        Returns:
+            List[bytes]
+    """
+    table = None
+    if codec == 'arrow' or (codec == 'auto' and (compression is not None or is_arrow_preferred(df))):
+        table = to_arrow(df)
+    if table is None:
+        data = memoryview(to_bytes(df))
+        return [DATAFRAME_CODEC.PICKLE.value] + [
+            data[i:i + chunk_size] for i in range(0, len(data), chunk_size)
+        ]
+
+    rows_per_chunk = max(1, chunk_size * table.num_rows // max(table.nbytes, 1))
+    options = pa.ipc.IpcWriteOptions(compression=compression)
+    chunks = [DATAFRAME_CODEC.ARROW.value]
+    # empty table is stored as stream without batches, to keep schema
+    batches = table.to_batches(max_chunksize=rows_per_chunk) or [None]
+    for batch in batches:
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema, options=options) as writer:
+            if batch is not None:
+                writer.write_batch(batch)
+        chunks.append(memoryview(sink.getvalue()))
+    return chunks
+
+
+def dataframe_from_chunks(chunks: List[bytes]) -> pd.DataFrame:
+    """ load dataframe from list of chunks made by dataframe_to_chunks
+
+        Args:
+            chunks (List[bytes]): chunks
+
+        Returns:
+            DataFrame
+    """
+    codec = DATAFRAME_CODEC(chunks[0])
+    if codec == DATAFRAME_CODEC.PICKLE:
+        return from_bytes(b''.join(chunks[1:]))
+    tables = [pa.ipc.open_stream(chunk).read_all() for chunk in chunks[1:]]
+    return pa.concat_tables(tables).to_pandas()
+
+
+def set_dataframe(db: Database, key: str, df: pd.DataFrame, timeout: int, compression: Optional[str] = None,
+                  codec: str = 'auto') -> None:
+    """ store dataframe in redis as list of chunks
+
+        Args:
+            db (Database): redis db object
+            key (str): redis key
+            df (DataFrame): dataframe to store
+            timeout (int): ttl of the key, seconds
+            compression (str): compression of arrow buffers
+            codec (str): 'arrow', 'pickle' or 'auto'
+    """
+    pipeline = db.pipeline()
+    pipeline.delete(key)
+    pipeline.rpush(key, *dataframe_to_chunks(df, compression, codec=codec))
+    pipeline.expire(key, timeout)
+    pipeline.execute()
+
+
+def get_dataframe(db: Database, key: str) -> Optional[pd.DataFrame]:
+    """ read dataframe from redis and delete it
+
+        Args:
+            db (Database): redis db object
+            key (str): redis key
+
+        Returns:
+            Optional[DataFrame]: None if there is no dataframe
+    """
+    chunks = db.lrange(key, 0, -1)
+    if len(chunks) == 0:
+        return None
+    db.delete(key)
+    return dataframe_from_chunks(chunks)
+
+
 def wait_redis_ping(db: Database, timeout: int = 30):
     """ Wait when redis.ping return True
 
@@ -88,36 +236,158 @@ class RedisKey:
         return (self._base_key + b'-exception').decode()
 
 
+def get_consumer_stream_name(consumer_name: str) -> str:
+    """ get name of the stream with tasks addressed to the consumer
+
+        Args:
+            consumer_name (str): name of the consumer
+
+        Returns:
+            str
+    """
+    return f'{TASKS_CONSUMER_STREAM_PREFIX}{consumer_name}'
+
+
+class ConsumersRegistry:
+    """ State of consumers stored in redis: models loaded by consumer and count of running tasks.
+        Producer uses it to send predict task to the consumer which has the model loaded.
+        State is cached by producer for short time to not request redis for each task.
+    """
+
+    def __init__(self, cache_ttl: float = 2) -> None:
+        self._cache_ttl = cache_ttl
+        self._consumers = {}
+        self._updated_at = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def update(db: Database, consumer_name: str, models: List[int], running: int) -> None:
+        """ save state of the consumer
+
+            Args:
+                db (Database): redis db object
+                consumer_name (str): name of the consumer
+                models (List[int]): ids of models loaded by consumer
+                running (int): count of tasks running by the consumer
+        """
+        db.hset(CONSUMERS_REGISTRY_KEY, consumer_name, to_bytes({
+            'models': models,
+            'running': running,
+            'updated_at': time.time()
+        }))
+
+    @staticmethod
+    def remove(db: Database, consumer_name: str) -> None:
+        db.hdel(CONSUMERS_REGISTRY_KEY, consumer_name)
+
+    @staticmethod
+    def get_all(db: Database) -> dict:
+        """ get state of all registered consumers, including not alive
+
+            Args:
+                db (Database): redis db object
+
+            Returns:
+                dict: consumer name -> state
+        """
+        return {
+            name.decode(): from_bytes(state)
+            for name, state in (db.hgetall(CONSUMERS_REGISTRY_KEY) or {}).items()
+        }
+
+    def get_consumer_for_model(self, db: Database, model_id: int) -> Optional[str]:
+        """ find alive consumer with the model loaded. If there are several - the least loaded is chosen
+
+            Args:
+                db (Database): redis db object
+                model_id (int): id of the model
+
+            Returns:
+                Optional[str]: name of consumer or None
+        """
+        with self._lock:
+            if time.time() - self._updated_at > self._cache_ttl:
+                self._consumers = self.get_all(db)
+                self._updated_at = time.time()
+            consumers = self._consumers
+        now = time.time()
+        candidates = [
+            (state['running'], name) for name, state in consumers.items()
+            if model_id in state['models'] and now - state['updated_at'] < CONSUMER_TTL
+        ]
+        if len(candidates) == 0:
+            return None
+        return min(candidates)[1]
+
+
 class StatusNotifier(threading.Thread):
-    """ Worker that updates task status in redis with fixed frequency
+    """ Worker that updates statuses of tasks executed by the consumer in redis with fixed frequency.
+        Updates of all tasks are sent in one pipeline, statuses of tasks from same producer are
+        published as one message to the producer's channel
     """
 
-    def __init__(self, redis_key: RedisKey, ml_task_status: ML_TASK_STATUS, db, cache) -> None:
-        threading.Thread.__init__(self)
-        self.redis_key = redis_key
-        self.ml_task_status = ml_task_status
+    def __init__(self, db: Database, interval: int = 5) -> None:
+        threading.Thread.__init__(self, daemon=True)
         self.db = db
-        self.cache = cache
+        self.interval = interval
+        self._tasks = {}
+        self._lock = threading.Lock()
         self._stop_event = threading.Event()
 
-    def set_status(self, ml_task_status: ML_TASK_STATUS):
-        """ change status
+    def add(self, redis_key: RedisKey, reply_channel: Optional[str],
+            ml_task_status: ML_TASK_STATUS = ML_TASK_STATUS.PROCESSING) -> None:
+        """ start to update status of the task
 
             Args:
-                ml_task_status (ML_TASK_STATUS): new status
+                redis_key (RedisKey): keys of the task
+                reply_channel (str): channel of the producer, None - publish to the task's channel
+                ml_task_status (ML_TASK_STATUS): status
         """
-        self.ml_task_status = ml_task_status
+        task = (redis_key, reply_channel, ml_task_status)
+        with self._lock:
+            self._tasks[redis_key.base] = task
+        self._notify([task])
+
+    def finish(self, redis_key: RedisKey, reply_channel: Optional[str], ml_task_status: ML_TASK_STATUS) -> None:
+        """ set final status of the task and stop updating it
+
+            Args:
+                redis_key (RedisKey): keys of the task
+                reply_channel (str): channel of the producer
+                ml_task_status (ML_TASK_STATUS): final status
+        """
+        with self._lock:
+            self._tasks.pop(redis_key.base, None)
+        self._notify([(redis_key, reply_channel, ml_task_status)])
 
     def stop(self) -> None:
         """ stop status updating
         """
         self._stop_event.set()
 
+    def _notify(self, tasks: list) -> None:
+        pipeline = self.db.pipeline()
+        messages = {}
+        for redis_key, reply_channel, ml_task_status in tasks:
+            pipeline.set(redis_key.status, ml_task_status.value, ex=180)
+            if reply_channel:
+                messages.setdefault(reply_channel, []).append((redis_key.base, ml_task_status.value))
+            else:
+                pipeline.publish(redis_key.status, ml_task_status.value)
+        for reply_channel, updates in messages.items():
+            pipeline.publish(reply_channel, to_bytes(updates))
+        pipeline.execute()
+
     def run(self):
-        """ start update status with fixed frequency
+        """ update statuses of all tasks with fixed frequency
         """
-        while not self._stop_event.is_set():
-            wait_redis_ping(self.db)
-            self.db.publish(self.redis_key.status, self.ml_task_status.value)
-            self.cache.set(self.redis_key.status, self.ml_task_status.value, 180)
-            time.sleep(5)
+        while not self._stop_event.wait(self.interval):
+            with self._lock:
+                tasks = list(self._tasks.values())
+            if len(tasks) == 0:
+                continue
+            try:
+                wait_redis_ping(self.db)
+                self._notify(tasks)
+            except Exception as e:
+                logger.warning(f'Unable to update tasks statuses: {e}')
@@ -34,12 +34,13 @@ HANDLER_REQS_PATHS = list(
 MAIN_EXCLUDE_PATHS = ["mindsdb/integrations/handlers/.*_handler", "pryproject.toml"]
 
 # torch.multiprocessing is imported in a 'try'. Falls back to multiprocessing so we dont NEED it.
+# pyarrow is imported in a 'try' in ml_task_queue. Falls back to pickle.
 # Psycopg2 is needed in core codebase for sqlalchemy.
 # hierarchicalforecast is an optional dep of neural/statsforecast
 MAIN_RULE_IGNORES = {
     "DEP003": ["torch"],
     # Ignore Langhchain since the requirements check will still fail even if it's conditionally imported for certain features.
-    "DEP001": ["torch"],
+    "DEP001": ["torch", "pyarrow"],
     "DEP002": ["psycopg2-binary"],
 }
 
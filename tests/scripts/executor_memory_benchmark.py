@@ -0,0 +1,90 @@
+""" Memory benchmark of query executor on multi-join query.
+
+    Tables are served by mocked integrations (the same as in unit tests of executor). Query joins
+    tables from different integrations, so every table is fetched by separate step and joins are
+    executed by executor. The query is executed with different settings of releasing of step results
+    and peak of memory allocated by python (tracemalloc) is printed for every run.
+
+    Example:
+        PYTHONPATH=. python tests/scripts/executor_memory_benchmark.py --rows 200000
+"""
+import os
+import sys
+import time
+import argparse
+import tracemalloc
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'unit'))
+
+from executor_test_base import BaseExecutorMockPredictor  # noqa: E402
+
+QUERY = '''
+    select f.id, f.v, d1.name as name1, d2.name as name2, d3.name as name3
+    from int0.facts f
+    join int1.dim d1 on f.dim1_id = d1.id
+    join int2.dim d2 on f.dim2_id = d2.id
+    join int3.dim d3 on f.dim3_id = d3.id
+'''
+
+
+def make_tables(rows):
+    rng = np.random.default_rng(0)
+    facts = pd.DataFrame({
+        'id': np.arange(rows),
+        'dim1_id': rng.integers(0, rows, rows),
+        'dim2_id': rng.integers(0, rows, rows),
+        'dim3_id': rng.integers(0, rows, rows),
+        'v': rng.random(rows),
+    })
+    dim = pd.DataFrame({
+        'id': np.arange(rows),
+        'name': [f'name_{i}' for i in range(rows)],
+    })
+    return {'facts': facts, 'dim': dim}
+
+
+def run(test, settings):
+    from mindsdb.utilities.config import Config
+
+    with patch.dict(Config().get('executor'), settings):
+        tracemalloc.start()
+        start = time.time()
+        ret = test.execute(QUERY)
+        duration = time.time() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return len(ret.data), peak, duration
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=100000, help='count of rows in every table')
+    args = parser.parse_args()
+
+    BaseExecutorMockPredictor.setup_class(BaseExecutorMockPredictor)
+    test = BaseExecutorMockPredictor()
+    test.setup_method()
+
+    tables = make_tables(args.rows)
+    runs = [
+        ('keep all results', {'release_step_results': False}),
+        ('release results', {'release_step_results': True}),
+        ('release and spill', {'release_step_results': True, 'spill_rows_threshold': args.rows // 10}),
+    ]
+    with patch('mindsdb.integrations.handlers.postgres_handler.Handler') as mock_handler:
+        for i in range(4):
+            test.set_handler(mock_handler, name=f'int{i}', tables=tables)
+
+        for name, settings in runs:
+            rows, peak, duration = run(test, settings)
+            print(f'{name}: rows={rows} peak memory={peak / 1024 ** 2:.1f}MB time={duration:.2f}s')
+
+    BaseExecutorMockPredictor.teardown_class(BaseExecutorMockPredictor)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+""" Round trip time of dataframes through codecs of ML task queue (without redis).
+
+    For every shape of dataframe (numeric or string columns) time of dataframe_to_chunks + dataframe_from_chunks
+    is printed for pickle, arrow and 'auto' codec.
+
+    Example:
+        PYTHONPATH=. python tests/scripts/ml_task_queue_codec_benchmark.py
+"""
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from mindsdb.utilities.ml_task_queue.utils import dataframe_to_chunks, dataframe_from_chunks
+
+SHAPES = [
+    (1000, 10, 'float'),
+    (100000, 10, 'float'),
+    (10000, 1000, 'float'),
+    (100, 100, 'str'),
+    (10000, 50, 'str'),
+    (1000000, 3, 'str'),
+]
+
+
+def make_df(rows, columns, kind):
+    if kind == 'float':
+        return pd.DataFrame(np.random.random((rows, columns)), columns=[f'c{i}' for i in range(columns)])
+    return pd.DataFrame({f'c{i}': [f'value_{j}' for j in range(rows)] for i in range(columns)})
+
+
+def measure(df, codec, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        dataframe_from_chunks(dataframe_to_chunks(df, codec=codec))
+        duration = time.perf_counter() - start
+        best = duration if best is None else min(best, duration)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    for rows, columns, kind in SHAPES:
+        df = make_df(rows, columns, kind)
+        times = {codec: measure(df, codec, args.repeat) for codec in ('pickle', 'arrow', 'auto')}
+        print(
+            f'{rows}x{columns} {kind}: ' + ' '.join(f'{codec}={t * 1000:.1f}ms' for codec, t in times.items())
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+""" Load test of ML task queue. Requires redis running on localhost:6379 (or 'ml_task_queue' section in config).
+
+    Starts several consumers in separate processes. Execution of ML tasks in consumers is replaced by sleep:
+    learn takes --learn-time seconds, predict takes --predict-time seconds plus --load-time seconds
+    if the model was not used by the consumer before. Then sends learn and predict tasks and prints
+    latency of tasks by type and count of model loads.
+
+    Example:
+        python tests/scripts/ml_task_queue_load.py --consumers 3 --models 10 --predict 1000 --learn 5
+"""
+import time
+import argparse
+import multiprocessing as mp
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from mindsdb.utilities.context import context as ctx
+from mindsdb.utilities.ml_task_queue.const import ML_TASK_TYPE
+
+
+class FakeProcessCache:
+    """ replacement of ProcessCache which emulates execution of tasks
+    """
+
+    def __init__(self, args, loads):
+        self.args = args
+        self.loads = loads
+        self.models = set()
+        self.executor = ThreadPoolExecutor(64)
+
+    def init(self):
+        pass
+
+    def get_processes_info(self):
+        return {'fake': [{'models': [(model_id, None) for model_id in self.models]}]}
+
+    def _run(self, task_type, model_id, dataframe):
+        if task_type in (ML_TASK_TYPE.LEARN, ML_TASK_TYPE.FINETUNE):
+            time.sleep(self.args.learn_time)
+            return None
+        if model_id not in self.models:
+            with self.loads.get_lock():
+                self.loads.value += 1
+            time.sleep(self.args.load_time)
+            self.models.add(model_id)
+        time.sleep(self.args.predict_time)
+        return dataframe
+
+    def apply_async(self, task_type, model_id, payload, dataframe=None):
+        return self.executor.submit(self._run, task_type, model_id, dataframe)
+
+
+def run_consumer(args, loads):
+    import mindsdb.utilities.ml_task_queue.consumer as consumer_module
+    consumer_module.process_cache = FakeProcessCache(args, loads)
+    consumer = consumer_module.MLTaskConsumer()
+    consumer.run()
+
+
+def send_task(producer, task_type, model_id):
+    ctx.set_default()
+    start = time.time()
+    dataframe = None
+    if task_type == ML_TASK_TYPE.PREDICT:
+        dataframe = pd.DataFrame({'a': range(10)})
+    task = producer.apply_async(task_type, model_id, payload={'context': ctx.dump()}, dataframe=dataframe)
+    task.result()
+    return task_type, time.time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--consumers', type=int, default=2)
+    parser.add_argument('--models', type=int, default=10)
+    parser.add_argument('--predict', type=int, default=500, help='count of predict tasks')
+    parser.add_argument('--learn', type=int, default=4, help='count of learn tasks')
+    parser.add_argument('--concurrency', type=int, default=32, help='count of simultaneously sent tasks')
+    parser.add_argument('--predict-time', type=float, default=0.01)
+    parser.add_argument('--load-time', type=float, default=1)
+    parser.add_argument('--learn-time', type=float, default=10)
+    args = parser.parse_args()
+
+    from mindsdb.utilities.ml_task_queue.producer import MLTaskProducer
+
+    loads = mp.Value('i', 0)
+    consumers = [mp.Process(target=run_consumer, args=(args, loads), daemon=True) for _ in range(args.consumers)]
+    for consumer in consumers:
+        consumer.start()
+    # wait consumers registration
+    time.sleep(3)
+
+    ctx.set_default()
+    producer = MLTaskProducer()
+    rng = np.random.default_rng(0)
+    tasks = [(ML_TASK_TYPE.LEARN, 0)] * args.learn + [
+        (ML_TASK_TYPE.PREDICT, int(model_id)) for model_id in rng.integers(1, args.models + 1, args.predict)
+    ]
+
+    start = time.time()
+    with ThreadPoolExecutor(args.concurrency) as executor:
+        results = list(executor.map(lambda task: send_task(producer, *task), tasks))
+    total_time = time.time() - start
+
+    for consumer in consumers:
+        consumer.terminate()
+
+    print(f'total time: {total_time:.2f}s, model loads: {loads.value}')
+    for task_type in (ML_TASK_TYPE.PREDICT, ML_TASK_TYPE.LEARN):
+        latency = np.array([x[1] for x in results if x[0] == task_type])
+        if len(latency) == 0:
+            continue
+        p50, p95, p99 = np.percentile(latency, [50, 95, 99])
+        print(f'{task_type.name}: count={len(latency)} p50={p50:.3f}s p95={p95:.3f}s p99={p99:.3f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+""" Memory benchmark of fetching select results by Postgres handler.
+
+    Connection to Postgres is replaced by a fake cursor which generates rows (bigint, float, text),
+    so the benchmark measures only memory used by the handler to build the dataframe.
+    Result is fetched with fetchall (default) and by batches from server-side cursor ('fetch_size'),
+    peak of memory allocated by python (tracemalloc) and size of the result are printed.
+
+    Example:
+        PYTHONPATH=. python tests/scripts/postgres_fetch_memory_benchmark.py --rows 1000000
+"""
+import time
+import argparse
+import tracemalloc
+from unittest.mock import patch, MagicMock
+
+from mindsdb.integrations.handlers.postgres_handler import postgres_handler
+
+
+class Column:
+    def __init__(self, name, type_code):
+        self.name = name
+        self.type_code = type_code
+
+
+class FakeCursor:
+    def __init__(self, rows, **kwargs):
+        self.rows = rows
+        self.position = 0
+        self.description = [Column('id', 20), Column('value', 701), Column('name', 25)]
+        self.pgresult = MagicMock(status=2)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def execute(self, query):
+        pass
+
+    def fetchmany(self, size):
+        end = min(self.position + size, self.rows)
+        rows = [(i, i * 0.5, f'name_{i % 1000}') for i in range(self.position, end)]
+        self.position = end
+        return rows
+
+    def fetchall(self):
+        return self.fetchmany(self.rows)
+
+
+def run(rows, fetch_size):
+    connection = MagicMock()
+    connection.cursor = lambda **kwargs: FakeCursor(rows, **kwargs)
+    connection_data = {} if fetch_size is None else {'fetch_size': fetch_size}
+    with patch.object(postgres_handler.psycopg, 'connect', return_value=connection):
+        handler = postgres_handler.PostgresHandler('pg', connection_data=connection_data)
+        tracemalloc.start()
+        start = time.time()
+        response = handler.native_query('select', server_side=fetch_size is not None)
+        duration = time.time() - start
+        result, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return len(response.data_frame), peak, result, duration
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--fetch-size', type=int, default=10000)
+    args = parser.parse_args()
+
+    for name, fetch_size in (('fetchall', None), ('server-side batches', args.fetch_size)):
+        rows, peak, result, duration = run(args.rows, fetch_size)
+        print(
+            f'{name}: rows={rows} peak memory={peak / 1024 ** 2:.1f}MB '
+            f'result={result / 1024 ** 2:.1f}MB time={duration:.2f}s'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+""" Throughput of prepared statements compared to text protocol. Requires running MindsDB.
+
+    Emulates JDBC-style workload: every connection executes the same query many times with different
+    parameters. The query is executed in two modes:
+        - prepared: statement is prepared once and executed with parameters (binary protocol),
+        - text: parameters are rendered into the query by the client and it is sent as text.
+    Prints throughput and latency of every mode.
+
+    MySQL API uses mysql-connector-python client, Postgres API uses psycopg. Placeholders in query are '%s'.
+
+    Example:
+        python tests/scripts/prepared_statements_benchmark.py --api mysql --port 47335 \\
+            --query "select * from my_db.orders where customer_id = %s" --values 1 2 3 4 5 --count 1000
+"""
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+DEFAULT_QUERY = 'select table_name from information_schema.tables where table_schema = %s'
+
+
+def connect(args):
+    if args.api == 'mysql':
+        import mysql.connector
+        return mysql.connector.connect(
+            host=args.host, port=args.port, user=args.user, password=args.password, database=args.database
+        )
+    import psycopg
+    return psycopg.connect(
+        host=args.host, port=args.port, user=args.user, password=args.password, dbname=args.database,
+        autocommit=True
+    )
+
+
+def get_cursor(args, connection, prepared):
+    if args.api == 'mysql':
+        return connection.cursor(prepared=prepared)
+    if prepared:
+        return connection.cursor()
+    import psycopg
+    # parameters are merged into the query on client side
+    return psycopg.ClientCursor(connection)
+
+
+def execute(args, cursor, prepared, params):
+    if args.api == 'postgres' and prepared:
+        cursor.execute(args.query, params, prepare=True)
+    else:
+        cursor.execute(args.query, params)
+    return cursor.fetchall()
+
+
+def run_connection(args, prepared, count):
+    connection = connect(args)
+    cursor = get_cursor(args, connection, prepared)
+    latencies = []
+    rows = 0
+    try:
+        for i in range(count):
+            params = (args.values[i % len(args.values)],)
+            start = time.perf_counter()
+            rows += len(execute(args, cursor, prepared, params))
+            latencies.append(time.perf_counter() - start)
+    finally:
+        cursor.close()
+        connection.close()
+    return latencies, rows
+
+
+def run(args, prepared):
+    count = args.count // args.connections
+    start = time.perf_counter()
+    with ThreadPoolExecutor(args.connections) as executor:
+        results = list(executor.map(lambda _: run_connection(args, prepared, count), range(args.connections)))
+    duration = time.perf_counter() - start
+
+    latencies = np.array([latency for result in results for latency in result[0]]) * 1000
+    rows = sum(result[1] for result in results)
+    return {
+        'queries': len(latencies),
+        'rows': rows,
+        'qps': len(latencies) / duration,
+        'p50': np.percentile(latencies, 50),
+        'p99': np.percentile(latencies, 99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--api', choices=['mysql', 'postgres'], default='mysql')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, help='by default 47335 for mysql and 55432 for postgres')
+    parser.add_argument('--user', default='mindsdb')
+    parser.add_argument('--password', default='')
+    parser.add_argument('--database', default='mindsdb')
+    parser.add_argument('--query', default=DEFAULT_QUERY, help='query with one parameter')
+    parser.add_argument('--values', nargs='+', default=['mindsdb', 'information_schema', 'files'],
+                        help='values of the parameter, used in turn')
+    parser.add_argument('--count', type=int, default=1000, help='count of executions in every mode')
+    parser.add_argument('--connections', type=int, default=1, help='count of concurrent connections')
+    parser.add_argument('--warmup', type=int, default=10, help='count of executions before measuring')
+    args = parser.parse_args()
+    if args.port is None:
+        args.port = 47335 if args.api == 'mysql' else 55432
+
+    for prepared in (True, False):
+        run_connection(args, prepared, args.warmup)
+
+    for name, prepared in (('prepared', True), ('text', False)):
+        result = run(args, prepared)
+        print(
+            f"{name}: queries={result['queries']} rows={result['rows']} qps={result['qps']:.1f} "
+            f"p50={result['p50']:.2f}ms p99={result['p99']:.2f}ms"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -255,6 +255,8 @@ class BaseExecutorTest(BaseUnitTest):
         config_patch = mock.patch("mindsdb.utilities.cache.FileCache.get")
         self.mock_config = config_patch.__enter__()
         self.mock_config.side_effect = lambda x: None
+        cache_many_patch = mock.patch("mindsdb.utilities.cache.FileCache.get_many")
+        cache_many_patch.__enter__().side_effect = lambda x: [None] * len(x)
 
     def save_file(self, name, df):
         file_path = tempfile.mktemp(prefix="mindsdb_file_")
@@ -0,0 +1,62 @@
+import os
+import time
+import tarfile
+import tempfile
+from pathlib import Path
+
+from mindsdb.interfaces.storage.fs import ArtifactsCache, unshare_files
+
+
+class TestArtifactsCache:
+
+    def test_shared_copy(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp_dir = Path(tmp_dir)
+
+            # archive of resource folder, as it is stored in remote storage
+            src = tmp_dir / 'src' / 'predictor_1_1'
+            (src / 'sub').mkdir(parents=True)
+            (src / 'model.bin').write_bytes(b'x' * 100)
+            (src / 'sub' / 'args.json').write_text('{}')
+            archive_path = tmp_dir / 'archive.tar.gz'
+            with tarfile.open(archive_path, 'w:gz') as tar:
+                tar.add(src, arcname='predictor_1_1')
+
+            extract_calls = []
+
+            def extract(path):
+                extract_calls.append(path)
+                with tarfile.open(archive_path) as tar:
+                    tar.extractall(path)
+
+            cache = ArtifactsCache(tmp_dir / 'cache', max_size=150)
+            dest1 = tmp_dir / 'worker1' / 'predictor_1_1'
+            dest2 = tmp_dir / 'worker2' / 'predictor_1_1'
+
+            assert cache.get('etag1', dest1) is False
+            cache.put('etag1', extract, dest1)
+            assert cache.get('etag1', dest2) is True
+            assert len(extract_calls) == 1
+
+            # both workers use same copy of the file
+            assert (dest1 / 'model.bin').samefile(dest2 / 'model.bin')
+            assert os.stat(dest1 / 'model.bin').st_nlink == 3
+            assert (dest2 / 'sub' / 'args.json').read_text() == '{}'
+
+            # shared files are read-only
+            assert os.stat(dest1 / 'model.bin').st_mode & 0o222 == 0
+
+            # worker gets own writable copy, files of other worker are not changed
+            unshare_files(dest2)
+            assert not (dest1 / 'model.bin').samefile(dest2 / 'model.bin')
+            assert os.stat(dest1 / 'model.bin').st_nlink == 2
+            assert os.stat(dest2 / 'sub' / 'args.json').st_nlink == 1
+            (dest2 / 'model.bin').write_bytes(b'changed')
+            assert (dest1 / 'model.bin').read_bytes() == b'x' * 100
+
+            # size limit is exceeded: least recently used entry is evicted, linked files stay
+            time.sleep(0.01)
+            cache.put('etag2', extract, tmp_dir / 'worker1' / 'predictor_1_2')
+            assert cache.get('etag1', tmp_dir / 'worker3') is False
+            assert cache.get('etag2', tmp_dir / 'worker3') is True
+            assert (dest1 / 'model.bin').read_bytes() == b'x' * 100
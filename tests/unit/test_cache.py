@@ -7,10 +7,11 @@ import warnings
 import tempfile
 import json
 import os
+from unittest.mock import patch
 
 import pandas as pd
 
-from mindsdb.utilities.cache import get_cache, RedisCache, FileCache, dataframe_checksum
+from mindsdb.utilities.cache import get_cache, RedisCache, FileCache, FileVersions, dataframe_checksum
 
 
 class TestCashe(unittest.TestCase):
@@ -41,6 +42,71 @@ class TestCashe(unittest.TestCase):
 
         self.cache_test(cache)
 
+    def test_file_max_bytes(self):
+        cache = FileCache('predict_bytes', max_size=100, max_bytes=2500)
+        value = 'x' * 1000
+
+        cache.set('first', value)
+        time.sleep(0.01)
+        cache.set('second', value)
+        time.sleep(0.01)
+        # reading marks record as recently used
+        assert cache.get('first') == value
+        time.sleep(0.01)
+        cache.set('third', value)
+
+        # least recently used record is removed
+        assert cache.get('second') is None
+        assert cache.get('first') == value
+        assert cache.get('third') == value
+
+    def test_file_max_bytes_many(self):
+        cache = FileCache('predict_bytes_many', max_size=100, max_bytes=2500)
+        value = 'x' * 1000
+
+        cache.set_many({'first': value})
+        time.sleep(0.01)
+        cache.set_many({'second': value})
+        time.sleep(0.01)
+        # reading of many records marks them as recently used too
+        assert cache.get_many(['first']) == [value]
+        time.sleep(0.01)
+        cache.set_many({'third': value})
+
+        assert cache.get_many(['first', 'second', 'third']) == [value, None, value]
+
+    def test_file_versions(self):
+        with tempfile.TemporaryDirectory() as path:
+            versions = FileVersions('tables', path=path)
+            assert versions.get_many(['a', 'b']) == [None, None]
+
+            version = versions.bump('a')
+            assert versions.get_many(['a', 'b']) == [version, None]
+            assert versions.bump('a') != version
+
+            # versions are shared between instances
+            assert FileVersions('tables', path=path).get('a') == versions.get('a')
+
+    def test_catalog_version(self):
+        from mindsdb.interfaces.storage import catalog_version
+
+        with tempfile.TemporaryDirectory() as path:
+            versions = FileVersions('catalog', path=path)
+            with patch.object(catalog_version, 'get_versions', return_value=versions), \
+                    patch.object(catalog_version, 'LOCAL_TTL', 0.1):
+                catalog_version._local_versions.clear()
+                assert catalog_version.get_catalog_version(1) is None
+
+                # change from other process is visible after LOCAL_TTL
+                version = versions.bump('1')
+                assert catalog_version.get_catalog_version(1) is None
+                time.sleep(0.1)
+                assert catalog_version.get_catalog_version(1) == version
+
+                # change from this process is visible at once
+                catalog_version.bump_catalog_version(1)
+                assert catalog_version.get_catalog_version(1) == versions.get('1') != version
+
     def cache_test(self, cache):
 
         # test save
@@ -71,6 +137,10 @@ class TestCashe(unittest.TestCase):
         assert dataframe_checksum(df) == dataframe_checksum(df2)
         assert list(df.columns) == list(df2.columns)
 
+        # test many
+        cache.set_many({'many1': 1, 'many2': [2]})
+        assert cache.get_many(['many1', 'many3', 'many2']) == [1, None, [2]]
+
         # test delete
         cache.delete(name)
 
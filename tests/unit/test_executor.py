@@ -1,14 +1,17 @@
 from unittest.mock import patch
 import datetime as dt
 import tempfile
+import struct
 import pytest
 
 import pandas as pd
 import numpy as np
 
+from mindsdb_sql import parse_sql
 from mindsdb_sql.render.sqlalchemy_render import SqlalchemyRender
 
 from mindsdb.api.executor.utilities.sql import query_df
+from mindsdb.api.executor.sql_query.result_set import ResultSet, Column
 from mindsdb.api.mysql.mysql_proxy.utilities.lightwood_dtype import dtype
 
 # How to run:
@@ -621,6 +624,371 @@ class TestComplexQueries(BaseExecutorMockPredictor):
         assert list(ret_df.columns) == ['a1', 'target']
         assert ret_df.shape[0] == 3
 
+    @patch('mindsdb.integrations.handlers.postgres_handler.Handler')
+    def test_join_keys_pushdown(self, mock_handler):
+        facts = pd.DataFrame([
+            {'id': 1, 'dim_id': 1, 'v': 10},
+            {'id': 2, 'dim_id': 2, 'v': 20},
+            {'id': 3, 'dim_id': 3, 'v': 30},
+            {'id': 4, 'dim_id': 1, 'v': 40},
+        ])
+        dim = pd.DataFrame([
+            {'id': 1, 'name': 'x'},
+            {'id': 3, 'name': 'y'},
+        ])
+        tables = {'facts': facts, 'dim': dim}
+        self.set_handler(mock_handler, name='pg', tables=tables)
+        self.set_handler(mock_handler, name='pg2', tables=tables)
+
+        ret = self.execute('''
+            select d.name, f.v from pg.dim d
+            join pg2.facts f on f.dim_id = d.id
+        ''')
+        ret_df = self.ret_to_df(ret)
+        assert sorted(ret_df['v']) == [10, 30, 40]
+
+        # keys of the left table are used to filter the right table
+        query = mock_handler().query.call_args_list[-1][0][0]
+        assert 'IN (1, 3)' in str(query).upper()
+
+    @patch('mindsdb.integrations.handlers.postgres_handler.Handler')
+    def test_parallel_steps(self, mock_handler):
+        from mindsdb.utilities.config import Config
+        from mindsdb.api.executor.sql_query.sql_query import SQLQuery, get_step_dependencies
+        from mindsdb_sql.planner.steps import JoinStep
+        from mindsdb_sql.planner.step_result import Result
+
+        assert get_step_dependencies(JoinStep(left=Result(0), right=Result(1), query=None, step_num=2)) == {0, 1}
+
+        facts = pd.DataFrame([
+            {'id': 1, 'dim_id': 1, 'v': 10},
+            {'id': 2, 'dim_id': 2, 'v': 20},
+            {'id': 3, 'dim_id': 3, 'v': 30},
+        ])
+        dim = pd.DataFrame([
+            {'id': 1, 'name': 'x'},
+            {'id': 3, 'name': 'y'},
+        ])
+        tables = {'facts': facts, 'dim': dim}
+        self.set_handler(mock_handler, name='pg', tables=tables)
+        self.set_handler(mock_handler, name='pg2', tables=tables)
+
+        sql = '''
+            select d.name, f.v from pg.dim d
+            join pg2.facts f on f.dim_id = d.id
+            union all
+            select name, id from pg.dim
+        '''
+        with patch.dict(Config().get('executor'), {'dag_max_workers': 4}), \
+                patch.object(SQLQuery, '_execute_steps_dag', autospec=True,
+                             side_effect=SQLQuery._execute_steps_dag) as execute_dag:
+            ret = self.execute(sql)
+        assert execute_dag.call_count == 1
+        ret_df = self.ret_to_df(ret)
+        assert sorted(ret_df['v']) == [1, 3, 10, 30]
+
+        # size of the left table is unknown: tables are fetched at the same time
+        queries = [str(call[0][0]).upper() for call in mock_handler().query.call_args_list]
+        assert not any('FACTS' in query and 'IN (1, 3)' in query for query in queries)
+
+        # right table of the join is fetched after the left one, with its keys:
+        # if the left table is small
+        sql_limit = sql.replace('from pg.dim d', 'from (select * from pg.dim limit 10) d')
+        mock_handler().query.reset_mock()
+        with patch.dict(Config().get('executor'), {'dag_max_workers': 4}):
+            ret = self.execute(sql_limit)
+        assert sorted(self.ret_to_df(ret)['v']) == [1, 3, 10, 30]
+        queries = [str(call[0][0]).upper() for call in mock_handler().query.call_args_list]
+        assert any('FACTS' in query and 'IN (1, 3)' in query for query in queries)
+
+        # or if it is enabled in config
+        mock_handler().query.reset_mock()
+        with patch.dict(Config().get('executor'), {'dag_max_workers': 4, 'dag_wait_pushdown': True}):
+            self.execute(sql)
+        queries = [str(call[0][0]).upper() for call in mock_handler().query.call_args_list]
+        assert any('FACTS' in query and 'IN (1, 3)' in query for query in queries)
+
+    @patch('mindsdb.integrations.handlers.postgres_handler.Handler')
+    def test_release_step_results(self, mock_handler):
+        from mindsdb.utilities.config import Config
+        from mindsdb.api.executor.sql_query.steps_data import StepsData
+
+        facts = pd.DataFrame([
+            {'id': 1, 'dim_id': 1, 'dim2_id': 1, 'v': 10},
+            {'id': 2, 'dim_id': 2, 'dim2_id': 1, 'v': 20},
+            {'id': 3, 'dim_id': 3, 'dim2_id': 3, 'v': 30},
+        ])
+        dim = pd.DataFrame([
+            {'id': 1, 'name': 'x'},
+            {'id': 3, 'name': 'y'},
+        ])
+        tables = {'facts': facts, 'dim': dim}
+        self.set_handler(mock_handler, name='pg', tables=tables)
+        self.set_handler(mock_handler, name='pg2', tables=tables)
+
+        sql = '''
+            select d.name, d2.name as name2, f.v from pg.facts f
+            join pg2.dim d on f.dim_id = d.id
+            join pg.dim d2 on f.dim2_id = d2.id
+        '''
+        released = []
+        spilled = []
+        release, spill = StepsData.release, StepsData.spill
+
+        def release_f(steps_data, index):
+            released.append(index)
+            release(steps_data, index)
+
+        def spill_f(steps_data, index):
+            spilled.append(index)
+            spill(steps_data, index)
+
+        with patch.dict(Config().get('executor'), {'spill_rows_threshold': 0}), \
+                patch.object(StepsData, 'release', release_f), patch.object(StepsData, 'spill', spill_f):
+            ret = self.execute(sql)
+        ret_df = self.ret_to_df(ret)
+        assert sorted(ret_df['v']) == [10, 30]
+        assert ret_df[ret_df['v'] == 10]['name2'].iloc[0] == 'x'
+
+        # all steps except the last one are released, the first fetch waits for the join in file
+        assert len(released) > 0 and len(spilled) > 0
+        assert 0 in spilled and 0 in released
+
+    @patch('mindsdb.integrations.handlers.postgres_handler.Handler')
+    def test_stream_result(self, mock_handler):
+        from mindsdb.integrations.libs.response import HandlerResponse, RESPONSE_TYPE
+
+        df = pd.DataFrame([{'a': i, 'b': str(i)} for i in range(5)])
+        df.loc[4, 'b'] = None
+        self.set_handler(mock_handler, name='pg', tables={'tbl': df})
+
+        # handler returns result by batches of 2 rows
+        def query_stream_f(query):
+            result = mock_handler().query(query).data_frame
+            batches = [result[i:i + 2] for i in range(0, len(result), 2)]
+            return HandlerResponse(RESPONSE_TYPE.TABLE, batches[0], data_batches=iter(batches[1:]))
+
+        mock_handler().query_stream.side_effect = query_stream_f
+
+        ret = self.command_executor.execute_command(parse_sql('select * from pg.tbl'), stream=True)
+        assert ret.data == [[0, '0'], [1, '1']]
+        assert list(ret.data_batches) == [[[2, '2'], [3, '3']], [[4, None]]]
+        assert [c.name for c in ret.columns] == ['a', 'b']
+
+        # query with processing in mindsdb isn't streamed
+        ret = self.command_executor.execute_command(
+            parse_sql('select a from pg.tbl union select a from pg.tbl'), stream=True
+        )
+        assert ret.data_batches is None
+        assert len(ret.data) == 5
+
+        # not streamed by default
+        ret = self.command_executor.execute_command(parse_sql('select * from pg.tbl'))
+        assert ret.data_batches is None
+        assert len(ret.data) == 5
+
+    @patch('mindsdb.integrations.handlers.postgres_handler.Handler')
+    def test_information_schema_tables_filter(self, mock_handler):
+        self.set_handler(mock_handler, name='pg', tables={'tasks': self.df})
+        self.set_handler(mock_handler, name='pg2', tables={'tasks': self.df})
+
+        mock_handler().get_tables.reset_mock()
+        ret = self.execute("select table_schema, table_name from information_schema.tables where table_schema = 'pg'")
+        ret_df = self.ret_to_df(ret)
+        assert list(ret_df['table_schema'].unique()) == ['pg']
+        assert len(ret_df) > 0
+
+        # only filtered integration is requested
+        assert mock_handler().get_tables.call_count == 1
+
+    @patch('mindsdb.integrations.handlers.postgres_handler.Handler')
+    def test_query_cache(self, mock_handler):
+        from mindsdb.api.executor.utilities.query_cache import QueryCache
+        from mindsdb.utilities.cache import NoCache
+
+        # file cache is disabled in tests
+        caches = {}
+
+        class DictCache(NoCache):
+            def __init__(self, data):
+                self.data = data
+
+            def get(self, name):
+                return self.data.get(name)
+
+            def set(self, name, value):
+                self.data[name] = value
+
+            def get_many(self, names):
+                return [self.data.get(name) for name in names]
+
+        def get_cache(self, category='query_results', **kwargs):
+            return DictCache(caches.setdefault(category, {}))
+
+        self.set_handler(mock_handler, name='pg', tables={'tasks': self.df})
+
+        def select_count():
+            self.execute('select * from pg.tasks where a = 1')
+            return len(mock_handler().query.call_args_list)
+
+        with patch.object(QueryCache, '_get_cache', get_cache):
+            # disabled by default
+            calls = select_count()
+            assert select_count() == calls + 1
+
+            self.execute('set query_cache = 1')
+            calls = select_count()
+            assert select_count() == calls
+
+            # writing to the table invalidates cache
+            self.execute('insert into pg.tasks (a) values (4)')
+            calls = len(mock_handler().query.call_args_list)
+            assert select_count() == calls + 1
+            assert select_count() == calls + 1
+
+            self.execute('set query_cache = 0')
+            assert select_count() == calls + 2
+
+    @patch('mindsdb.integrations.handlers.postgres_handler.Handler')
+    def test_plan_cache(self, mock_handler):
+        from mindsdb.api.executor.sql_query.sql_query import SQLQuery
+        from mindsdb.api.executor.sql_query.plan_cache import plan_cache
+
+        self.set_handler(mock_handler, name='pg', tables={'tasks': self.df})
+        self.set_predictor(self.task_predictor)
+        plan_cache.parsed.clear()
+        plan_cache.plans.clear()
+
+        # modules of previous tests are also subscribed to commits of sessions and change the catalog version
+        # instead of this module: don't wait for expiration of the local copy of the version
+        with patch.object(plan_cache, 'enabled', True), \
+                patch('mindsdb.interfaces.storage.catalog_version.LOCAL_TTL', 0), \
+                patch.object(SQLQuery, 'create_planner', autospec=True, side_effect=SQLQuery.create_planner) as planner:
+
+            # queries which differ only by values use one plan
+            ret = self.execute('select * from pg.tasks where a = 1')
+            assert len(ret.records) == 2
+            ret = self.execute('select * from pg.tasks where a = 2')
+            assert len(ret.records) == 1
+            assert ret.records[0]['b'] == 'bbb'
+            assert planner.call_count == 1
+
+            # aliases are not values
+            self.execute('select a, 1 as x from pg.tasks')
+            ret = self.execute('select a, 1 as y from pg.tasks')
+            assert list(ret.records[0].keys()) == ['a', 'y']
+
+            sql = '''
+                select t.a, m.p from pg.tasks t
+                join mindsdb.task_model m
+                where t.b = '{}'
+            '''
+            self.execute(sql.format('aaa'))
+            ret = self.execute(sql.format('ccc'))
+            assert ret.records == [{'a': 1, 'p': 'ccc'}]
+            assert planner.call_count == 4
+
+            # change of catalog invalidates plans
+            self.execute('create project proj2')
+            self.execute('select * from pg.tasks where a = 3')
+            assert planner.call_count == 5
+
+    def test_parse_cache(self):
+        from mindsdb_sql import parse_sql
+        from mindsdb.api.executor.sql_query.plan_cache import PlanCache
+
+        cache = PlanCache()
+        cache.enabled = True
+        queries = [
+            "select * from pg.tbl where a = {} and b = '{}' limit 10",
+            "select * from pg.t1 as t join pg.t2 as t2 on t2.x = {} where t.b = '{}'",
+            "select a, {} as x from mindsdb.model_1.2 where `c 1` = '{}' and d > '2020-01-01'",
+        ]
+        for sql in queries:
+            for values in ((1, 'x'), (2.5, 'y z'), (-3, 'a b')):
+                query = sql.format(*values)
+                assert cache.parse(query) == parse_sql(query, dialect='mindsdb')
+
+        # same structure of the query is parsed once
+        with patch('mindsdb.api.executor.sql_query.plan_cache.parse_sql', side_effect=parse_sql) as parser:
+            query = "select * from pg.tbl where a = 10 and b = 'q' limit 10"
+            assert cache.parse(query) == parse_sql(query, dialect='mindsdb')
+            assert parser.call_count == 0
+
+    @patch('mindsdb.integrations.handlers.postgres_handler.Handler')
+    def test_prepared_statement(self, mock_handler):
+        from mindsdb.api.executor.sql_query.sql_query import SQLQuery
+        from mindsdb.api.mysql.mysql_proxy.executor.mysql_executor import Executor
+        from mindsdb.api.postgres.postgres_proxy.executor.executor import Executor as PostgresExecutor
+
+        self.set_handler(mock_handler, name='pg', tables={'tasks': self.df})
+        self.set_predictor(self.task_predictor)
+
+        class SqlServer:
+            connection_id = 1
+
+        def get_executor(sql):
+            executor = Executor(session=self.command_executor.session, sqlserver=SqlServer())
+            executor.stmt_prepare(sql)
+            return executor
+
+        # plan is reused
+        executor = get_executor('select b from pg.tasks where a = ? order by b')
+        assert executor.prepared_statement.plan_steps is not None
+        with patch.object(SQLQuery, 'create_planner') as create_planner:
+            executor.stmt_execute([1])
+            assert [row[0] for row in executor.data] == ['aaa', 'ccc']
+            executor.stmt_execute([2])
+            assert [row[0] for row in executor.data] == ['bbb']
+            assert create_planner.call_count == 0
+        query = mock_handler().query.call_args_list[-1][0][0]
+        assert 'a = 2' in str(query)
+
+        # change of the catalog after PREPARE: query is planned again
+        with patch.object(SQLQuery, 'create_planner', autospec=True, side_effect=SQLQuery.create_planner) as create_planner, \
+                patch('mindsdb.api.executor.sql_query.prepared_statement.get_catalog_version', return_value='changed'):
+            executor.stmt_execute([2])
+            executor.stmt_execute([1])
+            assert [row[0] for row in executor.data] == ['aaa', 'ccc']
+            assert create_planner.call_count == 1
+
+        # postgres positional parameters
+        executor = PostgresExecutor(session=self.command_executor.session, proxy_server=None)
+        executor.stmt_prepare('select b from pg.tasks where b != $2 and a = $1 order by b')
+        executor.stmt_execute([b'1', b'aaa'])
+        assert [row[0] for row in executor.data] == ['ccc']
+
+        # binary parameter (int8) and text parameter
+        executor.stmt_execute([struct.pack('!q', 1), b'ccc'], format_codes=[1, 0], param_types=[20, 25])
+        assert [row[0] for row in executor.data] == ['aaa']
+        assert executor.decode_param(b'\x00\x01', 1, 17) == b'\x00\x01'
+        assert executor.decode_param(b'\x01', 1, 16) is True
+        assert executor.decode_param(None, 1, 20) is None
+
+        # join with predictor
+        executor = get_executor('select t.a, m.p from pg.tasks t join mindsdb.task_model m where t.b = ?')
+        assert executor.prepared_statement.plan_steps is not None
+        executor.stmt_execute(['bbb'])
+        assert executor.data == [[2, 'ccc']]
+
+        # parameter is an input of the predictor: the query is planned at every execution
+        executor = get_executor('select p from mindsdb.task_model where a = ?')
+        assert executor.prepared_statement.plan_steps is None
+        executor.stmt_execute([1])
+        assert executor.data[0][0] == 'ccc'
+        executor.stmt_execute([2])
+        assert executor.data[0][0] == 'ccc'
+
+        # statement without parameters is executed again
+        executor = get_executor('select b from pg.tasks where a = 2')
+        executor.stmt_execute([])
+        self.df.loc[1, 'b'] = 'ddd'
+        try:
+            executor.stmt_execute([])
+            assert executor.data[0][0] == 'ddd'
+        finally:
+            self.df.loc[1, 'b'] = 'bbb'
+
     @patch('mindsdb.integrations.handlers.postgres_handler.Handler')
     def test_update_from_select(self, mock_handler):
         self.set_handler(mock_handler, name='pg', tables={'tasks': self.df})
@@ -1122,6 +1490,248 @@ class TestExecutionTools:
         df = pd.DataFrame(d)
         query_df(df, 'select * from models')
 
+    def test_result_set_columnar(self):
+        df = pd.DataFrame([
+            [1, 1.5, 'a'],
+            [2, np.nan, 'b'],
+            [3, 2.5, None],
+        ], columns=['x', 'y', 'z'])
+
+        rs = ResultSet().from_df(df, database='db', table_name='tbl')
+        assert rs.is_columnar()
+        assert rs.length() == 3
+
+        # dataframe is not converted to records
+        df2 = rs.to_df()
+        assert rs.is_columnar()
+        assert list(df2.columns) == ['x', 'y', 'z']
+        assert np.shares_memory(df2['x'].values, df['x'].values)
+
+        # columns can be changed without converting
+        rs.add_column(Column('w'), [10, 20])
+        rs.del_column(rs.find_columns('z')[0])
+        assert rs.is_columnar()
+
+        part = rs.slice(offset=1, limit=1)
+        assert part.is_columnar()
+        assert part.get_records_raw() == [[2, None, 20]]
+
+        # records are materialized on demand: NaN is converted to None
+        assert rs.get_records_raw() == [[1, 1.5, 10], [2, None, 20], [3, 2.5, None]]
+        assert not rs.is_columnar()
+
+        rs.add_record_raw([4, 3.5, 40])
+        assert rs.to_df()['y'].tolist()[-1] == 3.5
+
+        # duplicated names of columns
+        df = pd.DataFrame([[1, 'a'], [2, 'b']], columns=['id', 'id'])
+        rs = ResultSet().from_df(df, database='db', table_name='tbl')
+        assert [col.type for col in rs.columns] == [np.dtype('int64'), np.dtype('O')]
+        assert rs.get_records_raw() == [[1, 'a'], [2, 'b']]
+
+    def test_query_df_type_infer(self):
+        from mindsdb.api.executor.utilities.sql import get_duckdb_connection
+
+        # type of object column can't be inferred from the first 1000 rows
+        df = pd.DataFrame({'a': [None] * 2000 + ['x'], 'b': range(2001)})
+        res = query_df(df, "select a from tbl where b > 1998")
+        assert res['a'].tolist() == [None, 'x']
+
+        # connection is reused by the next query in the same thread
+        con = get_duckdb_connection()
+        res = query_df(df, "select count(*) c from tbl")
+        assert res['c'][0] == 2001
+        assert get_duckdb_connection() is con
+
+    def test_predict_rows_cache(self):
+        from mindsdb.api.executor.sql_query.steps import apply_predictor_step
+        from mindsdb.utilities.cache import NoCache
+
+        class DictCache(NoCache):
+            data = {}
+
+            def get(self, name):
+                return self.data.get(name)
+
+            def set(self, name, value):
+                self.data[name] = value
+
+            def get_many(self, names):
+                return [self.data.get(name) for name in names]
+
+            def set_many(self, values):
+                self.data.update(values)
+
+        predicted = []
+
+        def predict(rows):
+            predicted.append([row['a'] for row in rows])
+            return pd.DataFrame([
+                {'a': row['a'], 'p': row['a'] * 10, '__mindsdb_row_id': row['__mindsdb_row_id']}
+                for row in rows
+            ])
+
+        step_call = apply_predictor_step.ApplyPredictorStepCall.__new__(apply_predictor_step.ApplyPredictorStepCall)
+        with patch.object(apply_predictor_step, 'get_cache', lambda *args, **kwargs: DictCache()):
+            rows = [{'a': 1, '__mindsdb_row_id': 1}, {'a': 2, '__mindsdb_row_id': 2}]
+            step_call.predict_with_rows_cache(predict, rows, 'model_1', 'batch_1')
+
+            rows = [{'a': 2, '__mindsdb_row_id': 3}, {'a': 3, '__mindsdb_row_id': 4}]
+            data, _ = step_call.predict_with_rows_cache(predict, rows, 'model_1', 'batch_2')
+
+            # only new row was sent to model
+            assert predicted == [[1, 2], [3]]
+            assert data == [
+                {'a': 2, 'p': 20, '__mindsdb_row_id': 3},
+                {'a': 3, 'p': 30, '__mindsdb_row_id': 4},
+            ]
+
+            # model returns one row for all input rows
+            predicted.clear()
+
+            def predict_aggregated(rows):
+                predicted.append([row['a'] for row in rows])
+                return pd.DataFrame([{'p': sum(row['a'] for row in rows)}])
+
+            rows = [{'a': 4, '__mindsdb_row_id': 1}, {'a': 5, '__mindsdb_row_id': 2}]
+            data, _ = step_call.predict_with_rows_cache(predict_aggregated, rows, 'model_2', 'batch_3')
+            assert data == [{'p': 9}]
+
+            # model isn't predicted again, the next calls use cache of batches
+            data, _ = step_call.predict_with_rows_cache(predict_aggregated, rows, 'model_2', 'batch_3')
+            assert data == [{'p': 9}]
+            assert predicted == [[4, 5]]
+
+    def test_integration_semaphore(self):
+        from mindsdb.utilities.config import Config
+        from mindsdb.utilities.context import context as ctx
+        from mindsdb.api.executor.utilities.functions import get_integration_semaphore, get_integration_limit
+
+        ctx.set_default()
+        # integration is not limited by default
+        assert get_integration_limit('pg') is None
+        with patch.dict(Config().get('executor'), {'integration_max_workers': {'pg': 2}}):
+            assert get_integration_limit('PG') == 2
+            # the same limit is shared by all queries to integration
+            semaphore = get_integration_semaphore('PG')
+            assert get_integration_semaphore('pg') is semaphore
+            assert semaphore.acquire(blocking=False)
+            assert semaphore.acquire(blocking=False)
+            assert not get_integration_semaphore('pg').acquire(blocking=False)
+            semaphore.release()
+            semaphore.release()
+
+    def test_handlers_cache_pool(self):
+        import time
+        import threading
+        from mindsdb.interfaces.database.integrations import HandlersCache
+        from mindsdb.integrations.libs.response import HandlerStatusResponse
+        from mindsdb.utilities.context import context as ctx
+
+        class FakeHandler:
+            def __init__(self, name):
+                self.name = name
+                self.connected = False
+
+            def connect(self):
+                self.connected = True
+
+            def disconnect(self):
+                self.connected = False
+                disconnected.append(self.name)
+
+            def check_connection(self):
+                return HandlerStatusResponse(success=self.connected)
+
+        disconnected = []
+        cache = HandlersCache(max_size=1, wait_timeout=0.5)
+        errors = []
+
+        def use_handler():
+            ctx.set_default()
+            handler = cache.get('db')
+            if handler is None:
+                try:
+                    cache.set(FakeHandler('db'))
+                except Exception as e:
+                    errors.append(e)
+
+        thread = threading.Thread(target=use_handler)
+        thread.start()
+        thread.join()
+
+        # handler of the finished thread is reused by current thread
+        ctx.set_default()
+        handler = cache.get('db')
+        assert handler is not None and handler.connected
+
+        # pool is full: another thread doesn't connect new handler, it waits for idle one
+        thread = threading.Thread(target=use_handler)
+        thread.start()
+        thread.join()
+        assert len(errors) == 1
+
+        metrics = cache.get_metrics()[0]
+        assert metrics['size'] == 1
+        assert metrics['in_use'] == 1
+        assert metrics['reused'] == 1
+        assert metrics['rejected'] == 1
+        assert metrics['created'] == 1
+
+        taken = []
+        thread = threading.Thread(target=lambda: ctx.set_default() or taken.append(cache.set(FakeHandler('db'))))
+        thread.start()
+        time.sleep(0.2)
+        # handler is released by current thread and taken by waiting one
+        handler_id, handler = id(handler), None
+        thread.join()
+        handler = taken.pop()
+        assert id(handler) == handler_id
+        assert cache.get_metrics()[0]['created'] == 1
+
+        # handler in use is not closed by ttl or by deleting
+        cache.handlers[('db', ctx.company_id)][0]['expired_at'] = 0
+        cache.min_size = 0
+        cache._stop_event.set()
+        cache._stop_event = threading.Event()
+        cleaner = threading.Thread(target=cache._clean)
+        cleaner.start()
+        time.sleep(3.5)
+        assert handler.connected
+        cache.delete('db')
+        assert handler.connected
+        cache._stop_clean()
+        cleaner.join()
+
+        # idle handler is disconnected by deleting
+        cache.set(FakeHandler('db2'))
+        handler2 = cache.handlers[('db2', ctx.company_id)][0]['handler']
+        assert handler2.connected
+        handler2 = None
+        cache.delete('db2')
+        assert disconnected == ['db2']
+
+        # slow health check of one integration does not block others
+        release = threading.Event()
+
+        class SlowHandler(FakeHandler):
+            def check_connection(self):
+                release.wait(5)
+                return super().check_connection()
+
+        cache.set(SlowHandler('slow'))
+        cache.set(FakeHandler('fast'))
+        cache.handlers[('slow', ctx.company_id)][0]['expired_at'] = 0
+        thread = threading.Thread(target=lambda: ctx.set_default() or cache.get('slow'))
+        thread.start()
+        time.sleep(0.1)
+        start = time.time()
+        assert cache.get('fast') is not None
+        assert time.time() - start < 1
+        release.set()
+        thread.join()
+        cache._stop_clean()
+
 
 class TestIfExistsIfNotExists(BaseExecutorMockPredictor):
 
@@ -1,3 +1,4 @@
+import hashlib
 import tempfile
 import time
 from unittest.mock import patch
@@ -387,3 +388,135 @@ class TestKnowledgeBase(BaseExecutorTest):
         """
         df = self.run_sql(sql)
         assert df.shape[0] == 1
+
+
+class TestEmbeddingsCache:
+    def test_df_to_embeddings(self):
+        from unittest.mock import MagicMock
+        from mindsdb.interfaces.knowledge_base.controller import KnowledgeBaseTable
+        from mindsdb.interfaces.knowledge_base.embeddings_cache import embeddings_cache
+
+        embeddings_cache.clear()
+
+        def predict(model_name, data):
+            return pd.DataFrame({'embeddings': [[len(row['content'])] for row in data]})
+
+        session = MagicMock()
+        session.datahub.get().predict.side_effect = predict
+
+        kb_table = KnowledgeBaseTable(MagicMock(), session)
+        kb_table._model_info = {
+            'name': 'emb_model',
+            'project_name': 'mindsdb',
+            'input_col': None,
+            'target': 'embeddings',
+            'cache_key': '1'
+        }
+
+        df = pd.DataFrame({'content': ['a', 'bb']}, index=[5, 6])
+        res = kb_table._df_to_embeddings(df)
+        assert res['embeddings'].tolist() == [[1], [2]]
+        assert list(res.index) == [5, 6]
+
+        # only new content is sent to model
+        df = pd.DataFrame({'content': ['bb', 'ccc']})
+        res = kb_table._df_to_embeddings(df)
+        assert res['embeddings'].tolist() == [[2], [3]]
+        data = session.datahub.get().predict.call_args[1]['data']
+        assert [row['content'] for row in data] == ['ccc']
+
+        # another model has own namespace
+        assert embeddings_cache.get_many('2', ['a']) == [None]
+
+    def test_max_bytes(self):
+        from mindsdb.interfaces.knowledge_base.embeddings_cache import EmbeddingsCache
+
+        # float32 embedding of 4 numbers takes 16 bytes
+        cache = EmbeddingsCache(max_bytes=40)
+        cache.set_many('1', ['a', 'b'], [[1, 2, 3, 4], [5, 6, 7, 8]])
+        cache.get_many('1', ['a'])
+        cache.set_many('1', ['c'], [[0.5] * 4])
+        # least recently used is removed
+        assert cache.get_many('1', ['a', 'b', 'c']) == [[1, 2, 3, 4], None, [0.5] * 4]
+        assert cache._bytes == 32
+
+        # too big embedding is not cached
+        cache.set_many('1', ['d'], [[1] * 20])
+        assert cache.get_many('1', ['d', 'a']) == [None, [1, 2, 3, 4]]
+
+    def test_vector_store_do_upsert(self):
+        from mindsdb.integrations.libs import vectordatabase_handler
+        from mindsdb.integrations.libs.vectordatabase_handler import VectorStoreHandler
+
+        class FakeVectorStore(VectorStoreHandler):
+            def __init__(self):
+                super().__init__('fake')
+                self.is_connected = False
+                self.selected = []
+                self.updated = None
+                self.inserted = None
+
+            def select(self, table_name, columns=None, conditions=None, **kwargs):
+                ids = conditions[0].value
+                self.selected.append(ids)
+                return pd.DataFrame({'id': [x for x in ids if x in ('1', '3')]})
+
+            def update(self, table_name, data, key_columns=None):
+                self.updated = data
+
+            def insert(self, table_name, data):
+                self.inserted = data
+
+        handler = FakeVectorStore()
+        df = pd.DataFrame({
+            'id': ['1', None, '3', '4'],
+            'content': ['a', 'b', 'c', 'd'],
+            'embeddings': [[1], [2], [3], [4]]
+        }, index=[10, 11, 12, 13])
+
+        with patch.object(vectordatabase_handler, 'UPSERT_CHECK_CHUNK_SIZE', 2):
+            handler.do_upsert('tbl', df)
+
+        # empty id is filled with hash of content, existence is checked by chunks
+        assert handler.selected == [['1', hashlib.md5(b'b').hexdigest()], ['3', '4']]
+        assert handler.updated['id'].tolist() == ['1', '3']
+        assert handler.inserted['content'].tolist() == ['b', 'd']
+
+
+class TestKnowledgeBaseInsert:
+    def test_insert_by_batches(self):
+        from unittest.mock import MagicMock
+        from mindsdb.interfaces.knowledge_base.controller import KnowledgeBaseTable
+
+        kb_table = KnowledgeBaseTable(MagicMock(id=1), MagicMock())
+        kb_table._drop_insert_checkpoint()
+        kb_table._df_to_embeddings = lambda df: pd.DataFrame(
+            {'embeddings': [[1]] * len(df)}, index=df.index
+        )
+        db_handler = MagicMock()
+        kb_table._vector_db = db_handler
+
+        df = pd.DataFrame({'content': [str(i) for i in range(2500)]})
+        kb_table.insert(df)
+
+        batches = [call[0][1] for call in db_handler.do_upsert.call_args_list]
+        assert [len(batch) for batch in batches] == [1000, 1000, 500]
+        assert batches[2]['content'].tolist()[-1] == '2499'
+        assert 'embeddings' in batches[0].columns
+
+        # error in the middle of insert
+        db_handler.do_upsert.side_effect = [None, Exception('connection lost'), None]
+        with pytest.raises(RuntimeError, match='1000 of 2500 rows were stored'):
+            kb_table.insert(df)
+
+        # repeated insert continues after the last stored batch
+        db_handler.do_upsert.reset_mock(side_effect=True)
+        kb_table.insert(df)
+        batches = [call[0][1] for call in db_handler.do_upsert.call_args_list]
+        assert [len(batch) for batch in batches] == [1000, 500]
+        assert batches[0]['content'].tolist()[0] == '1000'
+
+        # checkpoint is removed after successful insert
+        db_handler.do_upsert.reset_mock()
+        kb_table.insert(df)
+        assert len(db_handler.do_upsert.call_args_list) == 3
@@ -0,0 +1,107 @@
+import time
+import threading
+
+from mindsdb_sql import parse_sql
+
+from mindsdb.utilities.context import context as ctx
+from mindsdb.api.executor.datahub.metadata_catalog import MetadataCatalog
+from mindsdb.api.executor.datahub.datanodes.information_schema_datanode import get_filter_values
+
+
+class TestMetadataCatalog:
+
+    def setup_method(self):
+        ctx.set_default()
+
+    @staticmethod
+    def get_catalog(enabled=True, ttl=60, max_stale=3600, timeout=1):
+        catalog = MetadataCatalog()
+        catalog.enabled = enabled
+        catalog.ttl = ttl
+        catalog.max_stale = max_stale
+        catalog.timeout = timeout
+        return catalog
+
+    def test_concurrent_with_timeout(self):
+        catalog = self.get_catalog(timeout=0.5)
+        release = threading.Event()
+
+        def slow():
+            release.wait(5)
+            return ['slow_table']
+
+        start = time.time()
+        result = catalog.get_many({
+            'fast': ('fast', 'tables', lambda: ['fast_table']),
+            'slow': ('slow', 'tables', slow),
+            'broken': ('broken', 'tables', lambda: 1 / 0),
+        })
+        # slow integration does not block others
+        assert time.time() - start < 2
+        assert result == {'fast': ['fast_table']}
+
+        # slow integration is cached when it answers
+        release.set()
+        time.sleep(0.2)
+        result = catalog.get_many({'slow': ('slow', 'tables', slow)})
+        assert result == {'slow': ['slow_table']}
+
+    def test_stale_while_revalidate(self):
+        catalog = self.get_catalog(ttl=0)
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return len(calls)
+
+        assert catalog.get_many({'a': ('a', 'tables', loader)}) == {'a': 1}
+        # entry is stale: old value is returned, new one is loaded in background
+        assert catalog.get_many({'a': ('a', 'tables', loader)}) == {'a': 1}
+        time.sleep(0.2)
+        assert len(calls) == 2
+        assert catalog.get_many({'a': ('a', 'tables', loader)}) == {'a': 2}
+
+    def test_invalidate(self):
+        catalog = self.get_catalog()
+        value = ['t1']
+        loaders = {'a': ('A', 'tables', lambda: list(value))}
+
+        assert catalog.get_many(loaders) == {'a': ['t1']}
+        value.append('t2')
+        assert catalog.get_many(loaders) == {'a': ['t1']}
+
+        catalog.invalidate('a')
+        assert catalog.get_many(loaders) == {'a': ['t1', 't2']}
+
+    def test_disabled(self):
+        catalog = self.get_catalog(enabled=False)
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return len(calls)
+
+        assert catalog.get_many({'a': ('a', 'tables', loader)}) == {'a': 1}
+        assert catalog.get_many({'a': ('a', 'tables', loader)}) == {'a': 2}
+
+        # timeout is not applied: slow integration is waited for
+        catalog.timeout = 0.1
+
+        def slow():
+            time.sleep(0.5)
+            return ['slow_table']
+
+        assert catalog.get_many({'slow': ('slow', 'tables', slow)}) == {'slow': ['slow_table']}
+
+    def test_filter_values(self):
+        def values(sql, column='TABLE_SCHEMA'):
+            return get_filter_values(parse_sql(sql, dialect='mysql'), column)
+
+        assert values("select * from tables where table_schema = 'PG'") == {'pg'}
+        assert values("select * from tables where 'pg' = table_schema and table_name = 'x'") == {'pg'}
+        assert values("select * from tables where table_name = 'x'", 'TABLE_NAME') == {'x'}
+        assert values("select * from tables where table_schema in ('a', 'b') and table_schema = 'a'") == {'a'}
+        assert values("select * from tables where table_schema = 'a' or table_schema = 'b'") == {'a', 'b'}
+        assert values("select * from tables where table_schema = 'a' or table_name = 'b'") is None
+        assert values("select * from tables where table_schema like 'a%'") is None
+        assert values("select * from tables") is None
@@ -0,0 +1,493 @@
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+
+from mindsdb.utilities.ml_task_queue.const import DATAFRAME_CODEC
+from mindsdb.utilities.ml_task_queue.utils import dataframe_to_chunks, dataframe_from_chunks
+
+
+class TestDataframeCodec:
+
+    def test_arrow(self):
+        df = pd.DataFrame({
+            'a': np.arange(1000),
+            'b': np.random.random(1000),
+            'c': ['x', None] * 500,
+            'd': [dt.datetime(2020, 1, 1)] * 1000,
+        })
+        chunks = dataframe_to_chunks(df, chunk_size=4096, codec='arrow')
+        assert chunks[0] == DATAFRAME_CODEC.ARROW.value
+        assert len(chunks) > 2
+
+        df2 = dataframe_from_chunks(chunks)
+        pd.testing.assert_frame_equal(df, df2)
+
+        chunks = dataframe_to_chunks(df, compression='zstd')
+        pd.testing.assert_frame_equal(df, dataframe_from_chunks(chunks))
+
+        # empty dataframe keeps columns
+        df2 = dataframe_from_chunks(dataframe_to_chunks(df.iloc[:0], codec='arrow'))
+        assert list(df2.columns) == list(df.columns)
+        assert len(df2) == 0
+
+    def test_auto_codec(self):
+        # numeric columns are faster with pickle
+        df = pd.DataFrame({'a': np.arange(1000), 'b': np.random.random(1000), 'c': ['x'] * 1000})
+        assert dataframe_to_chunks(df)[0] == DATAFRAME_CODEC.PICKLE.value
+        assert dataframe_to_chunks(df, compression='zstd')[0] == DATAFRAME_CODEC.ARROW.value
+
+        # big dataframe with mostly string columns
+        df = pd.DataFrame({'a': np.arange(1000), 'b': ['x'] * 1000, 'c': ['y'] * 1000})
+        assert dataframe_to_chunks(df)[0] == DATAFRAME_CODEC.ARROW.value
+        assert dataframe_to_chunks(df.iloc[:10])[0] == DATAFRAME_CODEC.PICKLE.value
+        assert dataframe_to_chunks(df, codec='pickle')[0] == DATAFRAME_CODEC.PICKLE.value
+
+    def test_pickle_fallback(self):
+        # lists and dicts are not restored from arrow as same python objects
+        df = pd.DataFrame({
+            'embeddings': [[1.0, 2.0], [3.0]],
+            'metadata': [{'a': 1}, None]
+        })
+        chunks = dataframe_to_chunks(df, chunk_size=100, codec='arrow')
+        assert chunks[0] == DATAFRAME_CODEC.PICKLE.value
+        assert len(chunks) > 2
+
+        df2 = dataframe_from_chunks([bytes(x) for x in chunks])
+        assert df2['embeddings'].tolist() == [[1.0, 2.0], [3.0]]
+        assert df2['metadata'].tolist() == [{'a': 1}, None]
+
+
+class TestPredictBatcher:
+
+    def test_batching(self):
+        import threading
+        from concurrent.futures import Future
+        from types import SimpleNamespace
+        from mindsdb.integrations.libs.process_cache import PredictBatcher
+
+        tasks = []
+
+        def run_task(task_type, model_id, payload, dataframe):
+            tasks.append(dataframe)
+            future = Future()
+            future.set_result(pd.DataFrame({'p': dataframe['x'] * 10}))
+            return future
+
+        batcher = PredictBatcher(run_task, max_rows=5, window=0.05)
+        payload = {
+            'predictor_record': SimpleNamespace(learn_args={}),
+            'context': {'company_id': None},
+            'args': {'pred_format': 'dict', 'predict_params': {}}
+        }
+
+        futures = []
+        lock = threading.Lock()
+
+        def predict(x):
+            df = pd.DataFrame({'x': [x, x + 1]})
+            key = batcher.get_batch_key(1, payload, df)
+            with lock:
+                futures.append((x, batcher.submit(key, 1, payload, df)))
+
+        threads = [threading.Thread(target=predict, args=(x,)) for x in (0, 10, 20, 30)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for x, future in futures:
+            assert future.result(timeout=5)['p'].tolist() == [x * 10, (x + 1) * 10]
+
+        # first batch is sent when it reaches max_rows, the rest after window
+        assert [len(df) for df in tasks] == [6, 2]
+
+        # timeseries models are not batched
+        payload['predictor_record'].learn_args = {'timeseries_settings': {'is_timeseries': True}}
+        assert batcher.get_batch_key(1, payload, pd.DataFrame({'x': [1]})) is None
+
+
+class TestProcessCache:
+
+    def test_processes_limit(self):
+        import time
+        from unittest.mock import patch
+        from concurrent.futures import Future
+        from mindsdb.integrations.libs import process_cache as process_cache_module
+        from mindsdb.utilities.ml_task_queue.const import ML_TASK_TYPE
+
+        class FakeProcess:
+            def __init__(self, *args):
+                self.task = None
+                self.markers = set()
+                self.last_usage_at = time.time()
+                self.is_shutdown = False
+
+            def ready(self):
+                return self.task is None or self.task.done()
+
+            def has_marker(self, marker):
+                return marker in self.markers
+
+            def add_marker(self, marker):
+                self.markers.add(marker)
+
+            def apply_async(self, func, *args):
+                self.task = Future()
+                return self.task
+
+            def get_rss(self):
+                return 0
+
+            def shutdown(self):
+                self.is_shutdown = True
+
+        def payload(engine):
+            return {
+                'handler_meta': {'module_path': engine, 'engine': engine},
+                'context': {'company_id': None}
+            }
+
+        with patch.object(process_cache_module, 'WarmProcess', FakeProcess):
+            cache = process_cache_module.ProcessCache()
+            cache._stop_clean()
+            cache._max_processes = 2
+            cache._max_processes_per_handler = 1
+
+            task1 = cache.apply_async(ML_TASK_TYPE.PREDICT, 1, payload('a'))
+            # limit per handler: task waits in queue
+            task2 = cache.apply_async(ML_TASK_TYPE.PREDICT, 2, payload('a'))
+            assert len(cache._queue) == 1
+
+            task3 = cache.apply_async(ML_TASK_TYPE.PREDICT, 3, payload('b'))
+            process_b = cache.cache['b']['processes'][0]
+
+            # global limit: idle process of handler 'b' is stopped to start process for 'c'
+            task3.set_result(3)
+            task4 = cache.apply_async(ML_TASK_TYPE.PREDICT, 4, payload('c'))
+            assert process_b.is_shutdown
+            assert len(cache.cache['b']['processes']) == 0
+
+            # queued task is sent to process when it is free
+            task1.set_result(1)
+            assert len(cache._queue) == 0
+            process_a = cache.cache['a']['processes'][0]
+            assert process_a.has_marker((2, None))
+            process_a.task.set_result(2)
+            assert task2.result(timeout=1) == 2
+            task4.set_result(4)
+
+            # idle process is stopped after ttl, but not if it has warmed up model
+            process_a.is_marked = lambda: True
+            process_a.keep_warm = False
+            now = process_a.last_usage_at + cache._ttl + 1
+            assert cache._is_expired(process_a, now)
+
+            task5 = cache.apply_async(ML_TASK_TYPE.WARMUP, 5, payload('a'))
+            assert process_a.keep_warm
+            task5.set_result(None)
+            assert not cache._is_expired(process_a, now)
+
+
+class TestMLHandlersCache:
+
+    def test_memory_limit(self):
+        from unittest.mock import MagicMock
+        from mindsdb.integrations.libs.learn_process import HandlersCache
+
+        cache = HandlersCache(max_size=3, max_memory=100)
+        handlers = {key: MagicMock() for key in range(4)}
+
+        cache.set(0, handlers[0], 40)
+        cache.set(1, handlers[1], 40)
+        assert cache.get(0) is handlers[0]
+
+        # 1 is least recently used, it is evicted when memory limit is exceeded
+        cache.set(2, handlers[2])
+        cache.set_size(2, 40)
+        assert 1 not in cache
+        handlers[1].close.assert_called_once()
+
+        # count limit
+        cache.set(3, handlers[3], 10)
+        cache.set(1, handlers[1], 10)
+        assert 0 not in cache
+
+        assert cache.get(0) is None
+        stats = cache.get_stats()
+        assert stats['hits'] == 1
+        assert stats['misses'] == 1
+        assert stats['evictions'] == 2
+        assert stats['memory'] == 60
+
+    def test_eviction_releases_model(self):
+        import weakref
+        from mindsdb.integrations.libs.learn_process import HandlersCache
+
+        class Model:
+            pass
+
+        class Handler:
+            def __init__(self):
+                self.model = Model()
+
+            def close(self):
+                self.model = None
+
+        cache = HandlersCache(max_size=1)
+        handler = Handler()
+        model_ref = weakref.ref(handler.model)
+        cache.set(0, handler)
+        del handler
+
+        # evicted handler is closed and drops its model
+        cache.set(1, Handler())
+        assert 0 not in cache
+        assert model_ref() is None
+        assert cache.get_stats()['memory_freed'] >= 0
+
+
+class TestModelWarmup:
+
+    def test_queue(self, tmp_path):
+        import time
+        import threading
+        from unittest.mock import patch
+        from mindsdb.interfaces.model.model_warmup import ModelWarmup
+
+        warmup = ModelWarmup(status_path=tmp_path)
+        warmup.enabled = True
+        release = threading.Event()
+        warmed = []
+
+        def warmup_model(predictor_id):
+            release.wait(timeout=5)
+            if predictor_id == 2:
+                raise Exception('failed')
+            warmed.append(predictor_id)
+
+        with patch.object(warmup, '_warmup_model', side_effect=warmup_model), \
+                patch('mindsdb.interfaces.model.model_warmup.db.session'):
+            warmup.add_model(1)
+            warmup.add_model(2)
+            warmup.add_model(3)
+            assert warmup.get_status()['ready'] is False
+
+            release.set()
+            for _ in range(50):
+                if warmup.is_ready():
+                    break
+                time.sleep(0.1)
+
+        status = warmup.get_status()
+        assert status['ready'] is True
+        assert status['done'] == 2
+        assert status['failed'] == 1
+        assert warmed == [1, 3]
+
+    def test_processes_status(self, tmp_path):
+        import os
+        import json
+        import psutil
+        from mindsdb.interfaces.model.model_warmup import ModelWarmup
+
+        warmup = ModelWarmup(status_path=tmp_path)
+        warmup.enabled = True
+
+        # another API process is still warming up models
+        other_pid = os.getppid()
+        (tmp_path / str(other_pid)).write_text(json.dumps({'ready': False, 'pending': 2, 'done': 1, 'failed': 0}))
+        dead_pid = max(psutil.pids()) + 1000
+        (tmp_path / str(dead_pid)).write_text(json.dumps({'ready': False, 'pending': 1, 'done': 0, 'failed': 0}))
+
+        status = warmup.get_status()
+        assert status['ready'] is False
+        assert status['pending'] == 2
+        assert set(status['processes']) == {os.getpid(), other_pid}
+        assert not (tmp_path / str(dead_pid)).exists()
+
+        (tmp_path / str(other_pid)).write_text(json.dumps({'ready': True, 'pending': 0, 'done': 3, 'failed': 0}))
+        assert warmup.get_status()['ready'] is True
+
+    def test_touch(self):
+        from unittest.mock import patch
+        from mindsdb.interfaces.model.model_warmup import ModelWarmup
+
+        warmup = ModelWarmup()
+        warmup.enabled = True
+        with patch('mindsdb.interfaces.model.model_warmup.db') as db, \
+                patch('mindsdb.interfaces.model.model_warmup.threading.Thread'):
+            # usage is not saved in predict path
+            warmup.touch(1)
+            warmup.touch(2)
+            warmup.touch(1)
+            assert db.session.commit.call_count == 0
+
+            # it is saved in background in one transaction
+            warmup.save_touched()
+            assert db.session.query().filter_by().update.call_count == 2
+            assert db.session.commit.call_count == 1
+            warmup.save_touched()
+            assert db.session.commit.call_count == 1
+
+
+class TestTaskListener:
+
+    def test_dispatch(self):
+        from unittest.mock import MagicMock
+        from mindsdb.utilities.ml_task_queue.const import ML_TASK_STATUS
+        from mindsdb.utilities.ml_task_queue.task import Task, TaskListener
+        from mindsdb.utilities.ml_task_queue.utils import RedisKey, to_bytes
+
+        db = MagicMock()
+        listener = TaskListener(db)
+        tasks = [Task(db, RedisKey(f'task{i}'.encode())) for i in range(3)]
+        for task in tasks:
+            listener.register(task)
+
+        df = pd.DataFrame({'a': [1, 2]})
+        pipeline = db.pipeline.return_value
+        listener.dispatch([
+            (b'task0', ML_TASK_STATUS.COMPLETE.value),
+            (b'task1', ML_TASK_STATUS.ERROR.value),
+            (b'task2', ML_TASK_STATUS.PROCESSING.value),
+            (b'unknown', ML_TASK_STATUS.COMPLETE.value),
+        ])
+        # listener only sets statuses, results are fetched by waiting threads
+        assert tasks[0].done() and tasks[1].done()
+        pipeline.execute.assert_not_called()
+
+        pipeline.execute.return_value = [dataframe_to_chunks(df), None, 1]
+        assert tasks[0].result()['a'].tolist() == [1, 2]
+        pipeline.execute.return_value = [[], to_bytes(ValueError('wrong')), 1]
+        try:
+            tasks[1].result()
+        except ValueError as e:
+            assert str(e) == 'wrong'
+        else:
+            raise AssertionError('exception is expected')
+        # result is fetched once
+        assert pipeline.execute.call_count == 2
+        assert tasks[0].result()['a'].tolist() == [1, 2]
+        assert pipeline.execute.call_count == 2
+        assert tasks[2].done() is False
+
+        # no notifications: status is polled, then timeout
+        db.mget.return_value = [ML_TASK_STATUS.PROCESSING.value]
+        tasks[2].last_update -= 20
+        listener.poll()
+        assert tasks[2].done() is False
+        tasks[2].last_update -= 20
+        listener._last_poll = 0
+        listener.poll()
+        assert tasks[2].done() is True
+        assert list(listener.tasks) == []
+
+
+class TestMLTaskConsumerLanes:
+
+    @staticmethod
+    def _make_consumer():
+        from unittest.mock import MagicMock
+        from mindsdb.utilities.ml_task_queue.consumer import MLTaskConsumer
+        from mindsdb.utilities.ml_task_queue.utils import get_consumer_stream_name
+
+        consumer = MLTaskConsumer.__new__(MLTaskConsumer)
+        consumer.name = 'consumer1'
+        consumer.stream_name = get_consumer_stream_name(consumer.name)
+        consumer._running = {}
+        consumer.cpu_stat = [0] * 10
+        consumer.db = MagicMock()
+        return consumer
+
+    def test_can_start(self):
+        from mindsdb.utilities.ml_task_queue.const import ML_TASK_TYPE
+
+        consumer = self._make_consumer()
+        consumer.cpu_stat = [80] * 10
+        assert consumer.can_start(ML_TASK_TYPE.PREDICT) is True
+        assert consumer.can_start(ML_TASK_TYPE.LEARN) is False
+
+        consumer.cpu_stat = [0] * 10
+        consumer._running = {1: ML_TASK_TYPE.LEARN}
+        assert consumer.can_start(ML_TASK_TYPE.LEARN) is True
+        consumer._running = {1: ML_TASK_TYPE.LEARN, 2: ML_TASK_TYPE.LEARN}
+        assert consumer.can_start(ML_TASK_TYPE.LEARN) is False
+        assert consumer.can_start(ML_TASK_TYPE.FINETUNE) is False
+
+        # learn tasks don't take the share reserved for predictions
+        assert consumer.can_start(ML_TASK_TYPE.PREDICT) is True
+        consumer._running = {1: ML_TASK_TYPE.LEARN, 2: ML_TASK_TYPE.FINETUNE, 3: ML_TASK_TYPE.PREDICT}
+        assert consumer.can_start(ML_TASK_TYPE.PREDICT) is True
+        consumer._running.update({i: ML_TASK_TYPE.PREDICT for i in range(4, 7)})
+        assert consumer.can_start(ML_TASK_TYPE.PREDICT) is False
+
+    def test_lanes_priority(self):
+        from unittest.mock import patch
+        from mindsdb.utilities.ml_task_queue.const import TASKS_STREAM_NAME, TASKS_PREDICT_STREAM_NAME
+
+        consumer = self._make_consumer()
+        queues = {
+            consumer.stream_name: ['own'],
+            TASKS_PREDICT_STREAM_NAME: ['predict1', 'predict2'],
+            TASKS_STREAM_NAME: ['learn'],
+        }
+
+        def read(stream_names, block=None):
+            return [
+                (stream_name, queues[stream_name].pop(0))
+                for stream_name in stream_names if len(queues[stream_name]) > 0
+            ]
+
+        with patch.object(consumer, '_read', side_effect=read), \
+                patch.object(consumer, '_steal', return_value=None):
+            messages = [consumer._get_message() for _ in range(5)]
+        assert messages == ['own', 'predict1', 'predict2', 'learn', None]
+
+    def test_wait_returns_surplus(self):
+        from unittest.mock import patch
+        from mindsdb.utilities.ml_task_queue.const import TASKS_PREDICT_STREAM_NAME
+
+        consumer = self._make_consumer()
+        streams = [consumer.stream_name, TASKS_PREDICT_STREAM_NAME]
+        messages = [(consumer.stream_name, {b'a': b'1'}), (TASKS_PREDICT_STREAM_NAME, {b'b': b'2'})]
+
+        # messages came to both streams while waiting: second one is added back to its stream
+        with patch.object(consumer, '_read', return_value=messages):
+            assert consumer._wait(streams, block=1000) == {b'a': b'1'}
+        pipeline = consumer.db.pipeline.return_value
+        pipeline.xadd.assert_called_once_with(TASKS_PREDICT_STREAM_NAME, {b'b': b'2'})
+
+    def test_read_pipeline(self):
+        consumer = self._make_consumer()
+        consumer.db.xreadgroup.return_value = [
+            (consumer.stream_name.encode(), [(b'1-0', {b'a': b'1'})])
+        ]
+        assert consumer._read([consumer.stream_name]) == [(consumer.stream_name, {b'a': b'1'})]
+
+        # ack and delete are sent in one round-trip
+        pipeline = consumer.db.pipeline.return_value
+        pipeline.xack.assert_called_once()
+        pipeline.xdel.assert_called_once()
+        pipeline.execute.assert_called_once()
+        consumer.db.xack.assert_not_called()
+
+    def test_consumer_for_model(self):
+        import time
+        from unittest.mock import MagicMock
+        from mindsdb.utilities.ml_task_queue.utils import ConsumersRegistry, to_bytes
+
+        db = MagicMock()
+        db.hgetall.return_value = {
+            b'c1': to_bytes({'models': [1, 2], 'running': 3, 'updated_at': time.time()}),
+            b'c2': to_bytes({'models': [2], 'running': 1, 'updated_at': time.time()}),
+            b'c3': to_bytes({'models': [3], 'running': 0, 'updated_at': time.time() - 100}),
+        }
+        registry = ConsumersRegistry()
+        assert registry.get_consumer_for_model(db, 1) == 'c1'
+        assert registry.get_consumer_for_model(db, 2) == 'c2'
+        # not alive
+        assert registry.get_consumer_for_model(db, 3) is None
+        assert registry.get_consumer_for_model(db, 4) is None
+        # state is cached
+        db.hgetall.assert_called_once()
@@ -0,0 +1,134 @@
+from unittest.mock import patch, MagicMock
+
+from mindsdb_sql import parse_sql
+
+from mindsdb.integrations.handlers.postgres_handler import postgres_handler
+from mindsdb.integrations.handlers.postgres_handler.postgres_handler import PostgresHandler
+from mindsdb.integrations.libs.response import RESPONSE_TYPE
+
+# How to run:
+#  env PYTHONPATH=./ pytest tests/unit/test_postgres_handler.py
+
+
+class Column:
+    def __init__(self, name, type_code):
+        self.name = name
+        self.type_code = type_code
+
+
+class FakeCursor:
+    """ psycopg cursor which returns rows of 'int8' and 'text' columns
+    """
+
+    def __init__(self, rows, name=None):
+        self.rows = rows
+        self.name = name
+        self.position = 0
+        self.fetch_sizes = []
+        self.queries = []
+        self.description = [Column('a', 20), Column('b', 25)]
+        self.pgresult = MagicMock(status=2)  # TUPLES_OK
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def execute(self, query):
+        self.queries.append(query)
+
+    def fetchmany(self, size):
+        self.fetch_sizes.append(size)
+        rows = self.rows[self.position:self.position + size]
+        self.position += len(rows)
+        return rows
+
+    def fetchall(self):
+        return self.fetchmany(len(self.rows))
+
+    def close(self):
+        self.closed = True
+
+
+class TestPostgresHandler:
+
+    @staticmethod
+    def get_handler(rows, **connection_data):
+        cursors = []
+
+        def cursor(**kwargs):
+            cursors.append(FakeCursor(rows, **kwargs))
+            return cursors[-1]
+
+        connection = MagicMock()
+        connection.cursor = cursor
+        with patch.object(postgres_handler.psycopg, 'connect', return_value=connection):
+            handler = PostgresHandler('pg', connection_data=connection_data)
+            handler.connect()
+        return handler, cursors
+
+    def test_server_side_batches(self):
+        rows = [(i, f'v{i}') for i in range(7)]
+        handler, cursors = self.get_handler(rows, fetch_size=3)
+
+        response = handler.query(parse_sql('select a, b from tbl', dialect='mindsdb'))
+        assert response.type == RESPONSE_TYPE.TABLE
+
+        # select is executed on named cursor and fetched by batches
+        cursor = cursors[-1]
+        assert cursor.name is not None
+        assert cursor.fetch_sizes == [3, 3, 3, 3]
+
+        df = response.data_frame
+        assert list(df.columns) == ['a', 'b']
+        assert df['a'].tolist() == list(range(7))
+        assert df.index.tolist() == list(range(7))
+        assert str(df['a'].dtype) == 'int64'
+
+    def test_server_side_empty_result(self):
+        handler, cursors = self.get_handler([], fetch_size=3)
+
+        response = handler.query(parse_sql('select a, b from tbl', dialect='mindsdb'))
+        assert list(response.data_frame.columns) == ['a', 'b']
+        assert len(response.data_frame) == 0
+
+    def test_client_side(self):
+        rows = [(i, f'v{i}') for i in range(7)]
+
+        # fetch_size is not set
+        handler, cursors = self.get_handler(rows)
+        response = handler.query(parse_sql('select a, b from tbl', dialect='mindsdb'))
+        assert cursors[-1].name is None
+        assert cursors[-1].fetch_sizes == [7]
+        assert len(response.data_frame) == 7
+
+        # not select query is never executed on server-side cursor
+        handler, cursors = self.get_handler(rows, fetch_size=3)
+        handler.query(parse_sql('delete from tbl where a = 1', dialect='mindsdb'))
+        assert cursors[-1].name is None
+
+    def test_stream(self):
+        rows = [(i, f'v{i}') for i in range(7)]
+        handler, cursors = self.get_handler(rows, fetch_size=3)
+
+        response = handler.query_stream(parse_sql('select a, b from tbl', dialect='mindsdb'))
+        assert response.type == RESPONSE_TYPE.TABLE
+
+        # only the first batch is fetched before iteration
+        cursor = cursors[-1]
+        assert cursor.name is not None
+        assert cursor.fetch_sizes == [3]
+        assert response.data_frame['a'].tolist() == [0, 1, 2]
+
+        batches = [df['a'].tolist() for df in response.data_batches]
+        assert batches == [[3, 4, 5], [6]]
+        assert cursor.closed
+        handler.connection.commit.assert_called_once()
+
+        # without fetch_size the whole result is returned at once
+        handler, cursors = self.get_handler(rows)
+        response = handler.query_stream(parse_sql('select a, b from tbl', dialect='mindsdb'))
+        assert response.data_batches is None
+        assert len(response.data_frame) == 7
@@ -0,0 +1,54 @@
+import pandas as pd
+
+from mindsdb.integrations.libs.training_data import TrainingData, iter_batches
+
+
+class TestTrainingData:
+
+    def test_spool(self):
+        training_data = TrainingData(spool=True, batch_size=3)
+
+        df1 = pd.DataFrame({'a': [1, 2, 3, 4], 'b': ['x', 'y', 'z', None]})
+        df2 = pd.DataFrame({'a': [5.5, None], 'b': ['w', 'v']})
+        # can't be stored in arrow without changes, is kept in memory
+        df3 = pd.DataFrame({'a': [6], 'b': [{'c': 1}]})
+        training_data.add(df1)
+        training_data.add(df2)
+        training_data.add(df3)
+
+        assert training_data.columns == ['a', 'b']
+        assert training_data.rows_count == 7
+        assert len(list(training_data._path.iterdir())) == 2
+
+        batches = list(training_data.iter_batches())
+        assert [len(x) for x in batches] == [3, 1, 2, 1]
+
+        df = training_data.to_df()
+        assert len(df) == 7
+        assert list(df['a'].fillna(0)) == [1, 2, 3, 4, 5.5, 0, 6]
+        assert df['b'][6] == {'c': 1}
+
+        path = training_data._path
+        training_data.close()
+        assert not path.exists()
+
+    def test_in_memory(self):
+        training_data = TrainingData(spool=False)
+        assert training_data.to_df() is None
+
+        df = pd.DataFrame({'a': [1, 2]})
+        training_data.add(df)
+        assert training_data.to_df() is df
+        training_data.close()
+
+    def test_iter_batches(self):
+        training_data = TrainingData(spool=True, batch_size=2)
+        training_data.add(pd.DataFrame({'a': [1, 2, 3]}))
+        assert len(training_data) == 3
+        assert [len(x) for x in iter_batches(training_data)] == [2, 1]
+        training_data.close()
+
+        # engine can get dataframe too
+        df = pd.DataFrame({'a': [1, 2, 3]})
+        assert [len(x) for x in iter_batches(df)] == [3]
+        assert list(iter_batches(None)) == []